@@ -0,0 +1,166 @@
+# autotrade.py
+# ============================================================
+# Trade-route optimizer behind the AUTOTRADE command
+#
+# Ranks (sell port -> buy port, commodity) routes exactly as the
+# original pairwise scan did:
+#       score = profit per unit / hops
+# but runs one BFS per selling port and scores every buying port
+# from that single distance row. Sellers whose best possible
+# spread cannot beat the current top-K are skipped entirely.
+# ============================================================
+
+import heapq
+from dataclasses import dataclass
+
+from navigation import UNREACHED
+from port import COMMODITIES
+
+
+@dataclass(frozen=True)
+class TradeRoute:
+    """
+    One recommended run: buy `commodity` at from_sid, haul it
+    `dist` hops, and sell it at to_sid.
+    """
+    from_sid: int
+    to_sid: int
+    commodity: str
+    buy_price: int
+    sell_price: int
+    profit_per_unit: int
+    dist: int
+    score: float
+
+
+def find_trade_routes(galaxy, top_k=5):
+    """
+    Return up to top_k profitable routes, best first.
+
+    Ties keep the order the old nested loop produced (selling
+    sector, then buying sector, then commodity, in galaxy order),
+    so routes[0] is always the route AUTOTRADE used to pick.
+    """
+    if top_k <= 0:
+        return []
+
+    lanes = galaxy.lane_index()
+    if galaxy.market is not None:
+        sellers, bids = _collect_from_book(galaxy.market, lanes)
+    else:
+        sellers, bids = _collect_from_ports(galaxy, lanes)
+
+    # Highest bid first, so the inner loop can stop early.
+    for c in COMMODITIES:
+        bids[c].sort(key=lambda bid: (-bid[0], bid[1]))
+
+    # Upper bound on any route out of a seller: its best spread
+    # against the highest bid anywhere, hauled a single hop.
+    def best_spread(asks):
+        spread = 0
+        for c, price in asks.items():
+            if bids[c]:
+                spread = max(spread, bids[c][0][0] - price)
+        return spread
+
+    ranked = sorted(
+        ((best_spread(asks), order, sid, asks) for order, sid, asks in sellers),
+        key=lambda item: (-item[0], item[1]),
+    )
+
+    # Min-heap of the current top-K; the root is the weakest route.
+    # Later galaxy order ranks lower on equal scores.
+    heap = []
+
+    def weakest_score():
+        return heap[0][0][0] if len(heap) == top_k else None
+
+    for bound, order1, sid1, asks in ranked:
+        if bound <= 0:
+            break
+        floor = weakest_score()
+        if floor is not None and bound < floor:
+            break
+
+        dist_row = galaxy.distances.row(sid1)
+        unreached = UNREACHED[dist_row.typecode]
+
+        for ci, c in enumerate(COMMODITIES):
+            if c not in asks:
+                continue
+            buy_price = asks[c]
+
+            for sell_price, order2, sid2, row2 in bids[c]:
+                profit_per_unit = sell_price - buy_price
+                if profit_per_unit <= 0:
+                    break
+                floor = weakest_score()
+                if floor is not None and profit_per_unit < floor:
+                    break
+
+                dist = dist_row[row2]
+                if dist == unreached or dist <= 0:
+                    continue
+
+                score = profit_per_unit / dist
+                key = (score, (-order1, -order2, -ci))
+                route = TradeRoute(
+                    from_sid=sid1,
+                    to_sid=sid2,
+                    commodity=c,
+                    buy_price=buy_price,
+                    sell_price=sell_price,
+                    profit_per_unit=profit_per_unit,
+                    dist=dist,
+                    score=score,
+                )
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (key, route))
+                elif key > heap[0][0]:
+                    heapq.heapreplace(heap, (key, route))
+
+    return [route for _, route in sorted(heap, key=lambda item: item[0], reverse=True)]
+
+
+# ------------------------------------------------------------
+# Market Snapshots
+#   sellers : [(order, sid, {commodity: asking price})]
+#   bids    : {commodity: [(bid price, order, sid, lane row)]}
+# `order` only needs to follow galaxy order for tie-breaking.
+# ------------------------------------------------------------
+
+def _collect_from_ports(galaxy, lanes):
+    sellers = []
+    bids = {c: [] for c in COMMODITIES}
+    for order, (sid, sec) in enumerate(galaxy.sectors.items()):
+        port = sec.port
+        if not port:
+            continue
+        asks = {c: port.prices[c] for c in COMMODITIES if port.can_sell_to_player(c)}
+        if asks:
+            sellers.append((order, sid, asks))
+        for c in COMMODITIES:
+            if port.can_buy_from_player(c) and sid in lanes:
+                bids[c].append((port.prices[c], order, sid, lanes.row(sid)))
+    return sellers, bids
+
+
+def _collect_from_book(book, lanes):
+    """Same snapshot, read straight from MarketBook arrays."""
+    sids = book.sector_ids.tolist()
+    prices = book.prices.tolist()
+    sells = book.sells.tolist()
+
+    sellers = []
+    bids = {c: [] for c in COMMODITIES}
+    for order, sid in enumerate(sids):
+        row_prices, row_sells = prices[order], sells[order]
+        asks = {c: row_prices[i] for i, c in enumerate(COMMODITIES) if row_sells[i]}
+        if asks:
+            sellers.append((order, sid, asks))
+        if sid in lanes:
+            lane_row = lanes.row(sid)
+            for i, c in enumerate(COMMODITIES):
+                if not row_sells[i]:
+                    bids[c].append((row_prices[i], order, sid, lane_row))
+    return sellers, bids
@@ -0,0 +1,77 @@
+# bench_load.py
+# ============================================================
+# Load-time benchmark for the bundled savegame.json
+#
+# Compares Galaxy.from_dict with the old load path, which
+# generated a complete random galaxy (ring, random links, special
+# sectors, ports and planets) and then overwrote it with the
+# saved data.
+#
+# Usage:
+#   python bench_load.py [savefile] [repeats]
+# ============================================================
+
+import json
+import random
+import sys
+from time import perf_counter
+
+from galaxy import Galaxy
+from planet import Planet
+from port import Port
+
+
+def legacy_from_dict(data):
+    """The pre-restore-path Galaxy.from_dict, kept for comparison."""
+    g = Galaxy(data["num_sectors"])
+
+    for sid, info in data["sectors"].items():
+        sec = g.sectors[int(sid)]
+        sec.neighbors = set(info["neighbors"])
+        sec.type = info["type"]
+        sec.has_pirates = info.get("has_pirates", sec.type == "PIRATE")
+        if info["port"]:
+            sec.port = Port.from_dict(info["port"])
+        if info["planet"]:
+            sec.planet = Planet.from_dict(info["planet"], clock=g.current_turn)
+
+    g.invalidate_lanes()
+    return g
+
+
+def best_of(fn, data, repeats):
+    best = None
+    for _ in range(repeats):
+        # Loaders mutate nothing, but hand each run a fresh copy so
+        # shared dicts can't make one path look cheaper.
+        fresh = json.loads(data)
+        start = perf_counter()
+        fn(fresh["galaxy"])
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv):
+    filename = argv[1] if len(argv) > 1 else "savegame.json"
+    repeats = int(argv[2]) if len(argv) > 2 else 20
+
+    with open(filename) as f:
+        raw = f.read()
+    num_sectors = json.loads(raw)["galaxy"]["num_sectors"]
+
+    random.seed(0)
+    rng_state = random.getstate()
+    restore = best_of(Galaxy.from_dict, raw, repeats)
+    rng_untouched = random.getstate() == rng_state
+    legacy = best_of(legacy_from_dict, raw, repeats)
+
+    print(f"{filename}: {num_sectors} sectors, best of {repeats}")
+    print(f"  legacy generate + overwrite : {legacy * 1000:8.2f} ms")
+    print(f"  Galaxy.from_dict (restore)  : {restore * 1000:8.2f} ms")
+    print(f"  speedup                     : {legacy / restore:8.2f}x")
+    print(f"  restore left global RNG untouched: {rng_untouched}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
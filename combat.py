@@ -17,9 +17,27 @@
 #   - TW-style ambushes
 # ===============================================================
 
-import random
 from dataclasses import dataclass
 from ship import Ship
+from rng import make_rng
+
+
+# Rules shared with the Monte Carlo odds in combat_sim.py.
+HESITATION_CHANCE = 0.15   # per round, before the exchange of attacks
+ESCAPE_BASE = 40           # escape chance in %, plus 1 per free cargo hold
+
+
+def pirate_stats(bonus):
+    """
+    Hull, attack, defense and bounty of a pirate spawned with the
+    given scaling bonus. Works element-wise on NumPy arrays too.
+    """
+    return {
+        "hull": 40 + bonus,
+        "attack": 6 + bonus,
+        "defense": 3 + bonus,
+        "bounty": 150 + bonus * 10,
+    }
 
 
 # ---------------------------------------------------------------
@@ -54,10 +72,13 @@ class PirateShip:
 class CombatEngine:
     """
     Handles encounters between the player's ship and pirates.
+    Dice come from `rng` (a random.Random or seed); by default the
+    global random module.
     """
 
-    def __init__(self, player: Ship):
+    def __init__(self, player: Ship, rng=None):
         self.player = player
+        self.rng = make_rng(rng)
 
     # -----------------------------------------------------------
     # Random Pirate Generator
@@ -67,15 +88,10 @@ class CombatEngine:
         """
         Pirates scale slightly with the player's ship stats.
         """
-        bonus = random.randint(0, self.player.attack // 2)
+        bonus = self.rng.randint(0, self.player.attack // 2)
+        stats = pirate_stats(bonus)
 
-        return PirateShip(
-            hull=40 + bonus,
-            max_hull=40 + bonus,
-            attack=6 + bonus,
-            defense=3 + bonus,
-            bounty=150 + bonus * 10,
-        )
+        return PirateShip(max_hull=stats["hull"], **stats)
 
     # -----------------------------------------------------------
     # Combat Resolution
@@ -86,7 +102,7 @@ class CombatEngine:
         Basic attack roll:
           damage = (atk + random bonus) - defense
         """
-        roll = random.randint(0, atk)
+        roll = self.rng.randint(0, atk)
         dmg = max(1, roll - defense)
         return dmg
 
@@ -118,9 +134,9 @@ class CombatEngine:
           Base 40% + 1% per free cargo hold
         """
         bonus = self.player.free_holds
-        chance = 40 + bonus
+        chance = ESCAPE_BASE + bonus
 
-        roll = random.randint(1, 100)
+        roll = self.rng.randint(1, 100)
         return roll <= chance
 
     # -----------------------------------------------------------
@@ -143,7 +159,7 @@ class CombatEngine:
 
         while True:
             # offer escape chance if the system wants
-            if random.random() < 0.15:
+            if self.rng.random() < HESITATION_CHANCE:
                 log.append("The pirate hesitates — opportunity to escape!")
                 if self.attempt_escape():
                     log.append("You escape successfully!")
@@ -0,0 +1,145 @@
+# combat_sim.py
+# ============================================================
+# Monte Carlo combat odds for TW2025
+#
+# Runs thousands of CombatEngine.engage() battles at once, one
+# NumPy array slot per battle, under exactly the same rules:
+#   - pirate bonus     randint(0, attack // 2) per battle
+#   - hesitation       15% per round, checked before the exchange
+#   - escape           randint(1, 100) <= 40 + free holds
+#   - attack roll      max(1, randint(0, atk) - defense)
+#   - player strikes first; the pirate answers only if alive
+#
+# Each round draws every live battle's rolls in one call, then
+# retires the battles that ended. Used for balancing and to
+# compare Stardock upgrades.
+#
+# NumPy is optional for the game; this module needs it.
+# ============================================================
+
+import dataclasses
+from dataclasses import dataclass
+
+from combat import ESCAPE_BASE, HESITATION_CHANCE, pirate_stats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+WIN, DEATH, ESCAPED = 0, 1, 2
+OUTCOMES = ("win", "death", "escaped")
+
+
+@dataclass(frozen=True)
+class CombatOdds:
+    """
+    Outcome of `battles` simulated engagements.
+    hull_loss[outcome][k] counts battles of that outcome ("win",
+    "death", "escaped") in which the ship lost k hull points.
+    """
+    battles: int
+    win_rate: float
+    death_rate: float
+    escape_rate: float
+    mean_rounds: float
+    mean_bounty: float        # per win
+    hull_loss: dict
+
+    def mean_hull_loss(self, outcome=None):
+        """Average hull lost, over all battles or one outcome."""
+        hists = [self.hull_loss[outcome]] if outcome else self.hull_loss.values()
+        total = sum(int(h.sum()) for h in hists)
+        if not total:
+            return 0.0
+        return sum(float((h * np.arange(len(h))).sum()) for h in hists) / total
+
+
+def simulate_engagements(ship, battles=10000, rng=None):
+    """
+    Fight `battles` independent pirate encounters with `ship`'s
+    current stats (the ship itself is left untouched).
+    `rng` is a numpy Generator or a seed.
+    """
+    if np is None:
+        raise ImportError("simulate_engagements requires NumPy.")
+    rng = np.random.default_rng(rng)
+
+    start_hull = ship.hull
+    escape_chance = ESCAPE_BASE + ship.free_holds
+
+    # spawn_pirate(), once per battle
+    bonus = rng.integers(0, ship.attack // 2, size=battles, endpoint=True)
+    pirate = pirate_stats(bonus)
+    pirate_hull = pirate["hull"]
+    pirate_attack = pirate["attack"]
+    pirate_defense = pirate["defense"]
+
+    hull = np.full(battles, start_hull, dtype=np.int64)
+    outcome = np.full(battles, -1, dtype=np.int8)
+    rounds = np.zeros(battles, dtype=np.int64)
+    live = np.arange(battles)
+
+    while live.size:
+        n = live.size
+
+        # The pirate hesitates; the player tries to slip away.
+        hesitates = rng.random(n) < HESITATION_CHANCE
+        escapes = hesitates & (rng.integers(1, 100, size=n, endpoint=True) <= escape_chance)
+        if escapes.any():
+            outcome[live[escapes]] = ESCAPED
+            live = live[~escapes]
+            n = live.size
+            if not n:
+                break
+
+        rounds[live] += 1
+
+        # Player strikes first.
+        roll = rng.integers(0, ship.attack, size=n, endpoint=True)
+        pirate_hull[live] -= np.maximum(1, roll - pirate_defense[live])
+        won = pirate_hull[live] <= 0
+        outcome[live[won]] = WIN
+        live = live[~won]
+        if not live.size:
+            break
+
+        # Surviving pirates answer.
+        roll = rng.integers(0, pirate_attack[live], endpoint=True)
+        hull[live] -= np.maximum(1, roll - ship.defense)
+        died = hull[live] <= 0
+        outcome[live[died]] = DEATH
+        live = live[~died]
+
+    loss = np.minimum(start_hull - hull, start_hull) if start_hull > 0 else np.zeros(battles, dtype=np.int64)
+    hull_loss = {
+        name: np.bincount(loss[outcome == code], minlength=max(start_hull, 0) + 1)
+        for code, name in enumerate(OUTCOMES)
+    }
+    counts = np.bincount(outcome, minlength=3)
+    wins = outcome == WIN
+
+    return CombatOdds(
+        battles=battles,
+        win_rate=float(counts[WIN] / battles),
+        death_rate=float(counts[DEATH] / battles),
+        escape_rate=float(counts[ESCAPED] / battles),
+        mean_rounds=float(rounds.mean()),
+        mean_bounty=float(pirate["bounty"][wins].mean()) if wins.any() else 0.0,
+        hull_loss=hull_loss,
+    )
+
+
+def compare_builds(ship, builds, battles=10000, rng=None):
+    """
+    Odds for `ship` as-is and with each build applied. `builds`
+    maps a label to Ship field overrides, e.g.
+        {"Shields +5": {"defense": ship.defense + 5}}
+    Returns {label: CombatOdds}, "current" first.
+    """
+    rng = np.random.default_rng(rng) if np is not None else rng
+    results = {"current": simulate_engagements(ship, battles, rng)}
+    for label, changes in builds.items():
+        variant = dataclasses.replace(ship, **{"cargo": dict(ship.cargo), **changes})
+        results[label] = simulate_engagements(variant, battles, rng)
+    return results
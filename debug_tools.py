@@ -1,6 +1,9 @@
 # debug_tools.py
 import pprint
 
+from diagnostics import GalaxySource, run_diagnostics
+from navigation import connected_components, eccentricities
+
 # Colors for terminal clarity (IDLE ignores them but VSCode/console will show)
 RED = "\033[91m"
 YELLOW = "\033[93m"
@@ -14,192 +17,101 @@ def header(text):
     print("="*60)
 
 
-# ============================================================
-# 1. VALIDATE ALL SECTORS
-# ============================================================
-
-def validate_sectors(galaxy):
-    header("SECTOR VALIDATION")
+# The checks themselves live in diagnostics.py, which returns a
+# structured report; the functions here print its sections. Pass
+# a report from run_diagnostics() to print it without re-checking.
 
-    errors = []
-    for sid, sec in galaxy.sectors.items():
+def print_check(galaxy, name, report=None):
+    if report is None:
+        report = run_diagnostics(galaxy, checks=[name])
+    print(report.render_check(name, color=True))
 
-        # Sector ID sanity
-        if sid != sec.id:
-            errors.append(f"Sector dict key {sid} mismatches sec.id {sec.id}")
 
-        # Name sanity
-        if not isinstance(sec.name, str):
-            errors.append(f"Sector {sid} name invalid: {sec.name}")
-
-        # Neighbor format
-        if not isinstance(sec.neighbors, set):
-            errors.append(f"Sector {sid} neighbors is not a set!")
-
-        # Neighbor exists
-        for n in sec.neighbors:
-            if n not in galaxy.sectors:
-                errors.append(f"Sector {sid} links to unknown neighbor {n}")
+# ============================================================
+# 1. VALIDATE ALL SECTORS
+# ============================================================
 
-    if errors:
-        print(RED + "❌ Sector problems detected:" + RESET)
-        for e in errors:
-            print(" -", e)
-    else:
-        print(GREEN + "✔ All sectors valid." + RESET)
+def validate_sectors(galaxy, report=None):
+    print_check(galaxy, "sectors", report)
 
 
 # ============================================================
 # 2. VALIDATE WARP LANES (BIDIRECTIONAL)
 # ============================================================
 
-def validate_warp_lanes(galaxy):
-    header("WARP LANE VALIDATION")
-
-    bad_links = []
-
-    for sid, sec in galaxy.sectors.items():
-        for n in sec.neighbors:
-            # A must list B, AND B must list A
-            if sid not in galaxy.sectors[n].neighbors:
-                bad_links.append((sid, n))
-
-    if bad_links:
-        print(RED + "❌ One-way warp lanes detected!" + RESET)
-        for a, b in bad_links:
-            print(f" - {a} lists {b}, but {b} does NOT list {a}")
-    else:
-        print(GREEN + "✔ All warp lanes are correctly bidirectional." + RESET)
+def validate_warp_lanes(galaxy, report=None):
+    print_check(galaxy, "lanes", report)
 
 
 # ============================================================
 # 3. VALIDATE MAP CONNECTIVITY (NO ISOLATED SECTORS)
 # ============================================================
 
-def validate_connectivity(galaxy):
-    header("CONNECTIVITY VALIDATION")
+def validate_connectivity(galaxy, report=None):
+    print_check(galaxy, "connectivity", report)
 
-    isolated = [sid for sid, sec in galaxy.sectors.items() if len(sec.neighbors) == 0]
 
-    if isolated:
-        print(RED + "❌ Isolated sectors found:" + RESET, isolated)
-    else:
-        print(GREEN + "✔ No isolated sectors." + RESET)
+# ============================================================
+# 4. VALIDATE PATHFINDING (ONE CONNECTED COMPONENT)
+# ============================================================
+
+def validate_pathfinding(galaxy, report=None):
+    print_check(galaxy, "reachability", report)
 
 
 # ============================================================
-# 4. VALIDATE PATHFINDING
+# 4b. DIAMETER & ECCENTRICITY (OPTIONAL)
 # ============================================================
 
-def validate_pathfinding(galaxy):
-    header("PATHFINDING VALIDATION")
-
-    # Sanity: every sector should be reachable from every other sector
-    unreachable = []
+def report_eccentricity(galaxy):
+    """
+    Galaxy diameter, radius, and the sectors at its center and
+    edge. Runs a BFS from every sector (bit-parallel), so it is
+    kept out of the default DEBUG ALL.
+    """
+    header("DIAMETER & ECCENTRICITY")
 
-    all_sids = list(galaxy.sectors.keys())
+    lanes = galaxy.lane_index()
+    if not len(lanes):
+        print(YELLOW + "Galaxy has no sectors." + RESET)
+        return
 
-    for a in all_sids:
-        for b in all_sids:
-            dist = galaxy.shortest_distance(a, b)
-            if dist is None:
-                unreachable.append((a, b))
+    ecc = eccentricities(lanes)
+    diameter, radius = max(ecc), min(ecc)
+    center = [lanes.sid(r) for r, e in enumerate(ecc) if e == radius]
+    edge = [lanes.sid(r) for r, e in enumerate(ecc) if e == diameter]
 
-    if unreachable:
-        print(RED + "❌ Unreachable sector pairs found!" + RESET)
-        for pair in unreachable[:20]:  # avoid screen spam
-            print(" -", pair)
-        if len(unreachable) > 20:
-            print("  ...and more omitted.")
-    else:
-        print(GREEN + "✔ All sectors mutually reachable." + RESET)
+    if connected_components(lanes)[1] > 1:
+        print(YELLOW + "Galaxy is disconnected; distances are within each region." + RESET)
+    print(f"Diameter: {diameter} warps")
+    print(f"Radius:   {radius} warps")
+    print(f"Mean eccentricity: {sum(ecc) / len(ecc):.2f}")
+    print(f"Center sectors ({len(center)}):", center[:20])
+    print(f"Edge sectors ({len(edge)}):", edge[:20])
 
 
 # ============================================================
 # 5. VALIDATE PORTS
 # ============================================================
 
-def validate_ports(galaxy):
-    header("PORT VALIDATION")
-
-    errors = []
-
-    for sid, sec in galaxy.sectors.items():
-        if sec.port:
-            port = sec.port
-
-            # Check prices
-            for c, price in port.prices.items():
-                if not isinstance(price, int) or price <= 0:
-                    errors.append(f"Sector {sid} port has invalid price for {c}: {price}")
-
-            # Modes
-            if not isinstance(port.modes, dict):
-                errors.append(f"Sector {sid} port modes invalid.")
-
-    if errors:
-        print(RED + "❌ Port issues detected:" + RESET)
-        for e in errors:
-            print(" -", e)
-    else:
-        print(GREEN + "✔ All ports valid." + RESET)
+def validate_ports(galaxy, report=None):
+    print_check(galaxy, "ports", report)
 
 
 # ============================================================
 # 6. VALIDATE PLANETS
 # ============================================================
 
-def validate_planets(galaxy):
-    header("PLANET VALIDATION")
-
-    errors = []
-
-    for sid, sec in galaxy.sectors.items():
-        if sec.planet:
-            p = sec.planet
-
-            # Goods structure
-            if not isinstance(p.goods, dict):
-                errors.append(f"Sector {sid}: planet.goods is not a dict.")
-
-            # Treasury
-            if p.treasury < 0:
-                errors.append(f"Sector {sid}: planet treasury negative ({p.treasury}).")
-
-            # Production
-            if not isinstance(p.production_rates, dict):
-                errors.append(f"Sector {sid}: production_rates missing or invalid.")
-
-    if errors:
-        print(RED + "❌ Planet issues detected:" + RESET)
-        for e in errors:
-            print(" -", e)
-    else:
-        print(GREEN + "✔ All planets valid." + RESET)
+def validate_planets(galaxy, report=None):
+    print_check(galaxy, "planets", report)
 
 
 # ============================================================
 # 7. VALIDATE SPECIAL SECTORS (FEDSPACE, PIRATE, STARDOCK)
 # ============================================================
 
-def validate_special_sectors(galaxy):
-    header("SPECIAL SECTOR VALIDATION")
-
-    problems = []
-
-    for sid, sec in galaxy.sectors.items():
-        if sec.type == "STARDOCK" and sec.port is not None:
-            problems.append(f"Stardock sector {sid} should NOT have a port.")
-
-        if sec.type == "PIRATE" and not sec.has_pirates:
-            problems.append(f"Pirate sector {sid} has no has_pirates flag.")
-
-    if problems:
-        print(RED + "❌ Special-sector issues found:" + RESET)
-        for p in problems:
-            print(" -", p)
-    else:
-        print(GREEN + "✔ All special-sector rules validated." + RESET)
+def validate_special_sectors(galaxy, report=None):
+    print_check(galaxy, "special", report)
 
 # ============================================================
 # 8. LIST SECTORS WITH PORTS AND PLANETS (FORMATTED)
@@ -208,9 +120,11 @@ def validate_special_sectors(galaxy):
 def list_sectors_with_ports_and_planets(galaxy):
     header("SECTORS WITH PORTS AND PLANETS")
 
-    for sid, sec in galaxy.sectors.items():
-        port_name   = sec.port.name   if sec.port else ""
-        planet_name = sec.planet.name if sec.planet else ""
+    # Records, so a mapped galaxy's sectors don't all get built.
+    source = GalaxySource(galaxy)
+    for sid, info in source.records(0, len(source)):
+        port_name   = info["port"]["name"]   if info["port"] else ""
+        planet_name = info["planet"]["name"] if info["planet"] else ""
 
         # Format as:  Sector: Port: [name] | Planet: [name]
         print(f"Sector {sid}: Port: [{port_name:<20}] | Planet: [{planet_name:<20}]")
@@ -221,15 +135,13 @@ def list_sectors_with_ports_and_planets(galaxy):
 # 9. FULL GALAXY DIAGNOSTIC
 # ============================================================
 
-def run_all_debug(galaxy):
+def run_all_debug(galaxy, eccentricity=False):
     """
-    Run every validation check in order.
+    Run every validation check (see diagnostics.py) and print the
+    report. With eccentricity, also report the diameter.
     """
-    validate_sectors(galaxy)
-    validate_warp_lanes(galaxy)
-    validate_connectivity(galaxy)
-    validate_pathfinding(galaxy)
-    validate_ports(galaxy)
-    validate_planets(galaxy)
-    validate_special_sectors(galaxy)
-    list_sectors_with_ports_and_planets(galaxy)
\ No newline at end of file
+    report = run_diagnostics(galaxy)
+    print(report.render_text(color=True))
+    if eccentricity:
+        report_eccentricity(galaxy)
+    list_sectors_with_ports_and_planets(galaxy)
@@ -14,8 +14,8 @@ DOCK_DEPARTURE_TEXTS = [
     "Heat vents belch steam upward, fogging the lower viewing ports. You rise past the undercity’s rusted walkways and patched-together apartments stacked like mismatched bricks. A shuttle screams by on emergency burn, chased by two smaller ships with weapons charged. Typical day. You punch your thrusters, roll starboard, and the entire mess of humanity, droids, thieves, traders, and saints collapses into distance. Ahead is a sky full of possibility — and probably a few mistakes."
 ]
 
-def depart():
-    return random.choice(DOCK_DEPARTURE_TEXTS)
+def depart(rng=random):
+    return rng.choice(DOCK_DEPARTURE_TEXTS)
 
 PORT_DEPARTURE_TEXTS = [
     "Your ship lifts off as the noise, neon, and chaos of the port collapse into a shrinking smear of color below you.",
@@ -30,8 +30,8 @@ PORT_DEPARTURE_TEXTS = [
     "With a smooth upward burn, you leave behind the noise, the deals, and the eyes that never stop watching."
 ]
 
-def departPort():
-    return textwrap.fill(random.choice(PORT_DEPARTURE_TEXTS), width=80)
+def departPort(rng=random):
+    return textwrap.fill(rng.choice(PORT_DEPARTURE_TEXTS), width=80)
     
 PORT_LANDING_TEXTS = [
     "Your ship breaks through a curtain of swirling dust as the outpost’s lone landing beacon flickers weakly in the haze. Your ship touches down on a pad made of mismatched metal sheets held together by stubbornness and old welds. A single dockhand wanders over, squinting like he’s not sure whether you’re a visitor or bad weather.",
@@ -46,7 +46,7 @@ PORT_LANDING_TEXTS = [
     "Your ship hits down with a thud on a cracked, sunbaked landing slab surrounded by rusting cargo containers. A pair of smugglers argue loudly nearby, their weapons casually visible and their patience clearly not. The air smells like heat, old gunpowder, and deals made under duress.",
     ]
     
-def landingPort():
-    return textwrap.fill(random.choice(PORT_LANDING_TEXTS),width=80)
+def landingPort(rng=random):
+    return textwrap.fill(rng.choice(PORT_LANDING_TEXTS),width=80)
     
     
\ No newline at end of file
@@ -0,0 +1,526 @@
+# diagnostics.py
+# ============================================================
+# Structured galaxy diagnostics, sharded across a worker pool
+#
+# Runs the same checks as debug_tools, but returns a
+# DiagnosticReport instead of printing: render it with
+# render_text(), or to_json() to store, diff or compare it.
+#
+# Per-sector checks (sectors, warp lanes, ports, planets, special
+# sectors) work on sector records, the dict shape saves use, and
+# run over shards of rows, one pool task per shard:
+#   - a binary save is checked straight from the file: worker
+#     processes each map it themselves and build no objects
+#   - a live Galaxy or a JSON save is checked on a thread pool;
+#     sectors a mapped or bulk galaxy hasn't built yet are read
+#     from its snapshot rather than built
+# Connectivity and reachability need the whole lane table, so
+# each is one more task of its own.
+#
+# Usage (a pre-load check, exits 1 when there are problems):
+#   python diagnostics.py savegame.tw25
+#   python diagnostics.py savegame.json --json
+# ============================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from navigation import LaneIndex, connected_components
+from port import PORT_TYPES
+from savefile import is_binary_save, read_save
+from snapshot import GalaxySnapshot
+from ui import Color
+
+SHARD_SIZE = 50000
+SHOWN_ISSUES = 20
+
+
+@dataclass(frozen=True)
+class Issue:
+    """One problem found by a check."""
+    check: str
+    sector: int
+    message: str
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one check over the whole galaxy."""
+    name: str
+    checked: int = 0
+    issues: list = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return not self.issues
+
+
+@dataclass
+class DiagnosticReport:
+    """Every check's result, plus how the run was split up."""
+    source: str
+    sectors: int
+    shards: int
+    workers: int
+    seconds: float
+    checks: dict = field(default_factory=dict)   # name -> CheckResult
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.checks.values())
+
+    @property
+    def issue_count(self):
+        return sum(len(result.issues) for result in self.checks.values())
+
+    def to_dict(self):
+        data = asdict(self)
+        data["ok"] = self.ok
+        return data
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def render_check(self, name, color=False, limit=SHOWN_ISSUES):
+        """One check's section of render_text(), at most `limit` issues."""
+        def paint(code, text):
+            return code + text + Color.RESET if color else text
+
+        result = self.checks[name]
+        title, passed, failed = CHECKS[name][:3]
+        lines = ["", "=" * 60, title, "=" * 60]
+        if result.ok:
+            lines.append(paint(Color.GREEN, "✔ " + passed))
+            return "\n".join(lines)
+
+        lines.append(paint(Color.BRIGHT_RED, "❌ " + failed))
+        for key, value in result.stats.items():
+            lines.append(f" - {key.replace('_', ' ').capitalize()}: {value}")
+        for issue in result.issues[:limit]:
+            lines.append(f" - {issue.message}")
+        if len(result.issues) > limit:
+            lines.append(f"  ...and {len(result.issues) - limit} more omitted.")
+        return "\n".join(lines)
+
+    def render_text(self, color=False, limit=SHOWN_ISSUES):
+        """The report as debug_tools prints it: one section per check."""
+        verdict = "no problems" if self.ok else f"{self.issue_count} problem(s)"
+        return "\n".join(
+            [self.render_check(name, color, limit) for name in self.checks]
+            + ["", f"{self.sectors} sectors, {self.shards} shard(s), "
+                   f"{self.workers} worker(s), {self.seconds:.3f}s: {verdict}."]
+        )
+
+
+# ----------------------------------------------------------
+# Sources
+# ----------------------------------------------------------
+
+class GalaxySource:
+    """
+    Sector records of a live Galaxy. Sectors of a mapped or bulk
+    galaxy that haven't been built yet are read from its snapshot.
+    """
+
+    processes = False
+
+    def __init__(self, galaxy):
+        self.galaxy = galaxy
+        self.label = f"galaxy ({galaxy.num_sectors} sectors)"
+        self.ids = list(galaxy.sectors)
+        self.lanes = galaxy.lane_index()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def records(self, lo, hi):
+        sectors = self.galaxy.sectors
+        snap = self.galaxy.snapshot
+        loaded = getattr(sectors, "loaded", None)
+        for sid in self.ids[lo:hi]:
+            if loaded is not None and sid not in loaded:
+                yield sid, snap.sector_info(snap.row_of(sid))
+            else:
+                yield sid, live_record(sectors[sid])
+
+    def has_sector(self, sid):
+        return sid in self.galaxy.sectors
+
+    def has_lane(self, a, b):
+        return self.lanes.has_lane(a, b)
+
+    def lane_index(self):
+        return self.lanes
+
+    def close(self):
+        pass
+
+
+class RecordSource:
+    """Sector records of a save already read into a dict (JSON saves)."""
+
+    processes = False
+
+    def __init__(self, sectors, label="save"):
+        self.sectors = {int(sid): info for sid, info in sectors.items()}
+        self.ids = list(self.sectors)
+        self.label = label
+
+    def __len__(self):
+        return len(self.ids)
+
+    def records(self, lo, hi):
+        for sid in self.ids[lo:hi]:
+            yield sid, self.sectors[sid]
+
+    def has_sector(self, sid):
+        return sid in self.sectors
+
+    def has_lane(self, a, b):
+        info = self.sectors.get(a)
+        return info is not None and b in info["neighbors"]
+
+    def lane_index(self):
+        return _lane_index(self.records(0, len(self)))
+
+    def close(self):
+        pass
+
+
+class SnapshotSource:
+    """
+    Sector records of a binary save, read through a GalaxySnapshot.
+    Pickles as its filename, so worker processes map the file
+    themselves (once per process).
+    """
+
+    processes = True
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.label = filename
+        self.snapshot = GalaxySnapshot(filename)
+        self._lanes = False   # the file's LaneIndex, once read (None: unusable)
+
+    def __reduce__(self):
+        return _open_snapshot_source, (self.filename,)
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def records(self, lo, hi):
+        snap = self.snapshot
+        for row in range(lo, hi):
+            yield snap.sector_id(row), snap.sector_info(row)
+
+    def _file_lanes(self):
+        # Lookups through the index are arithmetic and a bisect;
+        # without it every lookup reads rows from the file.
+        if self._lanes is False:
+            self._lanes = self.snapshot.lane_index()
+        return self._lanes
+
+    def has_sector(self, sid):
+        lanes = self._file_lanes()
+        if lanes is not None:
+            return sid in lanes
+        return self.snapshot.row_of(sid) is not None
+
+    def has_lane(self, a, b):
+        lanes = self._file_lanes()
+        if lanes is not None:
+            return lanes.has_lane(a, b)
+        row = self.snapshot.row_of(a)
+        return row is not None and b in self.snapshot.neighbors(row)
+
+    def lane_index(self):
+        lanes = self._file_lanes()
+        if lanes is None:
+            # Rows out of id order, or lanes to missing sectors.
+            lanes = _lane_index(self.records(0, len(self)))
+        return lanes
+
+    def close(self):
+        self.snapshot.close()
+
+
+class _Lanes:
+    __slots__ = ("neighbors",)
+
+    def __init__(self, neighbors):
+        self.neighbors = neighbors
+
+
+def _lane_index(records):
+    """LaneIndex built from (sid, record) pairs."""
+    return LaneIndex.from_sectors({sid: _Lanes(set(info["neighbors"])) for sid, info in records})
+
+
+# Worker processes keep each save they map open until they exit.
+_snapshot_sources = {}
+
+
+def _open_snapshot_source(filename):
+    source = _snapshot_sources.get(filename)
+    if source is None:
+        source = _snapshot_sources[filename] = SnapshotSource(filename)
+    return source
+
+
+def open_source(target):
+    """A source for a Galaxy, a save filename, or an existing source."""
+    if isinstance(target, (GalaxySource, RecordSource, SnapshotSource)):
+        return target
+    if isinstance(target, (str, os.PathLike)):
+        filename = os.fspath(target)
+        if is_binary_save(filename):
+            return SnapshotSource(filename)
+        return RecordSource(read_save(filename)["galaxy"]["sectors"], label=filename)
+    return GalaxySource(target)
+
+
+def live_record(sec):
+    """A built Sector as a record; neighbors are passed through as-is."""
+    return {
+        "id": sec.id,
+        "name": sec.name,
+        "neighbors": sec.neighbors,
+        "type": sec.type,
+        "has_pirates": sec.has_pirates,
+        "port": sec.port.to_dict() if sec.port else None,
+        "planet": sec.planet.to_dict() if sec.planet else None,
+    }
+
+
+# ----------------------------------------------------------
+# Per-Sector Checks
+# ----------------------------------------------------------
+# Each takes (source, sid, record, issues) and appends messages.
+
+def check_sector(source, sid, info, issues):
+    # Sector ID sanity
+    if sid != info["id"]:
+        issues.append(f"Sector dict key {sid} mismatches sec.id {info['id']}")
+
+    # Name sanity (live sectors only; saves don't store names)
+    if "name" in info and not isinstance(info["name"], str):
+        issues.append(f"Sector {sid} name invalid: {info['name']}")
+
+    # Neighbor format
+    neighbors = info["neighbors"]
+    if not isinstance(neighbors, (set, list)):
+        issues.append(f"Sector {sid} neighbors is not a set!")
+        return
+
+    # Neighbor exists
+    for n in neighbors:
+        if not source.has_sector(n):
+            issues.append(f"Sector {sid} links to unknown neighbor {n}")
+
+
+def check_lanes(source, sid, info, issues):
+    if not isinstance(info["neighbors"], (set, list)):
+        return   # reported by check_sector
+
+    # A must list B, AND B must list A
+    for n in info["neighbors"]:
+        if source.has_sector(n) and not source.has_lane(n, sid):
+            issues.append(f"{sid} lists {n}, but {n} does NOT list {sid}")
+
+
+def check_port(source, sid, info, issues):
+    port = info["port"]
+    if not port:
+        return
+
+    # Check prices (freshly generated rows have none yet)
+    for c, price in port.get("prices", {}).items():
+        if not isinstance(price, int) or price <= 0:
+            issues.append(f"Sector {sid} port has invalid price for {c}: {price}")
+
+    # Modes come from the port class
+    if port["type_id"] not in PORT_TYPES:
+        issues.append(f"Sector {sid} port modes invalid.")
+
+
+def check_planet(source, sid, info, issues):
+    p = info["planet"]
+    if not p:
+        return
+
+    # Goods structure
+    if not isinstance(p["goods"], dict):
+        issues.append(f"Sector {sid}: planet.goods is not a dict.")
+
+    # Treasury
+    if p["treasury"] < 0:
+        issues.append(f"Sector {sid}: planet treasury negative ({p['treasury']}).")
+
+    # Production
+    if not isinstance(p.get("production_rates"), dict):
+        issues.append(f"Sector {sid}: production_rates missing or invalid.")
+
+
+def check_special_sector(source, sid, info, issues):
+    if info["type"] == "STARDOCK" and info["port"]:
+        issues.append(f"Stardock sector {sid} should NOT have a port.")
+
+    if info["type"] == "PIRATE" and not info["has_pirates"]:
+        issues.append(f"Pirate sector {sid} has no has_pirates flag.")
+
+
+# ----------------------------------------------------------
+# Whole-Galaxy Checks
+# ----------------------------------------------------------
+# Each takes (source, result) and fills in the CheckResult.
+
+def check_connectivity(source, result):
+    lanes = source.lane_index()
+    result.checked = len(lanes)
+    for row in range(len(lanes)):
+        if lanes.offsets[row] == lanes.offsets[row + 1]:
+            sid = lanes.sid(row)
+            result.issues.append(Issue(result.name, sid, f"Sector {sid} is isolated (no warp lanes)"))
+
+
+def check_reachability(source, result):
+    lanes = source.lane_index()
+    component, count = connected_components(lanes)
+    sizes = [0] * count
+    for c in component:
+        sizes[c] += 1
+    main = max(range(count), key=sizes.__getitem__) if count else 0
+
+    result.checked = len(lanes)
+    result.stats = {"regions": count, "largest_region": sizes[main] if count else 0}
+    for row, c in enumerate(component):
+        if c != main:
+            sid = lanes.sid(row)
+            result.issues.append(Issue(result.name, sid, f"Sector {sid} is unreachable from the largest region"))
+
+
+# name -> (title, passed, failed, check, runs per sector)
+CHECKS = {
+    "sectors": ("SECTOR VALIDATION", "All sectors valid.",
+                "Sector problems detected:", check_sector, True),
+    "lanes": ("WARP LANE VALIDATION", "All warp lanes are correctly bidirectional.",
+              "One-way warp lanes detected!", check_lanes, True),
+    "connectivity": ("CONNECTIVITY VALIDATION", "No isolated sectors.",
+                     "Isolated sectors found:", check_connectivity, False),
+    "reachability": ("PATHFINDING VALIDATION", "All sectors mutually reachable.",
+                     "Galaxy is split into disconnected regions!", check_reachability, False),
+    "ports": ("PORT VALIDATION", "All ports valid.",
+              "Port issues detected:", check_port, True),
+    "planets": ("PLANET VALIDATION", "All planets valid.",
+                "Planet issues detected:", check_planet, True),
+    "special": ("SPECIAL SECTOR VALIDATION", "All special-sector rules validated.",
+                "Special-sector issues found:", check_special_sector, True),
+}
+
+
+# ----------------------------------------------------------
+# Running
+# ----------------------------------------------------------
+
+def check_shard(source, names, lo, hi):
+    """Run the per-sector checks `names` over rows lo..hi of `source`."""
+    runs = [(name, CHECKS[name][3], []) for name in names]
+    checked = 0
+    for sid, info in source.records(lo, hi):
+        checked += 1
+        for name, check, messages in runs:
+            before = len(messages)
+            check(source, sid, info, messages)
+            for i in range(before, len(messages)):
+                messages[i] = Issue(name, sid, messages[i])
+    return checked, {name: messages for name, _, messages in runs}
+
+
+def check_whole(source, name):
+    result = CheckResult(name)
+    CHECKS[name][3](source, result)
+    return result
+
+
+def run_diagnostics(target, checks=None, workers=None, shard_size=SHARD_SIZE, processes=None):
+    """
+    Check a Galaxy, a save file or a source and return a
+    DiagnosticReport. Binary saves run on a process pool (pass
+    processes=False for threads); everything else on threads.
+    `checks` picks names from CHECKS (default: all of them).
+    """
+    source = open_source(target)
+    names = list(CHECKS) if checks is None else list(checks)
+    for name in names:
+        if name not in CHECKS:
+            raise ValueError(f"Unknown check {name!r}.")
+    per_sector = [name for name in names if CHECKS[name][4]]
+    whole = [name for name in names if not CHECKS[name][4]]
+
+    n = len(source)
+    shards = [(lo, min(lo + shard_size, n)) for lo in range(0, n, shard_size)] if per_sector else []
+    if processes is None:
+        processes = source.processes
+    workers = workers or min(len(shards) + len(whole), os.cpu_count() or 1) or 1
+    pool_type = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    start = time.perf_counter()
+    results = {name: CheckResult(name) for name in names}
+    try:
+        with pool_type(max_workers=workers) as pool:
+            whole_jobs = [(name, pool.submit(check_whole, source, name)) for name in whole]
+            shard_jobs = [pool.submit(check_shard, source, per_sector, lo, hi) for lo, hi in shards]
+
+            # Merged in shard order, so the report doesn't depend on timing.
+            for job in shard_jobs:
+                checked, found = job.result()
+                for name, issues in found.items():
+                    results[name].checked += checked
+                    results[name].issues.extend(issues)
+            for name, job in whole_jobs:
+                results[name] = job.result()
+    finally:
+        if source is not target:
+            source.close()
+
+    return DiagnosticReport(
+        source=source.label,
+        sectors=n,
+        shards=len(shards),
+        workers=workers,
+        seconds=time.perf_counter() - start,
+        checks=results,
+    )
+
+
+# ----------------------------------------------------------
+# Command Line
+# ----------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a TW2025 save before loading it.")
+    parser.add_argument("savefile")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--checks", nargs="+", choices=list(CHECKS), default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--threads", action="store_true", help="use threads, not processes")
+    args = parser.parse_args(argv)
+
+    report = run_diagnostics(args.savefile, args.checks, args.workers, args.shard_size,
+                             processes=False if args.threads else None)
+    if args.json:
+        print(report.to_json())
+    else:
+        print(report.render_text(color=sys.stdout.isatty()))
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
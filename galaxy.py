@@ -1,10 +1,12 @@
 # galaxy.py
-import random
 from port import Port
-from planet import Planet
+from planet import Planet, generate_planet_name
+from rng import make_rng
+from navigation import DistanceOracle, LaneIndex, find_route
+from journal import ChangeTracker, Tracked
 
 
-class Sector:
+class Sector(Tracked):
     """
     A sector is a node in the galaxy map.
     Each sector has:
@@ -17,24 +19,78 @@ class Sector:
     - has_pirates flag
     """
 
+    # Fields the game shows about a sector (location banner, SCAN row).
+    DISPLAY_FIELDS = frozenset({"name", "type", "neighbors", "port", "planet", "has_pirates"})
+
+    _display = None   # text rendered from those fields, see cached()
+
     def __init__(self, sid):
-        self.id = sid
-        self.name = f"Sector {sid}"
-        self.neighbors = set()
-        self.port = None
-        self.planet = None
-        self.type = "NORMAL"   # always defined
-        self.has_pirates = False
+        # Filled in directly: nothing is tracked or cached yet, so
+        # the __setattr__ hooks below would only cost time.
+        vars(self).update(
+            id=sid,
+            name=f"Sector {sid}",
+            neighbors=set(),
+            port=None,
+            planet=None,
+            type="NORMAL",   # always defined
+            has_pirates=False,
+        )
+
+    # Port and planet changes are saved as part of their sector, so
+    # they report to the same tracker under the sector's key.
+    def track(self, tracker, key):
+        super().track(tracker, key)
+        for child in (self.port, self.planet):
+            if child is not None:
+                child.track(tracker, key)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ("port", "planet") and value is not None and self._tracker is not None:
+            value.track(self._tracker, self._track_key)
+        if name in Sector.DISPLAY_FIELDS and self._display is not None:
+            object.__setattr__(self, "_display", None)
+
+    def cached(self, key, lanes, build):
+        """
+        build(self), kept until one of DISPLAY_FIELDS is assigned or
+        the galaxy's lane index (`lanes`) is rebuilt. A port's name
+        and class never change once it is placed, so trades don't
+        count; edit neighbors in place only with invalidate_lanes().
+        """
+        display = self._display
+        if display is None or display["lanes"] is not lanes:
+            display = {"lanes": lanes}
+            object.__setattr__(self, "_display", display)
+        value = display.get(key)
+        if value is None:
+            value = display[key] = build(self)
+        return value
 
 
 class Galaxy:
     """
     Generates a TradeWars-style galaxy.
+    Pass generate=False for an empty galaxy that a save is restored into.
+    `rng` (a random.Random or seed) drives generation; by default the
+    global random module.
     """
 
-    def __init__(self, num_sectors=100):
+    def __init__(self, num_sectors=100, generate=True, rng=None):
         self.num_sectors = num_sectors
+        self.rng = make_rng(rng)
         self.sectors = {}
+        self._lane_index = None
+        self.distances = DistanceOracle(self)
+        self.snapshot = None   # lazy sector source, see open_snapshot() / generate_bulk()
+        self._snapshot_lanes = False
+        self.market = None     # optional MarketBook, see enable_market_book()
+        self.turn = 0          # production clock shared by every planet
+        self.changes = ChangeTracker()   # entities modified since last save
+
+        if not generate:
+            return
 
         self._create_sectors()
         self._generate_base_ring()
@@ -42,6 +98,9 @@ class Galaxy:
         self._assign_special_sectors()
         self._generate_ports_and_planets()
 
+        for sec in self.sectors.values():
+            sec.track(self.changes, sec.id)
+
     # ----------------------------------------------------------
     # Creation & Base Structure
     # ----------------------------------------------------------
@@ -54,19 +113,64 @@ class Galaxy:
         """Create a circular backbone ensuring the galaxy is connected."""
         for sid in range(1, self.num_sectors + 1):
             next_sid = sid + 1 if sid < self.num_sectors else 1
-            self.sectors[sid].neighbors.add(next_sid)
-            self.sectors[next_sid].neighbors.add(sid)
+            self.add_lane(sid, next_sid)
 
     def _add_random_links(self):
         """Add random connections for better navigation variety."""
         extra_links = max(3, self.num_sectors // 6)
 
         for _ in range(extra_links):
-            a = random.randint(1, self.num_sectors)
-            b = random.randint(1, self.num_sectors)
+            a = self.rng.randint(1, self.num_sectors)
+            b = self.rng.randint(1, self.num_sectors)
             if a != b:
-                self.sectors[a].neighbors.add(b)
-                self.sectors[b].neighbors.add(a)
+                self.add_lane(a, b)
+
+    # ----------------------------------------------------------
+    # Warp Lanes & Adjacency Index
+    # ----------------------------------------------------------
+
+    def add_lane(self, a, b):
+        """Connect two sectors with a two-way warp lane."""
+        self.sectors[a].neighbors.add(b)
+        self.sectors[b].neighbors.add(a)
+        self.sectors[a].mark_dirty()
+        self.sectors[b].mark_dirty()
+        self.invalidate_lanes()
+
+    def invalidate_lanes(self):
+        """
+        Drop the cached lane index. Call this after editing
+        Sector.neighbors directly instead of going through add_lane().
+        """
+        self._lane_index = None
+        self._snapshot_lanes = False   # the file's lane table is stale now
+        self.distances.clear()
+
+    def lane_index(self):
+        """
+        Frozen CSR adjacency index of every warp lane.
+        Built on first use and rebuilt only after lanes change.
+        """
+        if self._lane_index is None:
+            if self._snapshot_lanes:
+                self._lane_index = self.snapshot.lane_index()
+            if self._lane_index is None:
+                self._lane_index = LaneIndex.from_sectors(self.sectors)
+        return self._lane_index
+
+    # ----------------------------------------------------------
+    # Shared Market State
+    # ----------------------------------------------------------
+
+    def enable_market_book(self):
+        """
+        Move every port's levels and prices into one NumPy-backed
+        MarketBook. Raises ImportError when NumPy is unavailable.
+        """
+        from market import MarketBook
+
+        self.market = MarketBook.from_galaxy(self)
+        return self.market
 
     # ----------------------------------------------------------
     # Special Sector Assignment
@@ -95,7 +199,7 @@ class Galaxy:
             sid for sid in self.sectors.keys()
             if self.sectors[sid].type == "NORMAL"
         ]
-        random.shuffle(pirate_candidates)
+        self.rng.shuffle(pirate_candidates)
         for sid in pirate_candidates[:pirate_count]:
             sec = self.sectors[sid]
             sec.type = "PIRATE"
@@ -122,12 +226,31 @@ class Galaxy:
                 continue
 
             # 40% chance sector has a port
-            if random.random() < 0.4:
-                sector.port = Port()
+            if self.rng.random() < 0.4:
+                sector.port = Port.generate(self.rng)
 
             # 20% chance sector has a planet
-            if random.random() < 0.2:
-                sector.planet = Planet(sector.id)
+            if self.rng.random() < 0.2:
+                sector.planet = Planet(
+                    sector.id,
+                    name=generate_planet_name(self.rng),
+                    last_production_turn=self.turn,
+                    clock=self.current_turn,
+                )
+
+    # ----------------------------------------------------------
+    # Production Clock
+    # ----------------------------------------------------------
+
+    def current_turn(self):
+        return self.turn
+
+    def advance_turn(self, turns=1):
+        """
+        Move the production clock forward. Planets settle what they
+        produced lazily on their next read, so this is O(1).
+        """
+        self.turn += turns
 
     # ----------------------------------------------------------
     # Save/Load Support
@@ -136,19 +259,24 @@ class Galaxy:
     def to_dict(self):
         return {
             "num_sectors": self.num_sectors,
+            "turn": self.turn,
             "sectors": {
-                sid: {
-                    "id": sec.id,
-                    "neighbors": list(sec.neighbors),
-                    "type": sec.type,
-                    "has_pirates": sec.has_pirates,
-                    "port": sec.port.to_dict() if sec.port else None,
-                    "planet": sec.planet.to_dict() if sec.planet else None,
-                }
+                sid: self.sector_to_dict(sec)
                 for sid, sec in self.sectors.items()
             }
         }
 
+    @staticmethod
+    def sector_to_dict(sec):
+        return {
+            "id": sec.id,
+            "neighbors": list(sec.neighbors),
+            "type": sec.type,
+            "has_pirates": sec.has_pirates,
+            "port": sec.port.to_dict() if sec.port else None,
+            "planet": sec.planet.to_dict() if sec.planet else None,
+        }
+
     # ----------------------------------------------------------
     # Sector Lookup Helper (TW25Game depends on this)
     # ----------------------------------------------------------
@@ -158,84 +286,103 @@ class Galaxy:
     # ----------------------------------------------------------
     # Shortest Distance Between Two Sectors (Breadth-First Search)
     # ----------------------------------------------------------
-    def shortest_distance(self, start, goal):
+    def shortest_distance(self, start, goal, bidirectional=True):
         """
-        Returns the shortest number of hops between two sectors.
+        Returns the shortest number of hops between two sectors,
+        or None if goal is unreachable.
         Uses BFS since the map is an unweighted graph.
         """
-        if start == goal:
-            return 0
-
-        visited = set()
-        queue = [(start, 0)]  # (sector, distance)
-
-        while queue:
-            current, dist = queue.pop(0)
-
-            if current == goal:
-                return dist
-
-            visited.add(current)
-
-            for neighbor in self.sectors[current].neighbors:
-                if neighbor not in visited:
-                    queue.append((neighbor, dist + 1))
-
-        return None
+        path = self.shortest_path(start, goal, bidirectional=bidirectional)
+        return None if path is None else len(path) - 1
 
     # ----------------------------------------------------------
     # Shortest Path Between Two Sectors (BFS)
     # ----------------------------------------------------------
-    def shortest_path(self, start, goal):
+    def shortest_path(self, start, goal, bidirectional=True):
         """
         Returns the actual shortest path between two sectors as a list.
         Example: [1, 5, 9, 12]
+        Pass bidirectional=False for a plain one-ended search.
         """
         if start == goal:
             return [start]
 
-        from collections import deque
-
-        visited = set()
-        queue = deque([[start]])  # each item is a path list
-
-        while queue:
-            path = queue.popleft()
-            node = path[-1]
-
-            if node == goal:
-                return path
-
-            if node in visited:
-                continue
-
-            visited.add(node)
-
-            for neighbor in self.sectors[node].neighbors:
-                if neighbor not in visited:
-                    new_path = list(path)
-                    new_path.append(neighbor)
-                    queue.append(new_path)
-
-        return None
+        return find_route(self.lane_index(), start, goal, bidirectional)
 
     @staticmethod
     def from_dict(data):
-        g = Galaxy(data["num_sectors"])
+        """
+        Rebuild a galaxy from saved data. Sectors are created straight
+        from the save; nothing is randomly generated first.
+        """
+        g = Galaxy(data["num_sectors"], generate=False)
+        g.turn = data.get("turn", 0)
 
-        # overwrite generated map with saved map data
         for sid, info in data["sectors"].items():
-            sid = int(sid)
-            sec = g.sectors[sid]
+            g._restore_sector(int(sid), info)
 
-            sec.neighbors = set(info["neighbors"])
-            sec.type = info["type"]
-            sec.has_pirates = info.get("has_pirates", sec.type == "PIRATE")
+        g.invalidate_lanes()
+        return g
 
-            if info["port"]:
-                sec.port = Port.from_dict(info["port"])
+    @staticmethod
+    def open_snapshot(filename):
+        """
+        Open a binary save read-only through mmap. Nothing is decoded
+        up front: each Sector (with its Port and Planet) is built the
+        first time it is looked up, and the lane index comes straight
+        from the file's lane table. Game clock and player are in
+        g.snapshot.meta.
+        """
+        from snapshot import GalaxySnapshot, LazySectors
+
+        snap = GalaxySnapshot(filename)
+        g = Galaxy(snap.meta["num_sectors"], generate=False)
+        g.turn = snap.meta.get("galaxy_turn", 0)
+        g.snapshot = snap
+        g.sectors = LazySectors(snap, g)
+        g._snapshot_lanes = True
+        return g
 
-            if info["planet"]:
-                sec.planet = Planet.from_dict(info["planet"])
+    @staticmethod
+    def generate_bulk(num_sectors=100, rng=None):
+        """
+        Generate a galaxy as flat arrays (see galaxygen.py) instead of
+        objects, for 100k+ sector universes. Same layout rules as
+        Galaxy(); each Sector is built on first lookup, as with
+        open_snapshot(), and the lane index comes from the arrays.
+        """
+        from galaxygen import GalaxyBlueprint
+        from snapshot import LazySectors
 
+        g = Galaxy(num_sectors, generate=False, rng=rng)
+        g.snapshot = GalaxyBlueprint(num_sectors, seed=g.rng.getrandbits(63))
+        g.sectors = LazySectors(g.snapshot, g)
+        g._snapshot_lanes = True
         return g
+
+    def release_snapshot(self):
+        """
+        Load every remaining sector and unmap the snapshot file, so the
+        file can be overwritten. No-op for ordinary galaxies.
+        """
+        if self.snapshot is None:
+            return
+        self.sectors = dict(self.sectors.items())
+        self._snapshot_lanes = False
+        self.snapshot.close()
+        self.snapshot = None
+
+    def _restore_sector(self, sid, info):
+        sec = Sector(sid)
+        port, planet = info["port"], info["planet"]
+        # Built without the tracking hooks; track() once it is complete.
+        vars(sec).update(
+            neighbors=set(info["neighbors"]),
+            type=info["type"],
+            has_pirates=info.get("has_pirates", info["type"] == "PIRATE"),
+            port=Port.from_dict(port) if port else None,
+            planet=Planet.from_dict(planet, clock=self.current_turn) if planet else None,
+        )
+        sec.track(self.changes, sid)
+        self.sectors[sid] = sec
+        return sec
@@ -0,0 +1,282 @@
+# galaxygen.py
+# ============================================================
+# Bulk galaxy generation for very large universes
+#
+# Galaxy.__init__ builds every Sector, Port and Planet object one
+# at a time. GalaxyBlueprint instead draws the whole layout as
+# flat arrays in a few passes:
+#   - lanes     base ring + random links, deduplicated straight
+#               into a CSR table (the layout LaneIndex uses)
+#   - types     FedSpace 1-5, Stardock at 3, ~1/12 of the rest
+#               pirate sectors, one-lane sectors dead ends
+#   - ports     40% of non-Stardock sectors: class, commodity
+#               levels and name parts, one row per port
+#   - planets   20% of non-Stardock sectors: name parts
+#
+# The rules and probabilities are Galaxy's; only the sequence of
+# random draws differs. No objects are made here:
+# Galaxy.generate_bulk() serves the blueprint through LazySectors,
+# just like a mapped save, so a Sector (with its Port / Planet)
+# is built the first time it is looked up.
+#
+# Uses NumPy when it is installed; otherwise the same passes run
+# over stdlib arrays, slower. Both follow the same distribution
+# rules, but they draw from different generators, so one seed
+# gives different galaxies with and without NumPy.
+# ============================================================
+
+import random
+from array import array
+
+from navigation import LaneIndex
+from planet import PLANET_PREFIXES, PLANET_SUFFIXES
+from port import COMMODITIES, PORT_PREFIXES, PORT_SUFFIXES, PORT_TYPES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+SECTOR_TYPES = ("NORMAL", "FEDSPACE", "STARDOCK", "PIRATE", "DEADEND")
+NORMAL, FEDSPACE, STARDOCK, PIRATE, DEADEND = range(len(SECTOR_TYPES))
+
+FEDSPACE_SECTORS = 5
+STARDOCK_SECTOR = 3
+PORT_CHANCE = 0.4
+PLANET_CHANCE = 0.2
+LEVEL_RANGE = (20, 80)
+
+
+def extra_link_count(num_sectors):
+    return max(3, num_sectors // 6)
+
+
+def pirate_sector_count(num_sectors):
+    return max(2, num_sectors // 12)
+
+
+class GalaxyBlueprint:
+    """
+    A freshly generated galaxy of sectors 1..N, held as arrays.
+    Offers the same read interface as GalaxySnapshot, so it can sit
+    behind LazySectors. A seed reproduces a galaxy only on the same
+    path; pass use_numpy to pin it rather than follow the install.
+    """
+
+    def __init__(self, num_sectors, seed=None, use_numpy=None):
+        if num_sectors < 1:
+            raise ValueError("A galaxy needs at least one sector.")
+        self.num_sectors = num_sectors
+        self.seed = seed
+
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy:
+            if np is None:
+                raise ImportError("GalaxyBlueprint(use_numpy=True) requires NumPy.")
+            self._generate_numpy(seed)
+        else:
+            self._generate_stdlib(seed)
+
+    def close(self):
+        """Nothing to release; present for Galaxy.release_snapshot()."""
+
+    def __len__(self):
+        return self.num_sectors
+
+    # ----------------------------------------------------------
+    # NumPy Generation
+    # ----------------------------------------------------------
+
+    def _generate_numpy(self, seed):
+        rng = np.random.default_rng(seed)
+        n = self.num_sectors
+        ids = np.arange(1, n + 1, dtype=np.int64)
+
+        # Base ring, plus random links (self-links are dropped).
+        extra = extra_link_count(n)
+        a = rng.integers(1, n, size=extra, endpoint=True)
+        b = rng.integers(1, n, size=extra, endpoint=True)
+        keep = a != b
+        src = np.concatenate([ids, a[keep]]) - 1
+        dst = np.concatenate([np.roll(ids, -1), b[keep]]) - 1
+
+        # Both directions, each lane once, sorted by (row, neighbor).
+        keys = np.concatenate([src * n + dst, dst * n + src])
+        keys.sort()
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        rows, cols = np.divmod(keys, n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+
+        types = np.full(n, NORMAL, dtype=np.uint8)
+        types[:FEDSPACE_SECTORS] = FEDSPACE
+        if n >= STARDOCK_SECTOR:
+            types[STARDOCK_SECTOR - 1] = STARDOCK
+        normal = np.flatnonzero(types == NORMAL)
+        count = min(pirate_sector_count(n), normal.size)
+        types[rng.choice(normal, size=count, replace=False)] = PIRATE
+        types[(types == NORMAL) & (np.diff(offsets) == 1)] = DEADEND
+
+        eligible = types != STARDOCK
+        has_port = eligible & (rng.random(n) < PORT_CHANCE)
+        has_planet = eligible & (rng.random(n) < PLANET_CHANCE)
+        ports = int(has_port.sum())
+        planets = int(has_planet.sum())
+
+        port_row = np.full(n, -1, dtype=np.int64)
+        port_row[has_port] = np.arange(ports)
+        planet_row = np.full(n, -1, dtype=np.int64)
+        planet_row[has_planet] = np.arange(planets)
+
+        lo, hi = LEVEL_RANGE
+        self.offsets = _to_array("i", offsets)
+        self.neighbor_rows = _to_array("i", cols)
+        self.types = _to_array("B", types)
+        self.port_row = _to_array("i", port_row)
+        self.planet_row = _to_array("i", planet_row)
+        self.port_levels = _to_array("B", rng.integers(lo, hi, size=(ports, len(COMMODITIES)), endpoint=True))
+        self.port_class = _to_array("B", rng.choice(list(PORT_TYPES), size=ports))
+        # Names are stored as (prefix, suffix) index pairs.
+        self.port_names = _to_array("B", rng.integers(0, [len(PORT_PREFIXES), len(PORT_SUFFIXES)], size=(ports, 2)))
+        self.planet_names = _to_array("B", rng.integers(0, [len(PLANET_PREFIXES), len(PLANET_SUFFIXES)], size=(planets, 2)))
+
+    # ----------------------------------------------------------
+    # Stdlib Generation
+    # ----------------------------------------------------------
+
+    def _generate_stdlib(self, seed):
+        rng = random.Random(seed)
+        n = self.num_sectors
+
+        extra = {}
+        for _ in range(extra_link_count(n)):
+            a = rng.randint(0, n - 1)
+            b = rng.randint(0, n - 1)
+            if a != b:
+                extra.setdefault(a, []).append(b)
+                extra.setdefault(b, []).append(a)
+
+        offsets = array("i", [0])
+        neighbor_rows = array("i")
+        for row in range(n):
+            links = {(row - 1) % n, (row + 1) % n}
+            links.update(extra.get(row, ()))
+            neighbor_rows.extend(sorted(links))
+            offsets.append(len(neighbor_rows))
+
+        types = array("B", bytes(n))
+        for row in range(min(FEDSPACE_SECTORS, n)):
+            types[row] = FEDSPACE
+        if n >= STARDOCK_SECTOR:
+            types[STARDOCK_SECTOR - 1] = STARDOCK
+        normal = [row for row in range(n) if types[row] == NORMAL]
+        for row in rng.sample(normal, min(pirate_sector_count(n), len(normal))):
+            types[row] = PIRATE
+        for row in range(n):
+            if types[row] == NORMAL and offsets[row + 1] - offsets[row] == 1:
+                types[row] = DEADEND
+
+        port_row = array("i", [-1]) * n
+        planet_row = array("i", [-1]) * n
+        ports = planets = 0
+        for row in range(n):
+            if types[row] == STARDOCK:
+                continue
+            if rng.random() < PORT_CHANCE:
+                port_row[row] = ports
+                ports += 1
+            if rng.random() < PLANET_CHANCE:
+                planet_row[row] = planets
+                planets += 1
+
+        lo, hi = LEVEL_RANGE
+        classes = list(PORT_TYPES)
+        self.offsets = offsets
+        self.neighbor_rows = neighbor_rows
+        self.types = types
+        self.port_row = port_row
+        self.planet_row = planet_row
+        self.port_levels = array("B", (rng.randint(lo, hi) for _ in range(ports * len(COMMODITIES))))
+        self.port_class = array("B", (rng.choice(classes) for _ in range(ports)))
+        self.port_names = _random_name_parts(rng, ports, PORT_PREFIXES, PORT_SUFFIXES)
+        self.planet_names = _random_name_parts(rng, planets, PLANET_PREFIXES, PLANET_SUFFIXES)
+
+    # ----------------------------------------------------------
+    # Snapshot Interface (see snapshot.py)
+    # ----------------------------------------------------------
+
+    def sector_id(self, row):
+        return row + 1
+
+    def sector_ids(self):
+        return iter(range(1, self.num_sectors + 1))
+
+    def row_of(self, sid):
+        """Row number for a sector id, or None if it isn't in the galaxy."""
+        if isinstance(sid, int) and 1 <= sid <= self.num_sectors:
+            return sid - 1
+        return None
+
+    def sector_info(self, row):
+        """One sector as the dict Galaxy.sector_to_dict() would produce."""
+        sid = row + 1
+        sector_type = SECTOR_TYPES[self.types[row]]
+        lanes = self.neighbor_rows[self.offsets[row]:self.offsets[row + 1]]
+        port_row = self.port_row[row]
+        planet_row = self.planet_row[row]
+        return {
+            "id": sid,
+            "neighbors": [r + 1 for r in lanes],
+            "type": sector_type,
+            "has_pirates": sector_type == "PIRATE",
+            "port": self.port_info(port_row) if port_row >= 0 else None,
+            "planet": self.planet_info(planet_row, sid) if planet_row >= 0 else None,
+        }
+
+    def port_info(self, row):
+        """Port dict for Port.from_dict(); prices are derived from levels."""
+        k = len(COMMODITIES)
+        return {
+            "name": _name(self.port_names, row, PORT_PREFIXES, PORT_SUFFIXES),
+            "type_id": self.port_class[row],
+            "commodity_levels": dict(zip(COMMODITIES, self.port_levels[row * k:(row + 1) * k])),
+        }
+
+    def planet_info(self, row, sid):
+        return {
+            "sector_id": sid,
+            "name": _name(self.planet_names, row, PLANET_PREFIXES, PLANET_SUFFIXES),
+            "goods": dict.fromkeys(COMMODITIES, 0),
+            "treasury": 0,
+            "production_rates": dict.fromkeys(COMMODITIES, 1),
+            "last_production_turn": 0,
+        }
+
+    def lane_index(self):
+        """LaneIndex straight from the generated CSR table."""
+        return LaneIndex(array("i", range(1, self.num_sectors + 1)), self.offsets, self.neighbor_rows)
+
+    def type_counts(self):
+        """{sector type: number of sectors}, without building any sector."""
+        return {name: self.types.count(code) for code, name in enumerate(SECTOR_TYPES)}
+
+
+def _to_array(typecode, values):
+    """Copy a NumPy array into a stdlib array (one bulk byte copy)."""
+    out = array(typecode)
+    out.frombytes(np.ascontiguousarray(values, dtype=typecode).tobytes())
+    return out
+
+
+def _random_name_parts(rng, count, prefixes, suffixes):
+    """(prefix, suffix) index pairs for `count` random names, flattened."""
+    parts = array("B")
+    for _ in range(count):
+        parts.append(rng.randrange(len(prefixes)))
+        parts.append(rng.randrange(len(suffixes)))
+    return parts
+
+
+def _name(parts, row, prefixes, suffixes):
+    return f"{prefixes[parts[2 * row]]} {suffixes[parts[2 * row + 1]]}"
@@ -0,0 +1,131 @@
+"""Incremental stream decoding for both packet codecs.
+
+A socket hands over arbitrary fragments: half a frame, or several frames run
+together. FrameDecoder buffers whatever arrives and yields each packet as
+soon as its last byte is in:
+
+    decoder = FrameDecoder(get_codec(CODEC_BINARY))
+    for packet in decoder.feed(chunk):
+        if is_heartbeat(packet):
+            ...
+
+Bytes are appended to one bytearray and parsed in place through memoryview
+slices. The read position only moves forward, so nothing is parsed twice: a
+binary frame header is decoded once and kept while its body arrives, and a
+JSON line is searched for its newline only from where the last search
+stopped. Consumed bytes are dropped in bulk once they make up at least half
+the buffer, so the cost of compaction is amortized over the bytes consumed.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from game.network.packets import (
+    FRAME_HEADER,
+    MAX_FRAME_BODY,
+    Codec,
+    decode_binary_body,
+    decode_packet,
+)
+
+
+class FrameDecoder:
+    """Turns a byte stream into packets for codec's framing.
+
+    Raises ValueError (from feed()'s iterator) on a malformed packet or one
+    longer than max_frame; the stream can't be resynchronized after that.
+    """
+
+    def __init__(self, codec: Codec, max_frame: int = MAX_FRAME_BODY):
+        self.codec = codec
+        self.max_frame = max_frame
+        self._buf = bytearray()
+        self._pos = 0                  # first unconsumed byte
+        self._scan = 0                 # JSON: newline search resumes here
+        self._header: Optional[Tuple[int, int, int]] = None   # binary: parsed, body pending
+
+    def __len__(self) -> int:
+        """Bytes received but not yet returned as packets."""
+
+        return len(self._buf) - self._pos
+
+    def set_codec(self, codec: Codec) -> None:
+        """Switch framing (after codec negotiation); buffered bytes are kept."""
+
+        if self._header is not None:
+            raise ValueError("Cannot switch codecs in the middle of a frame")
+        self.codec = codec
+        self._scan = self._pos
+
+    def feed(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        """Buffer data and iterate over every packet now complete.
+
+        The iterator is lazy, so the codec may be switched between packets.
+        Anything left unread stays buffered for the next feed().
+        """
+
+        self._buf += data
+        return self._drain()
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        try:
+            while True:
+                packet = self._next_binary() if self.codec.framed else self._next_line()
+                if packet is None:
+                    return
+                yield packet
+        finally:
+            self._compact()
+
+    def _next_binary(self) -> Optional[Dict[str, Any]]:
+        buf = self._buf
+        if self._header is None:
+            if len(buf) - self._pos < FRAME_HEADER.size:
+                return None
+            header = FRAME_HEADER.unpack_from(buf, self._pos)
+            if header[0] > self.max_frame:
+                raise ValueError("Packet body exceeds maximum frame size")
+            self._pos += FRAME_HEADER.size
+            self._header = header
+
+        length, type_id, flags = self._header
+        if len(buf) - self._pos < length:
+            return None
+        with memoryview(buf) as view:
+            body = view[self._pos:self._pos + length]
+            try:
+                packet = decode_binary_body(type_id, flags, body)
+            finally:
+                body.release()
+        self._pos += length
+        self._header = None
+        return packet
+
+    def _next_line(self) -> Optional[Dict[str, Any]]:
+        buf = self._buf
+        end = buf.find(b"\n", self._scan)
+        if end < 0:
+            self._scan = len(buf)
+            if len(buf) - self._pos > self.max_frame:
+                raise ValueError("Packet body exceeds maximum frame size")
+            return None
+        if end - self._pos > self.max_frame:
+            raise ValueError("Packet body exceeds maximum frame size")
+        with memoryview(buf) as view:
+            line = view[self._pos:end]
+            try:
+                text = str(line, "utf-8")
+            except UnicodeDecodeError as exc:
+                raise ValueError("Packet is not valid UTF-8") from exc
+            finally:
+                line.release()
+        self._pos = self._scan = end + 1
+        return decode_packet(text)
+
+    def _compact(self) -> None:
+        pos = self._pos
+        if pos and pos * 2 >= len(self._buf):
+            del self._buf[:pos]
+            self._pos = 0
+            self._scan -= pos
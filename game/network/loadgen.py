@@ -0,0 +1,194 @@
+"""Scripted localhost clients for load-testing the multiplayer server.
+
+Run from the repository root, against a running server:
+
+    python -m game.network.loadgen --clients 50 --commands 200 --codec binary
+
+or with --spawn to host a server in the same process on a free port. Each
+client connects, negotiates a codec, then drives a mix of PLAYER_MOVE
+packets, PLAYER_COMMAND scans, chat and heartbeats while answering the
+server's pings. It reports per-command round-trip latency and throughput,
+plus the server's SECTOR_UPDATE fan-out totals when it hosts the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from game.network.packets import (
+    CHAT_MESSAGE,
+    CODEC_BINARY,
+    CODEC_JSON,
+    COMMAND_RESULT,
+    HEARTBEAT_PING,
+    HEARTBEAT_PONG,
+    PLAYER_COMMAND,
+    PLAYER_CONNECT,
+    PLAYER_DISCONNECT,
+    PLAYER_MOVE,
+    get_codec,
+)
+from game.network.server import DEFAULT_HOST, DEFAULT_PORT, GameServer, frame_packet, read_packet
+
+
+class LoadStats:
+    """Totals shared by every scripted client."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.received: Counter = Counter()
+        self.errors = 0
+
+
+async def run_client(
+    index: int,
+    host: str,
+    port: int,
+    codec_name: str,
+    commands: int,
+    rng: random.Random,
+    stats: LoadStats,
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    json_codec = get_codec(CODEC_JSON)
+    writer.write(frame_packet(json_codec, PLAYER_CONNECT, {"name": f"Bot {index}", "codecs": [codec_name]}))
+    hello = (await read_packet(reader, json_codec))["payload"]
+    codec = get_codec(hello["codec"])
+    state = dict(hello)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def listen() -> None:
+        try:
+            while True:
+                packet = await read_packet(reader, codec)
+                stats.received[packet["type"]] += 1
+                if packet["type"] == HEARTBEAT_PING and not writer.is_closing():
+                    writer.write(frame_packet(codec, HEARTBEAT_PONG, packet["payload"]))
+                elif packet["type"] == COMMAND_RESULT:
+                    await results.put(packet["payload"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            await results.put(None)
+
+    listener = asyncio.create_task(listen())
+    try:
+        for seq in range(commands):
+            roll = rng.random()
+            if roll < 0.1:
+                # Fire-and-forget traffic; no COMMAND_RESULT comes back.
+                writer.write(frame_packet(codec, HEARTBEAT_PING, {"seq": seq, "sent_at": time.time()}))
+                continue
+            if roll < 0.15:
+                writer.write(frame_packet(codec, CHAT_MESSAGE, {"text": f"bot {index} says hi"}))
+                continue
+
+            started = time.perf_counter()
+            if roll < 0.75 and state["neighbors"]:
+                writer.write(frame_packet(codec, PLAYER_MOVE, {
+                    "player_id": hello["player_id"],
+                    "from_sector": state["sector"],
+                    "to_sector": rng.choice(state["neighbors"]),
+                }))
+            else:
+                writer.write(frame_packet(codec, PLAYER_COMMAND, {"command": rng.choice(["scan", "cargo", "wait"])}))
+            await writer.drain()
+
+            result = await results.get()
+            if result is None:
+                stats.errors += 1
+                return
+            stats.latencies.append(time.perf_counter() - started)
+            state.update(result)
+            if result["game_over"]:
+                return
+
+        writer.write(frame_packet(codec, PLAYER_DISCONNECT, {}))
+        await writer.drain()
+    finally:
+        listener.cancel()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def run_load(
+    clients: int,
+    commands: int,
+    codec_name: str,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    spawn: bool = False,
+    num_sectors: int = 100,
+    seed: Optional[int] = None,
+) -> Dict[str, float]:
+    server = None
+    if spawn:
+        server = GameServer(num_sectors=num_sectors, seed=seed)
+        await server.start(host, 0)
+        port = server.port
+
+    stats = LoadStats()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    try:
+        outcomes = await asyncio.gather(
+            *(
+                run_client(i, host, port, codec_name, commands, random.Random(rng.random()), stats)
+                for i in range(clients)
+            ),
+            return_exceptions=True,
+        )
+    finally:
+        if server is not None:
+            await server.close()
+    elapsed = time.perf_counter() - started
+    stats.errors += sum(isinstance(o, BaseException) for o in outcomes)
+
+    lat = sorted(stats.latencies) or [0.0]
+    report = {
+        "clients": clients,
+        "codec": codec_name,
+        "round_trips": len(stats.latencies),
+        "elapsed_s": elapsed,
+        "round_trips_per_s": len(stats.latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(lat) * 1000,
+        "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000,
+        "packets_received": sum(stats.received.values()),
+        "errors": stats.errors,
+    }
+    if server is not None:
+        report["update_ticks"] = server.updates.tick
+        report["update_messages"] = server.updates.total_messages
+        report["update_bytes"] = server.updates.total_bytes
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="TW2025 multiplayer load generator")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--commands", type=int, default=100)
+    parser.add_argument("--codec", choices=[CODEC_JSON, CODEC_BINARY], default=CODEC_BINARY)
+    parser.add_argument("--spawn", action="store_true", help="host a server in this process")
+    parser.add_argument("--sectors", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        args.clients, args.commands, args.codec, args.host, args.port,
+        spawn=args.spawn, num_sectors=args.sectors, seed=args.seed,
+    ))
+    for key, value in report.items():
+        print(f"{key:<18} {value:.2f}" if isinstance(value, float) else f"{key:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
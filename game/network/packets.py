@@ -1,9 +1,14 @@
-"""JSON-based packet helpers for the real-time multiplayer game network layer."""
+"""Packet helpers for the real-time multiplayer game network layer.
+
+Two codecs share one packet shape ({"type": ..., "payload": {...}}): the
+original JSON text codec and a length-prefixed binary codec for hot traffic.
+"""
 
 from __future__ import annotations
 
 import json
-from typing import Any, Dict
+import struct
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Union
 
 PLAYER_CONNECT = "PLAYER_CONNECT"
 PLAYER_DISCONNECT = "PLAYER_DISCONNECT"
@@ -12,6 +17,8 @@ SECTOR_UPDATE = "SECTOR_UPDATE"
 CHAT_MESSAGE = "CHAT_MESSAGE"
 HEARTBEAT_PING = "HEARTBEAT_PING"
 HEARTBEAT_PONG = "HEARTBEAT_PONG"
+PLAYER_COMMAND = "PLAYER_COMMAND"
+COMMAND_RESULT = "COMMAND_RESULT"
 
 
 def encode_packet(packet_type: str, payload: Dict[str, Any]) -> str:
@@ -73,3 +80,221 @@ def is_heartbeat(packet_dict: Dict[str, Any]) -> bool:
     """Return True if the packet is a heartbeat ping/pong."""
 
     return packet_dict.get("type") in {HEARTBEAT_PING, HEARTBEAT_PONG}
+
+
+# ---------------------------------------------------------------------------
+# Binary codec
+#
+# Frame layout (network byte order):
+#     u32 body length | u8 packet type id | u8 flags | body
+#
+# PLAYER_MOVE and heartbeat payloads that hold exactly their fixed fields are
+# struct-packed. Any other payload, or one whose values don't fit the fixed
+# layout, is carried as a compact JSON object with FLAG_JSON_BODY set.
+# ---------------------------------------------------------------------------
+
+CODEC_JSON = "json"
+CODEC_BINARY = "binary"
+
+PACKET_TYPE_IDS = {
+    PLAYER_CONNECT: 1,
+    PLAYER_DISCONNECT: 2,
+    PLAYER_MOVE: 3,
+    SECTOR_UPDATE: 4,
+    CHAT_MESSAGE: 5,
+    HEARTBEAT_PING: 6,
+    HEARTBEAT_PONG: 7,
+    PLAYER_COMMAND: 8,
+    COMMAND_RESULT: 9,
+}
+PACKET_TYPES = {type_id: name for name, type_id in PACKET_TYPE_IDS.items()}
+
+FRAME_HEADER = struct.Struct("!IBB")
+FLAG_JSON_BODY = 0x01
+MAX_FRAME_BODY = 1024 * 1024
+
+_HEARTBEAT_LAYOUT = (("seq", int), ("sent_at", float)), struct.Struct("!Id")
+FIXED_LAYOUTS = {
+    PLAYER_MOVE: (
+        (("player_id", int), ("from_sector", int), ("to_sector", int)),
+        struct.Struct("!III"),
+    ),
+    HEARTBEAT_PING: _HEARTBEAT_LAYOUT,
+    HEARTBEAT_PONG: _HEARTBEAT_LAYOUT,
+}
+
+
+def _pack_fixed(packet_type: str, payload: Dict[str, Any]) -> Optional[bytes]:
+    """Struct-pack payload if it matches packet_type's fixed layout exactly."""
+
+    layout = FIXED_LAYOUTS.get(packet_type)
+    if layout is None:
+        return None
+    fields, body = layout
+    if len(payload) != len(fields):
+        return None
+    values = []
+    for name, kind in fields:
+        value = payload.get(name)
+        if not isinstance(value, kind) or isinstance(value, bool):
+            return None
+        values.append(value)
+    try:
+        return body.pack(*values)
+    except struct.error:  # out of range for the fixed field
+        return None
+
+
+def encode_binary_packet(packet_type: str, payload: Dict[str, Any]) -> bytes:
+    """Serialize a packet to one length-prefixed binary frame.
+
+    Args:
+        packet_type: The packet type identifier.
+        payload: A mapping containing the packet payload.
+
+    Returns:
+        The frame bytes, header included.
+
+    Raises:
+        ValueError: If required fields are missing or invalid, or the packet
+            type has no binary type id.
+    """
+
+    if not packet_type or not isinstance(packet_type, str):
+        raise ValueError("packet_type must be a non-empty string")
+    if payload is None or not isinstance(payload, dict):
+        raise ValueError("payload must be a dictionary")
+
+    type_id = PACKET_TYPE_IDS.get(packet_type)
+    if type_id is None:
+        raise ValueError(f"Unknown packet type for binary codec: {packet_type}")
+
+    flags = 0
+    body = _pack_fixed(packet_type, payload)
+    if body is None:
+        flags = FLAG_JSON_BODY
+        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(body) > MAX_FRAME_BODY:
+        raise ValueError("Packet body exceeds maximum frame size")
+
+    return FRAME_HEADER.pack(len(body), type_id, flags) + body
+
+
+def decode_binary_body(type_id: int, flags: int, body: bytes) -> Dict[str, Any]:
+    """Decode the body of a frame whose header has already been read.
+
+    Raises:
+        ValueError: If the type id is unknown or the body is malformed.
+    """
+
+    packet_type = PACKET_TYPES.get(type_id)
+    if packet_type is None:
+        raise ValueError(f"Unknown binary packet type id: {type_id}")
+
+    if flags & FLAG_JSON_BODY:
+        try:
+            payload = json.loads(bytes(body).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ValueError("Invalid JSON packet body") from exc
+        if not isinstance(payload, dict):
+            raise ValueError("Packet missing valid 'payload' field")
+        return {"type": packet_type, "payload": payload}
+
+    layout = FIXED_LAYOUTS.get(packet_type)
+    if layout is None:
+        raise ValueError(f"{packet_type} has no fixed binary layout")
+    fields, struct_ = layout
+    if len(body) != struct_.size:
+        raise ValueError(f"{packet_type} body must be {struct_.size} bytes")
+    values = struct_.unpack(body)
+    return {"type": packet_type, "payload": {name: value for (name, _), value in zip(fields, values)}}
+
+
+def decode_binary_packet(frame: bytes) -> Dict[str, Any]:
+    """Parse one complete binary frame into a packet dictionary.
+
+    Args:
+        frame: Header and body of exactly one frame.
+
+    Returns:
+        A packet dictionary with "type" and "payload" keys, the same shape
+        decode_packet() returns.
+
+    Raises:
+        ValueError: If the frame is truncated, oversized or malformed.
+    """
+
+    if not isinstance(frame, (bytes, bytearray, memoryview)):
+        raise ValueError("Binary packet must be bytes")
+    if len(frame) < FRAME_HEADER.size:
+        raise ValueError("Binary packet is shorter than its header")
+
+    length, type_id, flags = FRAME_HEADER.unpack_from(frame)
+    if length > MAX_FRAME_BODY:
+        raise ValueError("Packet body exceeds maximum frame size")
+    if len(frame) != FRAME_HEADER.size + length:
+        raise ValueError("Binary packet length does not match its header")
+
+    return decode_binary_body(type_id, flags, memoryview(frame)[FRAME_HEADER.size:])
+
+
+# ---------------------------------------------------------------------------
+# Codec negotiation
+#
+# Clients list the codecs they speak in PLAYER_CONNECT's "codecs" field
+# (always sent with the JSON codec); the server answers with the chosen one
+# and both sides switch to it. Clients that send no list get JSON.
+# ---------------------------------------------------------------------------
+
+
+class Codec(NamedTuple):
+    """A matched encode/decode pair. Binary frames carry their own length."""
+
+    name: str
+    encode: Callable[[str, Dict[str, Any]], Union[str, bytes]]
+    decode: Callable[[Any], Dict[str, Any]]
+    framed: bool
+
+
+CODECS = {
+    CODEC_JSON: Codec(CODEC_JSON, encode_packet, decode_packet, False),
+    CODEC_BINARY: Codec(CODEC_BINARY, encode_binary_packet, decode_binary_packet, True),
+}
+
+SERVER_CODEC_PREFERENCE = (CODEC_BINARY, CODEC_JSON)
+
+
+def negotiate_codec(
+    offered: Optional[Sequence[str]],
+    preference: Sequence[str] = SERVER_CODEC_PREFERENCE,
+) -> str:
+    """Pick the first codec in preference order that the peer offered.
+
+    Falls back to JSON when the peer offered nothing usable.
+
+    Raises:
+        ValueError: If offered is not None or a list/tuple of codec names.
+    """
+
+    if offered is None:
+        offered = ()
+    if not isinstance(offered, (list, tuple)) or not all(isinstance(name, str) for name in offered):
+        raise ValueError("codecs must be a list of codec names")
+    offered_set = set(offered)
+    for name in preference:
+        if name in offered_set and name in CODECS:
+            return name
+    return CODEC_JSON
+
+
+def get_codec(name: str) -> Codec:
+    """Return the codec registered under name.
+
+    Raises:
+        ValueError: If no such codec exists.
+    """
+
+    try:
+        return CODECS[name]
+    except KeyError as exc:
+        raise ValueError(f"Unknown codec: {name}") from exc
@@ -0,0 +1,120 @@
+"""Per-tick, interest-managed SECTOR_UPDATE fan-out for the multiplayer server.
+
+Changes are recorded by sector id as they happen and coalesced: however many
+times a sector changes during a tick, it is described once, from its state at
+flush time. Each client only hears about its current sector and that
+sector's neighbors (Sector.neighbors), in one batched SECTOR_UPDATE:
+
+    {"tick": 42, "sectors": [{"sector": 7, "ships": [...], ...}, ...]}
+
+Sectors the shared Galaxy's ChangeTracker saw modified (port trades, planet
+deposits, pirates defeated) are folded in automatically at each flush.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set
+
+from game.network.packets import SECTOR_UPDATE
+
+
+@dataclass(frozen=True)
+class TickStats:
+    """What one flush recorded and sent."""
+
+    tick: int
+    records: int      # record() calls plus tracker hits this tick
+    sectors: int      # distinct sectors after coalescing
+    messages: int     # batched packets queued (at most one per client)
+    bytes: int        # encoded bytes queued
+
+
+class SectorUpdateAggregator:
+    """Collects sector changes for a tick and fans them out by interest."""
+
+    def __init__(self, galaxy):
+        self.galaxy = galaxy
+        self.tick = 0
+        self.pending: Set[int] = set()
+        self.records = 0
+        self.last = TickStats(0, 0, 0, 0, 0)
+        self.total_messages = 0
+        self.total_bytes = 0
+
+    def record(self, sid) -> None:
+        """Note that sector sid changed; repeats within a tick coalesce."""
+
+        if sid is not None:
+            self.pending.add(sid)
+            self.records += 1
+
+    def interest(self, sid) -> Set[int]:
+        """Sectors a ship in sid is told about: sid and its neighbors."""
+
+        sec = self.galaxy.get_sector(sid)
+        if sec is None:
+            return set()
+        return {sid} | sec.neighbors
+
+    def sector_state(self, sid: int, occupants: Dict[int, List[int]]) -> Dict[str, Any]:
+        sec = self.galaxy.get_sector(sid)
+        state = {
+            "sector": sid,
+            "ships": occupants.get(sid, []),
+            "has_pirates": sec.has_pirates,
+        }
+        if sec.port:
+            state["port"] = {
+                "prices": dict(sec.port.prices),
+                "levels": dict(sec.port.commodity_levels),
+            }
+        return state
+
+    def flush(self, connections: Iterable[Any]) -> TickStats:
+        """Send this tick's batches to connections; returns the tick's stats.
+
+        Each connection needs .location and .send_nowait(packet_type,
+        payload) returning the number of bytes it queued.
+        """
+
+        self.tick += 1
+        connections = list(connections)
+
+        # Fold in whatever the shared change tracker saw this tick.
+        # Player keys are per-ship strings; sector keys are ints.
+        for key in self.galaxy.changes.drain():
+            if isinstance(key, int):
+                self.record(key)
+
+        dirty, self.pending = self.pending, set()
+        records, self.records = self.records, 0
+        messages = sent = 0
+
+        if dirty:
+            occupants: Dict[int, List[int]] = defaultdict(list)
+            for conn in connections:
+                occupants[conn.location].append(conn.player_id)
+
+            states: Dict[int, Dict[str, Any]] = {}
+            for conn in connections:
+                visible = self.interest(conn.location)
+                changed = visible & dirty if len(visible) < len(dirty) else dirty & visible
+                if not changed:
+                    continue
+                batch = []
+                for sid in sorted(changed):
+                    state = states.get(sid)
+                    if state is None:
+                        state = states[sid] = self.sector_state(sid, occupants)
+                    batch.append(state)
+                size = conn.send_nowait(SECTOR_UPDATE, {"tick": self.tick, "sectors": batch})
+                if size:   # 0: the client is closed or was just dropped
+                    messages += 1
+                    sent += size
+
+        self.total_messages += messages
+        self.total_bytes += sent
+        self.last = TickStats(self.tick, records, len(dirty), messages, sent)
+        return self.last
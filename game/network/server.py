@@ -0,0 +1,445 @@
+"""Asyncio TCP server hosting one shared galaxy for many ship sessions.
+
+Run from the repository root:
+
+    python -m game.network.server [--host 127.0.0.1] [--port 2025] [--sectors 100]
+
+Every connection opens with a JSON PLAYER_CONNECT line listing the codecs the
+client speaks; the server answers with its choice and both sides switch. JSON
+packets travel one per line, binary packets as length-prefixed frames, and
+sessions decode them incrementally with framing.FrameDecoder.
+
+Each session is a headless (fast) TW25Game seated in the shared Galaxy. Its
+commands run through TW25Game.execute with scripted input, so nothing blocks
+the event loop. Each connection has its own reader, writer and heartbeat task,
+and outgoing packets pass through a bounded write queue. Sector changes are
+batched per tick by a SectorUpdateAggregator (see sector_updates.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from galaxy import Galaxy
+from rng import RandomStreams
+from ship import Ship
+from tw25 import TW25Game
+
+from game.network.packets import (
+    CHAT_MESSAGE,
+    CODEC_JSON,
+    COMMAND_RESULT,
+    FRAME_HEADER,
+    HEARTBEAT_PING,
+    HEARTBEAT_PONG,
+    MAX_FRAME_BODY,
+    PLAYER_COMMAND,
+    PLAYER_CONNECT,
+    PLAYER_DISCONNECT,
+    PLAYER_MOVE,
+    Codec,
+    decode_binary_body,
+    decode_packet,
+    get_codec,
+    is_heartbeat,
+    negotiate_codec,
+)
+from game.network.framing import FrameDecoder
+from game.network.sector_updates import SectorUpdateAggregator
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 2025
+
+HANDSHAKE_TIMEOUT = 10.0
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 15.0
+WRITE_QUEUE_SIZE = 256
+TICK_INTERVAL = 0.1
+READ_CHUNK = 64 * 1024
+
+# Commands that need a local terminal, touch files on the server or would
+# stall the shared event loop.
+SERVER_ONLY_COMMANDS = {
+    "map", "debug all", "debug diameter", "save", "load", "q", "quit", "exit", "clear", "cls",
+}
+
+
+# ---------------------------------------------------------------------------
+# Stream helpers (shared with the load generator)
+# ---------------------------------------------------------------------------
+
+
+def frame_packet(codec: Codec, packet_type: str, payload: Dict[str, Any]) -> bytes:
+    """Encode a packet for the stream: a binary frame or one JSON line."""
+
+    data = codec.encode(packet_type, payload)
+    if codec.framed:
+        return data
+    return (data + "\n").encode("utf-8")
+
+
+async def read_packet(reader: asyncio.StreamReader, codec: Codec) -> Dict[str, Any]:
+    """Read exactly one packet in codec's framing.
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the stream.
+        ValueError: If the packet is malformed or too large.
+    """
+
+    if codec.framed:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        length, type_id, flags = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_BODY:
+            raise ValueError("Packet body exceeds maximum frame size")
+        body = await reader.readexactly(length) if length else b""
+        return decode_binary_body(type_id, flags, body)
+
+    line = await reader.readline()
+    if not line.endswith(b"\n"):
+        raise asyncio.IncompleteReadError(line, None)
+    try:
+        return decode_packet(line.decode("utf-8"))
+    except UnicodeDecodeError as exc:
+        raise ValueError("Packet is not valid UTF-8") from exc
+
+
+# ---------------------------------------------------------------------------
+# Connections
+# ---------------------------------------------------------------------------
+
+
+class Connection:
+    """One client socket: its session, codec, write queue and tasks."""
+
+    def __init__(self, server: "GameServer", reader, writer, player_id: int):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.player_id = player_id
+        self.codec = get_codec(CODEC_JSON)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=server.write_queue_size)
+        self.last_seen = time.monotonic()
+        self.game: Optional[TW25Game] = None
+        self.closed = False
+        self.close_reason = ""
+
+    @property
+    def location(self) -> Optional[int]:
+        return self.game.player.location if self.game else None
+
+    async def send(self, packet_type: str, payload: Dict[str, Any]) -> None:
+        """Queue a reply, waiting while this client's queue is full."""
+
+        if not self.closed:
+            await self.queue.put(frame_packet(self.codec, packet_type, payload))
+
+    def send_nowait(self, packet_type: str, payload: Dict[str, Any]) -> int:
+        """Queue a pushed packet; a client too slow to keep up is dropped.
+
+        Returns the number of bytes queued.
+        """
+
+        if self.closed:
+            return 0
+        data = frame_packet(self.codec, packet_type, payload)
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.close("write queue full", flush=False)
+            return 0
+        return len(data)
+
+    def close(self, reason: str = "", flush: bool = True) -> None:
+        """Stop accepting packets; the writer exits after what's queued.
+
+        With flush=False (or a full queue) pending packets are dropped.
+        """
+
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        if not flush or self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def write_loop(self) -> None:
+        """Flush queued packets, letting drain() apply socket backpressure."""
+
+        while True:
+            data = await self.queue.get()
+            if data is None or self.writer.is_closing():
+                break
+            self.writer.write(data)
+            # Coalesce whatever else is already queued into the same drain.
+            while not self.queue.empty():
+                data = self.queue.get_nowait()
+                if data is None:
+                    await self.writer.drain()
+                    return
+                self.writer.write(data)
+            await self.writer.drain()
+
+    async def heartbeat_loop(self) -> None:
+        for seq in itertools.count(1):
+            await asyncio.sleep(self.server.heartbeat_interval)
+            if time.monotonic() - self.last_seen > self.server.heartbeat_timeout:
+                self.close("heartbeat timeout")
+                self.reader.feed_eof()
+                return
+            self.send_nowait(HEARTBEAT_PING, {"seq": seq, "sent_at": time.time()})
+
+    async def read_loop(self) -> None:
+        decoder = FrameDecoder(self.codec)
+        while not self.closed:
+            data = await self.reader.read(READ_CHUNK)
+            if not data:
+                return   # peer closed the stream
+            self.last_seen = time.monotonic()
+            for packet in decoder.feed(data):
+                if is_heartbeat(packet):
+                    if packet["type"] == HEARTBEAT_PING:
+                        self.send_nowait(HEARTBEAT_PONG, packet["payload"])
+                    continue
+                await self.server.dispatch(self, packet)
+                if self.closed:
+                    break
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class GameServer:
+    """Hosts one shared Galaxy; every connection flies its own Ship in it."""
+
+    def __init__(
+        self,
+        galaxy: Optional[Galaxy] = None,
+        num_sectors: int = 100,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+        write_queue_size: int = WRITE_QUEUE_SIZE,
+        tick_interval: float = TICK_INTERVAL,
+        seed: Optional[int] = None,
+    ):
+        # Galaxy and every session draw from their own stream of `seed`.
+        self.streams = RandomStreams(seed)
+        if galaxy is None:
+            galaxy = Galaxy(num_sectors, rng=self.streams.stream("galaxy"))
+        self.galaxy = galaxy
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.write_queue_size = write_queue_size
+        self.tick_interval = tick_interval
+        self.updates = SectorUpdateAggregator(self.galaxy)
+        self.connections: Dict[int, Connection] = {}
+        self._handlers: set = set()
+        self._player_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ticker: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self._server = await asyncio.start_server(self.handle_client, host, port)
+        self._ticker = asyncio.create_task(self.tick_loop())
+        return self._server
+
+    async def tick_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            self.updates.flush(self.connections.values())
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for conn in list(self.connections.values()):
+            conn.close("server shutting down")
+            conn.reader.feed_eof()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    # -------------------------------------------------------------------
+    # Session lifecycle
+    # -------------------------------------------------------------------
+
+    def new_session(self, player_id: int, name: Optional[str]) -> TW25Game:
+        ship = Ship(name=name) if name else Ship()
+        return TW25Game(
+            galaxy=self.galaxy,
+            player=ship,
+            show_intro=False,
+            seed=self.streams.spawn(player_id).seed,
+            fast=True,
+        )
+
+    async def handle_client(self, reader, writer) -> None:
+        conn = Connection(self, reader, writer, next(self._player_ids))
+        tasks: List[asyncio.Task] = []
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            hello = await asyncio.wait_for(read_packet(reader, conn.codec), HANDSHAKE_TIMEOUT)
+            if hello["type"] != PLAYER_CONNECT:
+                return
+
+            payload = hello["payload"]
+            codec_name = negotiate_codec(payload.get("codecs"))
+            conn.game = self.new_session(conn.player_id, payload.get("name"))
+            conn.send_nowait(PLAYER_CONNECT, {
+                "player_id": conn.player_id,
+                "codec": codec_name,
+                "heartbeat_interval": self.heartbeat_interval,
+                **self.session_state(conn),
+            })
+            conn.codec = get_codec(codec_name)
+            self.connections[conn.player_id] = conn
+
+            tasks.append(asyncio.create_task(conn.write_loop()))
+            tasks.append(asyncio.create_task(conn.heartbeat_loop()))
+            self.updates.record(conn.location)
+            await conn.read_loop()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            # The peer is gone unless we closed first; don't write to it.
+            conn.close("disconnected", flush=False)
+            if self.connections.pop(conn.player_id, None) is not None:
+                self.updates.record(conn.location)
+            # Give the writer a chance to flush its final packets.
+            if tasks:
+                await asyncio.wait(tasks[:1], timeout=1.0)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            self._handlers.discard(handler)
+
+    def session_state(self, conn: Connection) -> Dict[str, Any]:
+        sec = conn.game.current_sector()
+        return {
+            "sector": sec.id,
+            "neighbors": sorted(sec.neighbors),
+        }
+
+    # -------------------------------------------------------------------
+    # Packet handling
+    # -------------------------------------------------------------------
+
+    async def dispatch(self, conn: Connection, packet: Dict[str, Any]) -> None:
+        packet_type = packet["type"]
+        payload = packet["payload"]
+
+        if packet_type == PLAYER_MOVE:
+            dest = payload.get("to_sector")
+            if payload.get("from_sector", conn.location) != conn.location:
+                await self.reject(conn, f"move {dest}", "You are no longer in that sector.")
+            else:
+                await self.run_command(conn, f"move {dest}")
+
+        elif packet_type == PLAYER_COMMAND:
+            cmd = payload.get("command")
+            inputs = payload.get("inputs", [])
+            if not isinstance(cmd, str) or not isinstance(inputs, list):
+                await self.reject(conn, "", "Malformed command.")
+            else:
+                await self.run_command(conn, cmd.strip().lower(), inputs)
+
+        elif packet_type == CHAT_MESSAGE:
+            text = str(payload.get("text", ""))[:500]
+            self.broadcast(CHAT_MESSAGE, {
+                "player_id": conn.player_id,
+                "name": conn.game.player.name,
+                "text": text,
+            })
+
+        elif packet_type == PLAYER_DISCONNECT:
+            conn.close("client disconnect", flush=False)
+            conn.reader.feed_eof()
+
+    async def reject(self, conn: Connection, cmd: str, message: str) -> None:
+        await conn.send(COMMAND_RESULT, {
+            "command": cmd,
+            "output": message,
+            "game_over": False,
+            **self.session_state(conn),
+        })
+
+    async def run_command(self, conn: Connection, cmd: str, inputs: Iterable[str] = ()) -> None:
+        game = conn.game
+        if cmd in SERVER_ONLY_COMMANDS or cmd.startswith("map "):
+            await self.reject(conn, cmd, f"{cmd.upper()} is not available in multiplayer.")
+            return
+
+        before = game.player.location
+        # execute() runs synchronously on the loop thread, so the stdout
+        # it captures is only this session's output.
+        result = game.execute(cmd, inputs)
+        over = result.game_over
+
+        await conn.send(COMMAND_RESULT, {
+            "command": cmd,
+            "output": result.output,
+            "game_over": over,
+            **self.session_state(conn),
+        })
+
+        after = game.player.location
+        if after != before:
+            self.updates.record(before)
+            self.updates.record(after)
+        if over:
+            conn.close("game over")
+            conn.reader.feed_eof()
+
+    # -------------------------------------------------------------------
+    # Fan-out
+    # -------------------------------------------------------------------
+
+    def broadcast(self, packet_type: str, payload: Dict[str, Any]) -> None:
+        for conn in list(self.connections.values()):
+            conn.send_nowait(packet_type, payload)
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    num_sectors: int = 100,
+    seed: Optional[int] = None,
+) -> None:
+    server = GameServer(num_sectors=num_sectors, seed=seed)
+    await server.start(host, port)
+    print(f"TW2025 server listening on {host}:{server.port} ({num_sectors} sectors)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="TW2025 multiplayer server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sectors", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port, args.sectors, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# journal.py
+# ============================================================
+# Dirty tracking and the incremental save journal for TW2025
+#
+#   - ChangeTracker: set of entity keys changed since the last save
+#   - Tracked: mixin for Ship / Sector / Port / Planet that reports
+#     attribute writes (and explicit mark_dirty() calls) to a tracker
+#   - SaveJournal: append-only JSON-lines file next to a save
+#     (savegame.json -> savegame.json.journal) holding one small
+#     delta record per save since the last full snapshot
+#
+# Sector, Port and Planet share their sector id as key, since a
+# delta always rewrites the whole sector record. The ship uses
+# PLAYER_KEY.
+# ============================================================
+
+import json
+import os
+
+PLAYER_KEY = "player"
+
+# Fold the journal back into a full snapshot after this many deltas,
+# or once the journal file grows past this many bytes.
+COMPACT_AFTER_ENTRIES = 50
+COMPACT_AFTER_BYTES = 4 * 1024 * 1024
+
+
+class ChangeTracker:
+    """Collects the keys of entities modified since the last drain()."""
+
+    def __init__(self):
+        self.dirty = set()
+
+    def touch(self, key):
+        self.dirty.add(key)
+
+    def drain(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def clear(self):
+        self.dirty.clear()
+
+
+class Tracked:
+    """
+    Mixin that reports public attribute writes to a ChangeTracker.
+    In-place edits (dict entries, set members) must call mark_dirty().
+    """
+
+    _tracker = None
+    _track_key = None
+
+    def track(self, tracker, key):
+        object.__setattr__(self, "_tracker", tracker)
+        object.__setattr__(self, "_track_key", key)
+
+    def mark_dirty(self):
+        if self._tracker is not None:
+            self._tracker.touch(self._track_key)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if self._tracker is not None and not name.startswith("_"):
+            self._tracker.touch(self._track_key)
+
+
+class SaveJournal:
+    """
+    Delta journal belonging to one snapshot. The first line names the
+    snapshot_id it extends; every later line is one delta record.
+    """
+
+    def __init__(self, save_filename, snapshot_id, entries=0):
+        self.path = journal_path(save_filename)
+        self.save_filename = save_filename
+        self.snapshot_id = snapshot_id
+        self.entries = entries
+
+    @classmethod
+    def start(cls, save_filename, snapshot_id):
+        """Begin an empty journal for a freshly written snapshot."""
+        journal = cls(save_filename, snapshot_id)
+        with open(journal.path, "w") as f:
+            f.write(json.dumps({"snapshot_id": snapshot_id}) + "\n")
+        return journal
+
+    def append(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.entries += 1
+
+    def needs_compaction(self):
+        if self.entries >= COMPACT_AFTER_ENTRIES:
+            return True
+        try:
+            return os.path.getsize(self.path) >= COMPACT_AFTER_BYTES
+        except OSError:
+            return True
+
+
+def journal_path(save_filename):
+    return save_filename + ".journal"
+
+
+def replay_journal(data, save_filename):
+    """
+    Apply every delta in save_filename's journal to snapshot `data`
+    (the dict from savefile.read_save). For a mapped snapshot,
+    data["galaxy"]["sectors"] may start empty; it then collects just
+    the sectors the journal overrides.
+
+    Returns (data, journal). `journal` is the SaveJournal to keep
+    appending to, or None when there is nothing safe to extend: no
+    journal, one written for a different snapshot, or one ending in a
+    torn line from an interrupted save. Deltas before a torn line are
+    still applied.
+    """
+    snapshot_id = data.get("snapshot_id")
+    try:
+        f = open(journal_path(save_filename))
+    except FileNotFoundError:
+        return data, None
+
+    entries = 0
+    clean = True
+    with f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError:
+            return data, None
+        if snapshot_id is None or header.get("snapshot_id") != snapshot_id:
+            return data, None
+
+        galaxy = data["galaxy"]
+        sectors = {int(sid): info for sid, info in galaxy["sectors"].items()}
+        galaxy["sectors"] = sectors
+
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                clean = False
+                break
+            data["turn"] = record["turn"]
+            data["time"] = record["time"]
+            data["day"] = record["day"]
+            galaxy["turn"] = record["galaxy_turn"]
+            if "player" in record:
+                data["player"] = record["player"]
+            for sid, info in record["sectors"].items():
+                sectors[int(sid)] = info
+            entries += 1
+
+    if not clean:
+        return data, None
+    return data, SaveJournal(save_filename, snapshot_id, entries)
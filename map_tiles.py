@@ -0,0 +1,503 @@
+# map_tiles.py
+# ============================================================
+# Headless level-of-detail map tiles for huge galaxies
+#
+# Cuts the galaxy map into a standard z/x/y pyramid of PNG tiles
+# that any static file server or slippy-map viewer can show (an
+# index.html for offline browsing is written alongside). What a
+# tile draws depends on how many sectors fall inside it:
+#   - density   many sectors: a heat map of sector types, each
+#               cell tinted by the mix of types in it
+#   - points    fewer: sectors as colored dots, with their lanes
+#   - labeled   few: dots with sector numbers and port / planet
+#               icons, like the MAP window
+#
+# Positions come from render_map's cached spring layout when the
+# galaxy is small enough for one. Larger galaxies are laid out
+# along a spiral in ring order: sector n+1 sits next to sector n,
+# so the base ring follows the spiral and random links cross it.
+#
+# Sectors are sorted along a quadtree (Morton) curve, so the ones
+# inside any tile are a single slice found by binary search.
+# Tiles render in parallel across a process pool through the Agg
+# canvas (no display needed) and are cached on disk under a key
+# of the lane topology and sector types: re-exports only draw
+# what is missing.
+#
+# Usage:
+#   python map_tiles.py [savefile] [--sectors 100000] [--seed 1]
+#                       [--max-zoom 6] [--workers 8] [--overview map.png]
+# ============================================================
+
+import argparse
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+import matplotlib.patches as mpatches
+
+from galaxygen import SECTOR_TYPES, GalaxyBlueprint
+from render_map import (
+    LABELED_MAP_MAX,
+    MAP_CACHE_DIR,
+    NORMAL_COLOR,
+    TYPE_COLORS,
+    galaxy_layout,
+    node_icon,
+    topology_hash,
+)
+
+TILE_CACHE_DIR = os.path.join(MAP_CACHE_DIR, "tiles")
+TILE_VERSION = 1
+TILE_SIZE = 256
+DPI = 100
+
+DEFAULT_MAX_ZOOM = 6
+MORTON_BITS = 16          # deepest zoom a tile can be cut at
+MARGIN = 0.02
+
+# Level of detail, by sectors inside the tile
+POINTS_MAX = 4000
+LABELS_MAX = 60
+DENSITY_CELLS = 64
+
+FLAG_PORT = 0x01
+FLAG_PLANET = 0x02
+
+TYPE_CODES = {name: code for code, name in enumerate(SECTOR_TYPES)}
+PALETTE = np.array([to_rgb(TYPE_COLORS.get(name, NORMAL_COLOR)) for name in SECTOR_TYPES])
+
+
+# ============================================================
+# SECTOR DATA + LAYOUT
+# ============================================================
+
+def sector_table(galaxy, lanes):
+    """
+    Per lane-index row: type code (galaxygen.SECTOR_TYPES) and
+    port / planet flags. Bulk-generated galaxies are read from
+    their arrays, so no sectors are built for it.
+    """
+    n = len(lanes)
+    snap = galaxy.snapshot
+    if isinstance(snap, GalaxyBlueprint):
+        types = np.frombuffer(snap.types, dtype=np.uint8).copy()
+        flags = np.where(np.frombuffer(snap.port_row, dtype=np.intc) >= 0, FLAG_PORT, 0)
+        flags |= np.where(np.frombuffer(snap.planet_row, dtype=np.intc) >= 0, FLAG_PLANET, 0)
+        flags = flags.astype(np.uint8)
+        # Sectors already built may have changed since generation.
+        sectors = galaxy.sectors.loaded.items()
+    else:
+        types = np.zeros(n, dtype=np.uint8)
+        flags = np.zeros(n, dtype=np.uint8)
+        sectors = galaxy.sectors.items()
+
+    for sid, sec in sectors:
+        if sid in lanes:
+            row = lanes.row(sid)
+            types[row] = TYPE_CODES.get(sec.type, 0)
+            flags[row] = (FLAG_PORT if sec.port else 0) | (FLAG_PLANET if sec.planet else 0)
+    return types, flags
+
+
+def spiral_layout(n):
+    """
+    n points filling the unit disc along an evenly spaced spiral,
+    in order, so consecutive points are neighbors.
+    """
+    r = np.sqrt((np.arange(n) + 0.5) / n)
+    step = math.sqrt(math.pi / n)
+    theta = np.cumsum(step / r)
+    return np.column_stack([r * np.cos(theta), r * np.sin(theta)])
+
+
+def _spread_bits(v):
+    v = np.asarray(v, dtype=np.uint64) & np.uint64(0xFFFF)
+    for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton(x, y):
+    """Quadtree key of tile / cell (x, y): the bits of x and y interleaved."""
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+# ============================================================
+# TILE SET
+# ============================================================
+
+class TileSet:
+    """
+    The map of one galaxy as a tile pyramid. Tile (z, x, y) covers
+    [x, x + 1] x [y, y + 1] / 2**z of the unit square, y pointing
+    down. Pass cache_dir=None for export_overview() only.
+    """
+
+    def __init__(self, galaxy, cache_dir=TILE_CACHE_DIR, tile_size=TILE_SIZE):
+        lanes = galaxy.lane_index()
+        self.tile_size = tile_size
+        self.ids = np.frombuffer(lanes.sector_ids, dtype=np.intc)
+        self.offsets = np.frombuffer(lanes.offsets, dtype=np.intc)
+        self.neighbor_rows = np.frombuffer(lanes.neighbor_rows, dtype=np.intc)
+        self.types, self.flags = sector_table(galaxy, lanes)
+
+        if len(self.ids) <= LABELED_MAP_MAX:
+            self.layout = "spring"
+            pos = galaxy_layout(galaxy)
+            xy = np.array([pos[int(sid)] for sid in self.ids], dtype=float)
+        else:
+            self.layout = "spiral"
+            xy = spiral_layout(len(self.ids))
+        self.xy = _normalize(xy)
+
+        cells = 1 << MORTON_BITS
+        q = np.minimum((self.xy * cells).astype(np.int64), cells - 1)
+        keys = morton(q[:, 0], q[:, 1])
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+        h = hashlib.blake2b(digest_size=12)
+        h.update(f"tiles-v{TILE_VERSION}:{tile_size}:{topology_hash(galaxy)}".encode())
+        h.update(self.types.tobytes())
+        h.update(self.flags.tobytes())
+        self.key = h.hexdigest()
+        self.directory = os.path.join(cache_dir, self.key) if cache_dir else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ----------------------------------------------------------
+    # Tile Geometry
+    # ----------------------------------------------------------
+
+    def tile_rows(self, z, x, y):
+        """Lane-index rows of the sectors inside tile (z, x, y)."""
+        shift = np.uint64(2 * (MORTON_BITS - z))
+        prefix = morton(x, y)
+        lo = np.searchsorted(self.keys, prefix << shift)
+        hi = np.searchsorted(self.keys, (prefix + np.uint64(1)) << shift)
+        return self.order[lo:hi]
+
+    def occupied_tiles(self, z):
+        """(x, y) of every tile at zoom z with at least one sector."""
+        side = 1 << z
+        t = np.minimum((self.xy * side).astype(np.int64), side - 1)
+        cells = np.unique(t[:, 0] * side + t[:, 1])
+        return [(int(c // side), int(c % side)) for c in cells]
+
+    def auto_max_zoom(self, cap=DEFAULT_MAX_ZOOM):
+        """Shallowest zoom whose average tile gets labels, at most `cap`."""
+        for z in range(cap):
+            if len(self) / len(self.occupied_tiles(z)) <= LABELS_MAX:
+                return z
+        return cap
+
+    def tile_path(self, z, x, y):
+        return os.path.join(self.directory, str(z), str(x), f"{y}.png")
+
+    # ----------------------------------------------------------
+    # Rendering
+    # ----------------------------------------------------------
+
+    def render_tile(self, z, x, y):
+        """Draw tile (z, x, y) unless it is cached; returns its path."""
+        path = self.tile_path(z, x, y)
+        if os.path.exists(path):
+            return path
+
+        rows = self.tile_rows(z, x, y)
+        size = 1.0 / (1 << z)
+        bbox = (x * size, y * size, size)
+
+        px = self.tile_size / DPI
+        fig = Figure(figsize=(px, px), dpi=DPI)
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor("black")
+        ax = fig.add_axes([0, 0, 1, 1])
+        _frame(ax, bbox)
+
+        if len(rows) > POINTS_MAX:
+            self._draw_density(ax, rows, bbox, DENSITY_CELLS, z)
+        else:
+            self._draw_points(ax, rows, labels=len(rows) <= LABELS_MAX)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fig.savefig(tmp, format="png", facecolor="black")
+        os.replace(tmp, path)
+        return path
+
+    def _draw_density(self, ax, rows, bbox, cells, z):
+        x0, y0, size = bbox
+        cell = np.clip(((self.xy[rows] - (x0, y0)) / size * cells).astype(np.int64), 0, cells - 1)
+        flat = cell[:, 1] * cells + cell[:, 0]
+
+        kinds = len(SECTOR_TYPES)
+        counts = np.bincount(
+            self.types[rows].astype(np.int64) * cells * cells + flat,
+            minlength=kinds * cells * cells,
+        ).reshape(kinds, cells * cells)
+        total = counts.sum(axis=0)
+
+        # Color: the cell's mix of sector types. Brightness: density
+        # relative to an even spread at this zoom, so tiles match.
+        mix = (counts.T @ PALETTE) / np.maximum(total, 1)[:, None]
+        even = max(1.0, len(self) / ((1 << z) ** 2 * cells * cells))
+        level = np.clip(np.log1p(total) / math.log1p(4 * even), 0, 1)
+        level[total > 0] = np.maximum(level[total > 0], 0.25)
+        image = (mix * level[:, None]).reshape(cells, cells, 3)
+
+        ax.imshow(image, extent=(x0, x0 + size, y0 + size, y0), interpolation="nearest", zorder=0)
+
+    def _draw_points(self, ax, rows, labels):
+        if not len(rows):
+            return
+
+        # Lanes of the sectors in this tile; lanes only passing
+        # through are left to the tiles at their ends.
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        src = np.repeat(rows, counts)
+        first = np.repeat(counts.cumsum() - counts, counts)
+        dst = self.neighbor_rows[np.repeat(starts, counts) + np.arange(counts.sum()) - first]
+        once = (src < dst) | ~np.isin(dst, rows)
+        segments = np.stack([self.xy[src[once]], self.xy[dst[once]]], axis=1)
+        ax.add_collection(LineCollection(
+            segments, colors="white", linewidths=1.0 if labels else 0.4, alpha=0.6, zorder=1,
+        ))
+
+        # Marker about half the typical spacing between sectors.
+        spacing = self.tile_size / math.sqrt(max(len(rows), 1))
+        diameter = min(max(spacing * 0.5, 1.5), 18) * 72 / DPI
+        ax.scatter(
+            self.xy[rows, 0], self.xy[rows, 1],
+            s=diameter ** 2,
+            c=PALETTE[self.types[rows]],
+            edgecolors="white" if labels else "none",
+            linewidths=0.5,
+            zorder=2,
+        )
+
+        if labels:
+            for row in rows:
+                icon = node_icon({
+                    "has_port": bool(self.flags[row] & FLAG_PORT),
+                    "has_planet": bool(self.flags[row] & FLAG_PLANET),
+                })
+                ax.annotate(
+                    f"{self.ids[row]} {icon}".strip(),
+                    self.xy[row],
+                    xytext=(0, diameter / 2 + 2),
+                    textcoords="offset points",
+                    ha="center",
+                    va="bottom",
+                    fontsize=7,
+                    color="white",
+                    annotation_clip=True,
+                    zorder=3,
+                )
+
+    # ----------------------------------------------------------
+    # Export
+    # ----------------------------------------------------------
+
+    def export(self, max_zoom=None, min_zoom=0, workers=None):
+        """
+        Render every occupied tile from min_zoom to max_zoom (default:
+        auto_max_zoom()) across a process pool, skipping cached ones,
+        then write tiles.json and index.html. Returns counts.
+        """
+        if self.directory is None:
+            raise ValueError("This TileSet has no cache_dir to export tiles into.")
+        if max_zoom is None:
+            max_zoom = self.auto_max_zoom()
+        if not 0 <= min_zoom <= max_zoom <= MORTON_BITS:
+            raise ValueError(f"Zoom levels must satisfy 0 <= min <= max <= {MORTON_BITS}.")
+
+        jobs = []
+        cached = 0
+        for z in range(min_zoom, max_zoom + 1):
+            for x, y in self.occupied_tiles(z):
+                if os.path.exists(self.tile_path(z, x, y)):
+                    cached += 1
+                else:
+                    jobs.append((z, x, y))
+
+        if jobs:
+            workers = workers or os.cpu_count() or 1
+            chunk = max(1, len(jobs) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+                for _ in pool.map(_render_job, jobs, chunksize=chunk):
+                    pass
+
+        self._write_index(min_zoom, max_zoom)
+        return {"rendered": len(jobs), "cached": cached, "min_zoom": min_zoom, "max_zoom": max_zoom}
+
+    def _write_index(self, min_zoom, max_zoom):
+        meta = {
+            "version": TILE_VERSION,
+            "tile_size": self.tile_size,
+            "min_zoom": min_zoom,
+            "max_zoom": max_zoom,
+            "sectors": len(self),
+            "layout": self.layout,
+            "tiles": "{z}/{x}/{y}.png",
+        }
+        with open(os.path.join(self.directory, "tiles.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        with open(os.path.join(self.directory, "index.html"), "w") as f:
+            f.write(INDEX_HTML.replace("__META__", json.dumps(meta)))
+
+    def export_overview(self, filename, title="Galaxy Map", size=2048):
+        """
+        One density image of the whole galaxy, with the sector-type
+        legend, to `filename` (.png, .svg, ...).
+        """
+        inches = size / DPI
+        fig = Figure(figsize=(inches, inches), dpi=DPI)
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor("black")
+        ax = fig.add_axes([0, 0, 1, 0.95])
+        _frame(ax, (0.0, 0.0, 1.0))
+
+        rows = np.arange(len(self))
+        if len(rows) > POINTS_MAX:
+            self._draw_density(ax, rows, (0.0, 0.0, 1.0), size // 8, 0)
+        else:
+            self._draw_points(ax, rows, labels=len(rows) <= LABELS_MAX)
+
+        legend = ax.legend(
+            handles=[
+                mpatches.Patch(color=tuple(PALETTE[code]), label=name.capitalize())
+                for code, name in enumerate(SECTOR_TYPES)
+            ],
+            loc="upper left",
+            framealpha=0.6,
+            facecolor="black",
+            edgecolor="white",
+            labelcolor="white",
+            fontsize=12,
+        )
+        for text in legend.get_texts():
+            text.set_color("white")
+        fig.suptitle(f"{title} ({len(self)} sectors)", fontsize=20, fontweight="bold", color="white")
+        fig.savefig(filename, facecolor="black")
+        return filename
+
+
+def _normalize(xy):
+    """Fit positions into the unit square (keeping aspect), y down."""
+    lo = xy.min(axis=0)
+    span = float((xy.max(axis=0) - lo).max()) or 1.0
+    xy = MARGIN + (xy - lo) / span * (1 - 2 * MARGIN)
+    xy[:, 1] = 1 - xy[:, 1]
+    return xy
+
+
+def _frame(ax, bbox):
+    x0, y0, size = bbox
+    ax.set_facecolor("black")
+    ax.set_xlim(x0, x0 + size)
+    ax.set_ylim(y0 + size, y0)
+    ax.axis("off")
+
+
+# Worker processes get the TileSet once, through the pool initializer.
+_worker_tiles = None
+
+
+def _init_worker(tiles):
+    global _worker_tiles
+    _worker_tiles = tiles
+
+
+def _render_job(job):
+    return _worker_tiles.render_tile(*job)
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>TW2025 Galaxy Map</title>
+<style>
+body { background: #000; color: #fff; font-family: sans-serif; margin: 0; }
+#bar { padding: 6px; } #grid { line-height: 0; white-space: nowrap; overflow: auto; height: calc(100vh - 40px); }
+#grid img { width: 256px; height: 256px; background: #000; }
+</style></head>
+<body>
+<div id="bar">Zoom <select id="zoom"></select> <span id="info"></span></div>
+<div id="grid"></div>
+<script>
+const meta = __META__;
+const zoom = document.getElementById("zoom"), grid = document.getElementById("grid");
+for (let z = meta.min_zoom; z <= meta.max_zoom; z++) zoom.add(new Option(z, z));
+function show(z) {
+  const side = 1 << z;
+  grid.innerHTML = "";
+  for (let y = 0; y < side; y++) {
+    for (let x = 0; x < side; x++) {
+      const img = document.createElement("img");
+      img.loading = "lazy";
+      img.onerror = () => { img.removeAttribute("src"); img.onerror = null; };
+      img.src = `${z}/${x}/${y}.png`;
+      grid.appendChild(img);
+    }
+    grid.appendChild(document.createElement("br"));
+  }
+  document.getElementById("info").textContent = `${meta.sectors} sectors, ${side}x${side} tiles`;
+}
+zoom.onchange = () => show(+zoom.value);
+show(meta.min_zoom);
+</script>
+</body></html>
+"""
+
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export TW2025 galaxy map tiles (headless).")
+    parser.add_argument("savefile", nargs="?", help="map this save instead of a new galaxy")
+    parser.add_argument("--sectors", type=int, default=100000, help="size of a new galaxy")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-zoom", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=TILE_CACHE_DIR, help="tile cache directory")
+    parser.add_argument("--overview", help="also write one overview image (.png or .svg)")
+    args = parser.parse_args(argv)
+
+    from galaxy import Galaxy
+
+    if args.savefile:
+        from savefile import is_binary_save, read_save
+
+        if is_binary_save(args.savefile):
+            galaxy = Galaxy.open_snapshot(args.savefile)
+        else:
+            galaxy = Galaxy.from_dict(read_save(args.savefile)["galaxy"])
+    else:
+        galaxy = Galaxy.generate_bulk(args.sectors, rng=args.seed)
+
+    tiles = TileSet(galaxy, cache_dir=args.out)
+    result = tiles.export(max_zoom=args.max_zoom, workers=args.workers)
+    print(
+        f"{len(tiles)} sectors, zoom {result['min_zoom']}-{result['max_zoom']}: "
+        f"{result['rendered']} tiles rendered, {result['cached']} cached"
+    )
+    print(f"Open {os.path.join(tiles.directory, 'index.html')} to browse.")
+
+    if args.overview:
+        tiles.export_overview(args.overview)
+        print(f"Overview written to {args.overview}.")
+
+
+if __name__ == "__main__":
+    main()
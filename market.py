@@ -0,0 +1,135 @@
+# market.py
+# ============================================================
+# Galaxy-wide market state for TW2025
+#
+# MarketBook keeps every port's commodity levels, buy/sell modes
+# and prices in contiguous NumPy arrays (ports x commodities).
+# Attached ports become thin views: their commodity_levels and
+# prices behave like the old dicts but read and write rows of
+# the book, and a single vectorized call reprices every port.
+#
+# NumPy is optional. Without it galaxies simply keep the per-port
+# dicts, and Galaxy.enable_market_book() raises ImportError.
+# ============================================================
+
+from collections.abc import MutableMapping
+
+from port import BASE_PRICES, COMMODITIES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+COLUMN = {c: i for i, c in enumerate(COMMODITIES)}
+
+
+class BookRow(MutableMapping):
+    """
+    Dict-like view of one port's row in a MarketBook array.
+    Keys are the COMMODITIES; values are plain ints.
+    """
+
+    __slots__ = ("_array", "_row")
+
+    def __init__(self, array, row):
+        self._array = array
+        self._row = row
+
+    def __getitem__(self, commodity):
+        return int(self._array[self._row, COLUMN[commodity]])
+
+    def __setitem__(self, commodity, value):
+        self._array[self._row, COLUMN[commodity]] = value
+
+    def __delitem__(self, commodity):
+        raise TypeError("Market rows always hold every commodity.")
+
+    def __iter__(self):
+        return iter(COMMODITIES)
+
+    def __len__(self):
+        return len(COMMODITIES)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class MarketBook:
+    """
+    Struct-of-arrays storage for every port in a galaxy.
+
+    Row r belongs to the port in sector sector_ids[r]; rows follow
+    galaxy order. Columns follow COMMODITIES.
+        levels : stock level (0-100)
+        sells  : True where the port sells that commodity to players
+        prices : current price, kept in step with levels
+    """
+
+    def __init__(self, ports):
+        if np is None:
+            raise ImportError("MarketBook requires NumPy.")
+
+        ports = list(ports)
+        n = len(ports)
+        self.sector_ids = np.array([sid for sid, _ in ports], dtype=np.int64)
+        self.levels = np.zeros((n, len(COMMODITIES)), dtype=np.int64)
+        self.sells = np.zeros((n, len(COMMODITIES)), dtype=bool)
+        self.prices = np.zeros((n, len(COMMODITIES)), dtype=np.int64)
+        self._base = np.array([BASE_PRICES[c] for c in COMMODITIES], dtype=np.int64)
+
+        # Move each port's state into its row, then turn the port's
+        # dicts into views of that row.
+        self.ports = []
+        for row, (_, port) in enumerate(ports):
+            for c, col in COLUMN.items():
+                self.levels[row, col] = port.commodity_levels[c]
+                self.prices[row, col] = port.prices[c]
+                self.sells[row, col] = port.can_sell_to_player(c)
+            port.commodity_levels = BookRow(self.levels, row)
+            port.prices = BookRow(self.prices, row)
+            port.market = (self, row)
+            self.ports.append(port)
+
+    @classmethod
+    def from_galaxy(cls, galaxy):
+        return cls(
+            (sid, sec.port) for sid, sec in galaxy.sectors.items() if sec.port
+        )
+
+    def __len__(self):
+        return len(self.ports)
+
+    def rows_by_sector(self):
+        """
+        Yield (sid, port, prices, sells) for every port in sector-id
+        order, with prices/sells as plain per-commodity lists.
+        """
+        order = self.sector_ids.argsort(kind="stable")
+        sids = self.sector_ids[order].tolist()
+        prices = self.prices[order].tolist()
+        sells = self.sells[order].tolist()
+        for i, row in enumerate(order.tolist()):
+            yield sids[i], self.ports[row], prices[i], sells[i]
+
+    # ------------------------------------------------------------
+    # Pricing Logic (vectorized Port.update_prices)
+    # ------------------------------------------------------------
+    def update_prices(self, rows=None):
+        """
+        Recompute prices for every port, or only for `rows`
+        (an int, slice or index array). Same formula as
+        Port.update_prices, applied to whole columns at once.
+        """
+        if rows is None:
+            rows = slice(None)
+        elif isinstance(rows, int):
+            rows = slice(rows, rows + 1)
+
+        levels = self.levels[rows]
+        factor = np.where(
+            self.sells[rows],
+            0.6 + (100 - levels) / 150.0,
+            1.0 + levels / 150.0,
+        )
+        self.prices[rows] = np.maximum(5, (self._base * factor).astype(np.int64))
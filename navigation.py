@@ -0,0 +1,488 @@
+# navigation.py
+# ============================================================
+# Warp-lane navigation helpers for TW2025
+#
+# Provides:
+#   - LaneIndex: frozen CSR (compressed sparse row) adjacency
+#     index built from Galaxy.sectors
+#   - find_route: O(V+E) breadth-first search over a LaneIndex,
+#     one-way or bidirectional, rebuilding the path from parent
+#     pointers
+#   - bfs_distances / DistanceOracle: one BFS per source, rows
+#     cached as compact unsigned arrays under an LRU memory cap
+#   - connected_components: every sector's component in one
+#     O(V+E) pass (vectorized when NumPy is installed)
+#   - eccentricities: all-sources BFS run bit-parallel, one bit
+#     per source in a Python int, for diameter reports
+#
+# Sector objects stay the source of truth for warp lanes; the
+# index is a compact, read-only copy that Galaxy rebuilds only
+# after its lanes change.
+# ============================================================
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class LaneIndex:
+    """
+    Array-backed adjacency index for every warp lane in a galaxy.
+
+    Sectors are mapped to dense row numbers (sorted by sector id).
+    The neighbors of row r are stored, sorted, in
+        neighbor_rows[offsets[r]:offsets[r + 1]]
+    so a full galaxy costs two flat integer arrays instead of one
+    Python set per sector.
+    """
+
+    def __init__(self, sector_ids, offsets, neighbor_rows):
+        self.sector_ids = sector_ids        # row -> sector id
+        self.offsets = offsets              # len(rows) + 1 entries
+        self.neighbor_rows = neighbor_rows  # flat, row numbers
+
+        # Galaxies are numbered 1..N, so row lookups are usually a
+        # subtraction. Fall back to a dict for sparse id sets.
+        ids = sector_ids
+        if not ids or ids[-1] - ids[0] + 1 == len(ids):
+            self._base = ids[0] if ids else 0
+            self._rows = None
+        else:
+            self._base = None
+            self._rows = {sid: row for row, sid in enumerate(ids)}
+
+    # ----------------------------------------------------------
+    # Construction
+    # ----------------------------------------------------------
+
+    @classmethod
+    def from_sectors(cls, sectors):
+        """
+        Build an index from a {sid: Sector} mapping.
+        Lanes pointing at unknown sectors are left out; the debug
+        validators report those from the Sector objects.
+        """
+        ids = sorted(sectors)
+        rows = {sid: row for row, sid in enumerate(ids)}
+
+        offsets = array("i", [0])
+        neighbor_rows = array("i")
+        for sid in ids:
+            neighbor_rows.extend(
+                sorted(rows[n] for n in sectors[sid].neighbors if n in rows)
+            )
+            offsets.append(len(neighbor_rows))
+
+        return cls(array("i", ids), offsets, neighbor_rows)
+
+    # ----------------------------------------------------------
+    # Row / Sector Mapping
+    # ----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.sector_ids)
+
+    def __contains__(self, sid):
+        if self._rows is not None:
+            return sid in self._rows
+        return 0 <= sid - self._base < len(self.sector_ids)
+
+    def row(self, sid):
+        """Return the dense row number for a sector id (KeyError if absent)."""
+        if self._rows is not None:
+            return self._rows[sid]
+        r = sid - self._base
+        if not 0 <= r < len(self.sector_ids):
+            raise KeyError(sid)
+        return r
+
+    def sid(self, row):
+        return self.sector_ids[row]
+
+    # ----------------------------------------------------------
+    # Lane Queries
+    # ----------------------------------------------------------
+
+    @property
+    def num_lanes(self):
+        """Number of directed lane entries (a two-way lane counts twice)."""
+        return len(self.neighbor_rows)
+
+    def row_neighbors(self, row):
+        return self.neighbor_rows[self.offsets[row]:self.offsets[row + 1]]
+
+    def neighbors(self, sid):
+        """Sorted list of sector ids reachable in one warp from sid."""
+        ids = self.sector_ids
+        return [ids[r] for r in self.row_neighbors(self.row(sid))]
+
+    def degree(self, sid):
+        r = self.row(sid)
+        return self.offsets[r + 1] - self.offsets[r]
+
+    def has_lane(self, a, b):
+        """True if sector a lists a warp lane to sector b."""
+        if a not in self or b not in self:
+            return False
+        r = self.row(a)
+        target = self.row(b)
+        lo, hi = self.offsets[r], self.offsets[r + 1]
+        i = bisect_left(self.neighbor_rows, target, lo, hi)
+        return i < hi and self.neighbor_rows[i] == target
+
+
+# ============================================================
+# Breadth-First Route Search
+# ============================================================
+
+def find_route(lanes, start, goal, bidirectional=True):
+    """
+    Shortest list of sector ids from start to goal (inclusive),
+    or None if goal cannot be reached or either sector is unknown.
+
+    Every sector is marked when it is first discovered, so each
+    lane is examined at most once. The bidirectional mode grows
+    one frontier from each end, always expanding the smaller one,
+    which touches far fewer sectors on large maps.
+    """
+    if start not in lanes or goal not in lanes:
+        return None
+    s = lanes.row(start)
+    t = lanes.row(goal)
+    if s == t:
+        return [start]
+
+    if bidirectional:
+        rows = _bidirectional_search(lanes, s, t)
+    else:
+        rows = _forward_search(lanes, s, t)
+
+    if rows is None:
+        return None
+    ids = lanes.sector_ids
+    return [ids[r] for r in rows]
+
+
+def _forward_search(lanes, s, t):
+    offsets, neighbor_rows = lanes.offsets, lanes.neighbor_rows
+    parent = array("i", [-1]) * len(lanes)
+    parent[s] = s
+    frontier = [s]
+
+    while frontier:
+        next_frontier = []
+        for u in frontier:
+            for v in neighbor_rows[offsets[u]:offsets[u + 1]]:
+                if parent[v] < 0:
+                    parent[v] = u
+                    if v == t:
+                        return _walk_parents(parent, t, s)[::-1]
+                    next_frontier.append(v)
+        frontier = next_frontier
+
+    return None
+
+
+def _bidirectional_search(lanes, s, t):
+    offsets, neighbor_rows = lanes.offsets, lanes.neighbor_rows
+
+    # depth and parent of every sector discovered from each end
+    depth_f, parent_f = {s: 0}, {s: s}
+    depth_b, parent_b = {t: 0}, {t: t}
+    frontier_f, frontier_b = [s], [t]
+
+    while frontier_f and frontier_b:
+        forward = len(frontier_f) <= len(frontier_b)
+        if forward:
+            frontier, depth, parent, other = frontier_f, depth_f, parent_f, depth_b
+        else:
+            frontier, depth, parent, other = frontier_b, depth_b, parent_b, depth_f
+
+        # Expand one whole level; the shortest route is the best
+        # crossing found anywhere in that level.
+        best = None
+        meet = None
+        next_frontier = []
+        for u in frontier:
+            du = depth[u] + 1
+            for v in neighbor_rows[offsets[u]:offsets[u + 1]]:
+                if v in other:
+                    total = du + other[v]
+                    if best is None or total < best:
+                        best, meet = total, (u, v)
+                if v not in depth:
+                    depth[v] = du
+                    parent[v] = u
+                    next_frontier.append(v)
+
+        if meet is not None:
+            u, v = meet
+            if forward:
+                head = _walk_parents(parent_f, u, s)
+                tail = _walk_parents(parent_b, v, t)
+            else:
+                head = _walk_parents(parent_f, v, s)
+                tail = _walk_parents(parent_b, u, t)
+            return head[::-1] + tail
+
+        if forward:
+            frontier_f = next_frontier
+        else:
+            frontier_b = next_frontier
+
+    return None
+
+
+def _walk_parents(parent, node, root):
+    """Follow parent pointers from node back to root (node first)."""
+    path = [node]
+    while node != root:
+        node = parent[node]
+        path.append(node)
+    return path
+
+
+# ============================================================
+# Single-Source Distances & Distance Oracle
+# ============================================================
+
+def distance_typecode(num_rows):
+    """Smallest unsigned array type that can hold every hop count."""
+    return "H" if num_rows < 0xFFFF else "I"
+
+
+# Largest value of each distance array type, used for "no route".
+UNREACHED = {tc: (1 << (8 * array(tc).itemsize)) - 1 for tc in "HI"}
+
+
+def bfs_distances(lanes, source, typecode=None):
+    """
+    Hop count from sector `source` to every row of `lanes`, as an
+    unsigned array indexed by row. Unreachable rows hold
+    UNREACHED[typecode].
+    """
+    offsets, neighbor_rows = lanes.offsets, lanes.neighbor_rows
+    typecode = typecode or distance_typecode(len(lanes))
+    unreached = UNREACHED[typecode]
+
+    dist = array(typecode, [unreached]) * len(lanes)
+    s = lanes.row(source)
+    dist[s] = 0
+    frontier = [s]
+    hops = 0
+
+    while frontier:
+        hops += 1
+        next_frontier = []
+        for u in frontier:
+            for v in neighbor_rows[offsets[u]:offsets[u + 1]]:
+                if dist[v] == unreached:
+                    dist[v] = hops
+                    next_frontier.append(v)
+        frontier = next_frontier
+
+    return dist
+
+
+class DistanceOracle:
+    """
+    Lazily filled all-pairs hop-distance table for one Galaxy.
+
+    The first query from a source runs one BFS and keeps the whole
+    row; every later distance(source, x) is a single array lookup.
+    Rows are evicted least-recently-used once they exceed
+    max_bytes, and the table is dropped whenever the galaxy's
+    lane index is rebuilt.
+    """
+
+    def __init__(self, galaxy, max_bytes=32 * 1024 * 1024):
+        self.galaxy = galaxy
+        self.max_bytes = max_bytes
+        self._lanes = None
+        self._rows = OrderedDict()   # source sid -> distance row
+
+    def clear(self):
+        self._rows.clear()
+        self._lanes = None
+
+    def _current_lanes(self):
+        lanes = self.galaxy.lane_index()
+        if lanes is not self._lanes:
+            self._rows.clear()
+            self._lanes = lanes
+        return lanes
+
+    @property
+    def max_rows(self):
+        lanes = self._current_lanes()
+        row_bytes = max(1, len(lanes)) * array(distance_typecode(len(lanes))).itemsize
+        return max(1, self.max_bytes // row_bytes)
+
+    def row(self, source):
+        """Distance row for `source`, indexed by LaneIndex row number."""
+        lanes = self._current_lanes()
+        rows = self._rows
+
+        dist = rows.get(source)
+        if dist is not None:
+            rows.move_to_end(source)
+            return dist
+
+        dist = bfs_distances(lanes, source)
+        rows[source] = dist
+        limit = self.max_rows
+        while len(rows) > limit:
+            rows.popitem(last=False)
+        return dist
+
+    def distance(self, a, b):
+        """Hops from sector a to sector b, or None if unreachable."""
+        lanes = self._current_lanes()
+        row = self.row(a)
+        dist = row[lanes.row(b)]
+        return None if dist == UNREACHED[row.typecode] else dist
+
+
+# ============================================================
+# Whole-Galaxy Structure
+# ============================================================
+
+def connected_components(lanes):
+    """
+    Component number of every row of `lanes`, as an array indexed
+    by row, and the number of components. Lanes count in both
+    directions (a one-way lane still joins two sectors). Components
+    are numbered by their lowest row, so row 0 is in component 0.
+    """
+    if np is not None and len(lanes):
+        return _components_numpy(lanes)
+
+    offsets, neighbor_rows = lanes.offsets, lanes.neighbor_rows
+    n = len(lanes)
+    label = array("i", [-1]) * n
+    merged = []   # (later label, earlier label) joined by one-way lanes
+    count = 0
+
+    for root in range(n):
+        if label[root] >= 0:
+            continue
+        label[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in neighbor_rows[offsets[u]:offsets[u + 1]]:
+                if label[v] < 0:
+                    label[v] = count
+                    stack.append(v)
+                elif label[v] != count:
+                    merged.append((count, label[v]))
+        count += 1
+
+    if not merged:
+        return label, count
+
+    # A lane into an earlier component that never lanes back: fold
+    # the labels together with a small union-find.
+    parent = list(range(count))
+
+    def find(c):
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    for a, b in merged:
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    renumber = {}
+    for c in range(count):
+        renumber.setdefault(find(c), len(renumber))
+    final = array("i", (renumber[find(c)] for c in range(count)))
+    return array("i", (final[c] for c in label)), len(renumber)
+
+
+def _components_numpy(lanes):
+    """Hook every lane onto the lower label, then pointer-jump."""
+    n = len(lanes)
+    offsets = np.frombuffer(lanes.offsets, dtype=np.int32)
+    dst = np.frombuffer(lanes.neighbor_rows, dtype=np.int32).astype(np.int64)
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+
+    label = np.arange(n, dtype=np.int64)
+    while True:
+        a, b = label[src], label[dst]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        split = lo != hi
+        if not split.any():
+            break
+        np.minimum.at(label, hi[split], lo[split])
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+
+    # Each label is now its component's lowest row; number them 0..k-1.
+    roots, numbers = np.unique(label, return_inverse=True)
+    out = array("i")
+    out.frombytes(numbers.astype(np.int32).tobytes())
+    return out, len(roots)
+
+
+def eccentricities(lanes, width=1024):
+    """
+    Hops from every row to the farthest row it can reach, as an
+    unsigned array indexed by row (0 for an isolated sector).
+
+    Runs the BFS from `width` sources at once: each row keeps one
+    Python int whose bit i says source i has reached it, so a level
+    of all those searches is one sweep over the lanes. Costs about
+    V / width * diameter * E big-int operations: fine for saves of
+    a few thousand sectors, not for bulk-generated galaxies.
+    """
+    offsets, neighbor_rows = lanes.offsets, lanes.neighbor_rows
+    n = len(lanes)
+    ecc = array(distance_typecode(n), [0]) * n
+
+    for start in range(0, n, width):
+        stop = min(n, start + width)
+        seen = [0] * n
+        frontier = {}
+        for r in range(start, stop):
+            seen[r] = frontier[r] = 1 << (r - start)
+        alive = (1 << (stop - start)) - 1   # sources still finding rows
+        level = 0
+
+        while frontier:
+            level += 1
+            reached = {}
+            for u, bits in frontier.items():
+                for v in neighbor_rows[offsets[u]:offsets[u + 1]]:
+                    reached[v] = reached.get(v, 0) | bits
+
+            frontier = {}
+            found = 0
+            for v, bits in reached.items():
+                bits &= ~seen[v]
+                if bits:
+                    seen[v] |= bits
+                    frontier[v] = bits
+                    found |= bits
+
+            # Sources that found nothing new ran out one level ago.
+            done = alive & ~found
+            while done:
+                low = done & -done
+                ecc[start + low.bit_length() - 1] = level - 1
+                done ^= low
+            alive = found
+
+    return ecc
+
@@ -5,65 +5,123 @@
 # Supports:
 #   - Goods storage (ore, organics, equipment)
 #   - Credit treasury
-#   - Production over time
+#   - Production over time (settled lazily: rate x elapsed turns)
 #   - Save/load (to_dict / from_dict)
 # ============================================================
 
 from dataclasses import dataclass, field
 from port import COMMODITIES
+from journal import Tracked
 import random
 
 
-def generate_planet_name():
-    prefixes = [
-        "New", "Alpha", "Beta", "Gamma", "Delta", "Nova", "Terra", "Fort", "Sigma", 
-        "Zeta", "Epsilon", "Kepler", "Proxima", "Helios", "Aether", "Astra", "Solus", 
-        "Gaea", "Neo", "Pax", "Void", "Iron", "Cryo", "Xeno", "Zenith", "Obsidian",
-        "Port", "Citadel", "Stasis", "Helix", "Vector", "Warden", "Genesis"
-    ]
+PLANET_PREFIXES = [
+    "New", "Alpha", "Beta", "Gamma", "Delta", "Nova", "Terra", "Fort", "Sigma", 
+    "Zeta", "Epsilon", "Kepler", "Proxima", "Helios", "Aether", "Astra", "Solus", 
+    "Gaea", "Neo", "Pax", "Void", "Iron", "Cryo", "Xeno", "Zenith", "Obsidian",
+    "Port", "Citadel", "Stasis", "Helix", "Vector", "Warden", "Genesis"
+]
 
-    suffixes = [
-        "Prime", "Station", "Base", "Haven", "One", "II", "Harbor", "Reach",
-        "Colony", "Outpost", "Sector", "Gate", "Spire", "Vault", "Dome", "Array", 
-        "City", "Hub", "Major", "Minor", "Deep", "Rim", "Core", "Point", "Expanse",
-        "VI", "Zero", "Terminus", "Epoch", "Meridian", "Bulwark", "Sanctuary", "Fortress"
-    ]
-    return f"{random.choice(prefixes)} {random.choice(suffixes)}"
+PLANET_SUFFIXES = [
+    "Prime", "Station", "Base", "Haven", "One", "II", "Harbor", "Reach",
+    "Colony", "Outpost", "Sector", "Gate", "Spire", "Vault", "Dome", "Array", 
+    "City", "Hub", "Major", "Minor", "Deep", "Rim", "Core", "Point", "Expanse",
+    "VI", "Zero", "Terminus", "Epoch", "Meridian", "Bulwark", "Sanctuary", "Fortress"
+]
 
 
-@dataclass
-class Planet:
+def generate_planet_name(rng=random):
+    return f"{rng.choice(PLANET_PREFIXES)} {rng.choice(PLANET_SUFFIXES)}"
+
+
+@dataclass(init=False)
+class Planet(Tracked):
     """
     Represents a planet that the player can land on.
     Planets can store goods and credits, and produce goods each turn.
+
+    Production is not ticked turn by turn. When a `clock` (a callable
+    returning the current turn) is attached, every read of `goods`
+    first adds rate x turns elapsed since last_production_turn.
     """
 
     sector_id: int
-    name: str = field(default_factory=generate_planet_name)
+    name: str
 
-    # Inventory is called GOODS (not inventory)
-    goods: dict = field(default_factory=lambda: {
-        "ore": 0,
-        "organics": 0,
-        "equipment": 0
-    })
+    # Inventory is called GOODS (not inventory); read it through the
+    # `goods` property so pending production is settled first.
+    _goods: dict = field(repr=False, compare=False)
 
     # Planet treasury
-    treasury: int = 0
+    treasury: int
 
     # Production rates for each commodity per tick (game turn)
-    production_rates: dict = field(default_factory=lambda: {
-        "ore": 1,
-        "organics": 1,
-        "equipment": 1
-    })
+    production_rates: dict
+
+    # Turn up to which production has been added to goods
+    last_production_turn: int
+
+    # Source of the current turn (Galaxy.current_turn); None means
+    # goods only change through production_tick()
+    clock: object = field(repr=False, compare=False)
+
+    def __init__(self, sector_id, name=None, goods=None, treasury=0,
+                 production_rates=None, last_production_turn=0, clock=None):
+        # Written out so `goods=` stays a constructor argument (the
+        # field behind the property is _goods). Filled in directly,
+        # bypassing Tracked.__setattr__ and the goods setter.
+        vars(self).update(
+            sector_id=sector_id,
+            name=generate_planet_name() if name is None else name,
+            _goods=goods if goods is not None else {
+                "ore": 0,
+                "organics": 0,
+                "equipment": 0
+            },
+            treasury=treasury,
+            production_rates=production_rates if production_rates is not None else {
+                "ore": 1,
+                "organics": 1,
+                "equipment": 1
+            },
+            last_production_turn=last_production_turn,
+            clock=clock,
+        )
 
     # -------------------------------------------------------
-    # Production tick — planets slowly generate resources
+    # Production — planets slowly generate resources
     # -------------------------------------------------------
+    @property
+    def goods(self):
+        self.settle_production()
+        return self._goods
+
+    @goods.setter
+    def goods(self, value):
+        self._goods = value
+        if self.clock is not None:
+            self.last_production_turn = self.clock()
+
+    def settle_production(self):
+        """Add everything produced since the last settlement (O(1))."""
+        if self.clock is None:
+            return
+        now = self.clock()
+        elapsed = now - self.last_production_turn
+        if elapsed <= 0:
+            return
+        for c in COMMODITIES:
+            self._goods[c] += self.production_rates.get(c, 0) * elapsed
+        # Settling doesn't change the planet's logical state, so it
+        # is not reported as a change to the save journal.
+        object.__setattr__(self, "last_production_turn", now)
+
     def production_tick(self):
+        """Produce one extra turn's worth of goods immediately."""
+        goods = self.goods
         for c in COMMODITIES:
-            self.goods[c] += self.production_rates.get(c, 0)
+            goods[c] += self.production_rates.get(c, 0)
+        self.mark_dirty()
 
     # -------------------------------------------------------
     # Depositing / Withdrawing goods
@@ -74,6 +132,7 @@ class Planet:
         if amount <= 0:
             raise ValueError("Amount must be positive.")
         self.goods[commodity] += amount
+        self.mark_dirty()
 
     def withdraw_commodity(self, commodity, amount):
         if commodity not in COMMODITIES:
@@ -83,6 +142,7 @@ class Planet:
         if self.goods[commodity] < amount:
             raise ValueError("Planet does not have that much.")
         self.goods[commodity] -= amount
+        self.mark_dirty()
 
     # -------------------------------------------------------
     # Planet credit treasury
@@ -120,17 +180,20 @@ class Planet:
             "goods": self.goods,
             "treasury": self.treasury,
             "production_rates": self.production_rates,
+            "last_production_turn": self.last_production_turn,
         }
 
     @staticmethod
-    def from_dict(data):
-        p = Planet(sector_id=data["sector_id"])
-        p.name = data["name"]
-        p.goods = data["goods"]
-        p.treasury = data["treasury"]
-        p.production_rates = data.get("production_rates", {
-            "ore": 1,
-            "organics": 1,
-            "equipment": 1
-        })
-        return p
+    def from_dict(data, clock=None):
+        return Planet(
+            sector_id=data["sector_id"],
+            name=data["name"],
+            goods=data["goods"],
+            treasury=data["treasury"],
+            production_rates=data.get("production_rates"),
+            # Older saves were written fully settled at the save turn.
+            last_production_turn=data.get(
+                "last_production_turn", clock() if clock else 0
+            ),
+            clock=clock,
+        )
@@ -14,6 +14,8 @@
 from dataclasses import dataclass, field
 import random
 
+from journal import Tracked
+
 COMMODITIES = ["ore", "organics", "equipment"]
 
 # Base prices used for dynamic pricing
@@ -54,12 +56,12 @@ PORT_SUFFIXES = [
     "Port", "Dock", "Encampment", "Harborworks"
 ]
 
-def random_port_name():
-    return f"{random.choice(PORT_PREFIXES)} {random.choice(PORT_SUFFIXES)}"
+def random_port_name(rng=random):
+    return f"{rng.choice(PORT_PREFIXES)} {rng.choice(PORT_SUFFIXES)}"
 
 
 @dataclass
-class Port:
+class Port(Tracked):
     """
     TradeWars-style port object.
     Automatically chooses:
@@ -86,6 +88,11 @@ class Port:
             self.type_id = random.choice(list(PORT_TYPES.keys()))
 
         self.modes = PORT_TYPES[self.type_id]
+
+        # (MarketBook, row) once the galaxy moves this port's levels
+        # and prices into a shared book; see market.py.
+        self.market = None
+
         self.update_prices()
 
     # ------------------------------------------------------------
@@ -98,6 +105,15 @@ class Port:
     # Pricing Logic
     # ------------------------------------------------------------
     def update_prices(self) -> None:
+        # Every level change ends here, so this is where trades get
+        # recorded for the save journal.
+        self.mark_dirty()
+
+        if self.market is not None:
+            book, row = self.market
+            book.update_prices(row)
+            return
+
         for c in COMMODITIES:
             base = BASE_PRICES[c]
             level = self.commodity_levels[c]
@@ -208,6 +224,20 @@ class Port:
 
         return "\n".join(lines)
 
+    # ------------------------------------------------------------
+    # Random Generation
+    # ------------------------------------------------------------
+    @staticmethod
+    def generate(rng=random):
+        """
+        A new random port drawn from `rng`, in the same order Port()
+        draws from the global random module.
+        """
+        levels = {c: rng.randint(20, 80) for c in COMMODITIES}
+        name = random_port_name(rng)
+        type_id = rng.choice(list(PORT_TYPES.keys()))
+        return Port(name=name, type_id=type_id, commodity_levels=levels)
+
     # ------------------------------------------------------------
     # Save/Load
     # ------------------------------------------------------------
@@ -215,17 +245,28 @@ class Port:
         return {
             "name": self.name,
             "type_id": self.type_id,
-            "commodity_levels": self.commodity_levels,
-            "prices": self.prices,
+            "commodity_levels": dict(self.commodity_levels),
+            "prices": dict(self.prices),
         }
 
     @staticmethod
     def from_dict(data):
-        port = Port(
+        # Fields are filled in directly rather than through __init__,
+        # which would run every write through Tracked.__setattr__ and
+        # price the port only for the saved prices to replace it.
+        type_id = data.get("type_id")
+        if type_id is None:
+            type_id = random.choice(list(PORT_TYPES.keys()))
+        port = Port.__new__(Port)
+        vars(port).update(
             name=data["name"],
-            type_id=data.get("type_id")
+            type_id=type_id,
+            commodity_levels=data["commodity_levels"],
+            prices=data.get("prices", {}),
+            modes=PORT_TYPES[type_id],
+            market=None,
         )
-        port.commodity_levels = data["commodity_levels"]
-        port.prices = data["prices"]
-        port.modes = PORT_TYPES[port.type_id]
+        # Freshly generated rows (see galaxygen.py) carry no prices.
+        if "prices" not in data:
+            port.update_prices()
         return port
@@ -1,19 +1,83 @@
 # render_map.py
+# ============================================================
+# Galaxy map rendering (MAP command)
+#
+# The spring layout is the slow part and depends only on the
+# warp-lane topology, so positions are cached per topology hash:
+#   - in memory, for the rest of the session
+#   - on disk under MAP_CACHE_DIR, for the next session
+# When lanes are added, the previous layout of the same galaxy is
+# reused and only the sectors whose lanes changed are relaxed
+# (everything else stays pinned), so the map keeps its shape.
+# Node colors are cached too; only the player highlight changes
+# between renders, and a map window that is still open is just
+# recolored.
+#
+# With a radius, only the sectors within that many warps of the
+# player are drawn: a bounded BFS collects them, so the cost follows
+# the size of the neighborhood, not of the galaxy.
+#
+# export_map() draws the same map headless (Agg) to PNG or SVG;
+# map_tiles.py cuts huge galaxies into level-of-detail tiles.
+# ============================================================
+
+import hashlib
+import json
+import os
+import weakref
+from collections import OrderedDict
+
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 plt.rcParams['font.family'] = ['DejaVu Sans', 'Segoe UI Symbol', 'sans-serif']
 
+MAP_CACHE_DIR = ".map_cache"
+MAP_PNG = "tw2025_map.png"
 
-def render_galaxy_map(galaxy, player_sector=None, save_png=False):
-    """
-    Enhanced Galaxy Map (Dark Mode + Legend)
-    """
+# Above this many sectors labels can't be read; export_map() draws a
+# density overview instead.
+LABELED_MAP_MAX = 1000
 
-    G = nx.Graph()
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
 
-    # Build graph
+# Bump when the layout parameters change, so stale caches are ignored.
+LAYOUT_VERSION = 1
+LAYOUT_SEED = 42
+LAYOUT_K = 1.5
+LAYOUT_ITERATIONS = 100
+RELAYOUT_ITERATIONS = 30
+LOCAL_LAYOUT_ITERATIONS = 50
+
+PLAYER_COLOR = "#339900"
+TYPE_COLORS = {
+    "STARDOCK": "#FFCC33",
+    "FEDSPACE": "#0000FF",
+    "PIRATE": "#CA0533",
+    "DEADEND": "#808080",
+}
+NORMAL_COLOR = "#CC6600"
+
+# topology hash -> {sid: (x, y)}, most recently used last
+_layouts = OrderedDict()
+_MAX_LAYOUTS = 8
+
+# galaxy -> (topology hash, lane set, positions) of its last layout
+_last_layout = weakref.WeakKeyDictionary()
+
+# galaxy -> _MapView of a figure that may still be open
+_open_maps = weakref.WeakKeyDictionary()
+
+
+# ============================================================
+# GRAPH + TOPOLOGY
+# ============================================================
+
+def build_graph(galaxy):
+    G = nx.Graph()
     for sid, sector in galaxy.sectors.items():
         G.add_node(
             sid,
@@ -24,55 +88,308 @@ def render_galaxy_map(galaxy, player_sector=None, save_png=False):
         for n in sector.neighbors:
             if sid < n:
                 G.add_edge(sid, n)
+    return G
 
-    # Bigger figure
-    fig = plt.figure(figsize=(16, 12))
-    fig.patch.set_facecolor("black")
 
-    # Spread-out physics layout
-    pos = nx.spring_layout(G, seed=42, k=1.5, iterations=100)
-
-    # Colors for nodes
-    def node_color(sid):
-        t = G.nodes[sid]["type"]
-        if sid == player_sector:
-            return "#339900"  
-        if t == "STARDOCK":
-            return "#FFCC33"
-        if t == "FEDSPACE":
-            return "#0000FF"
-        if t == "PIRATE":
-            return "#CA0533"
-        if t == "DEADEND":
-            return "#808080"
-        return "#CC6600"
-
-    colors = [node_color(n) for n in G.nodes()]
-
-    # Icons for labeling
-    def node_icon(n):
-        data = G.nodes[n]
-        if data["has_port"] and data["has_planet"]:
-            return "◉◆"
-        if data["has_port"]:
-            return "◆"
-        if data["has_planet"]:
-            return "◉"
-        return ""
-
-    labels = {n: f"{n} {node_icon(n)}" for n in G.nodes()}
+def local_sectors(galaxy, center, radius):
+    """
+    {sid: hops} for every sector within `radius` warps of `center`,
+    by a BFS that stops at the radius. Only those sectors (and the
+    lanes out of the inner ones) are ever looked up.
+    """
+    if center not in galaxy.sectors:
+        raise ValueError(f"Sector {center} is not in the galaxy.")
+    hops = {center: 0}
+    frontier = [center]
+    for depth in range(1, radius + 1):
+        reached = []
+        for sid in frontier:
+            for n in galaxy.sectors[sid].neighbors:
+                if n not in hops:
+                    hops[n] = depth
+                    reached.append(n)
+        if not reached:
+            break
+        frontier = reached
+    return hops
+
+
+def build_local_graph(galaxy, center, radius):
+    """
+    build_graph() restricted to the k-hop neighborhood of `center`:
+    its sectors and the lanes between them. Each node also carries
+    its "hops" from the center.
+    """
+    hops = local_sectors(galaxy, center, radius)
+    G = nx.Graph()
+    for sid, depth in hops.items():
+        sector = galaxy.sectors[sid]
+        G.add_node(
+            sid,
+            type=sector.type,
+            has_port=sector.port is not None,
+            has_planet=sector.planet is not None,
+            hops=depth,
+        )
+    for sid in hops:
+        for n in galaxy.sectors[sid].neighbors:
+            if n in hops:
+                G.add_edge(sid, n)
+    return G
+
+
+def subgraph_hash(G):
+    """Hash of a graph's nodes and edges, for caching its layout."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{LAYOUT_VERSION}:local:".encode())
+    h.update(json.dumps(sorted(G.nodes())).encode())
+    h.update(json.dumps(sorted(_lane_set(G))).encode())
+    return h.hexdigest()
+
+
+def topology_hash(galaxy):
+    """Hash of the sector ids and warp lanes (nothing else)."""
+    lanes = galaxy.lane_index()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{LAYOUT_VERSION}:{len(lanes)}:".encode())
+    h.update(lanes.sector_ids.tobytes())
+    h.update(lanes.offsets.tobytes())
+    h.update(lanes.neighbor_rows.tobytes())
+    return h.hexdigest()
+
+
+# ============================================================
+# LAYOUT CACHE
+# ============================================================
+
+def galaxy_layout(galaxy, G=None, cache_dir=MAP_CACHE_DIR):
+    """
+    Node positions {sid: (x, y)} for the galaxy's current lanes,
+    from memory, then disk, then an incremental relayout of this
+    galaxy's previous map, and only then a full spring layout.
+    Pass cache_dir=None to skip the disk cache.
+    """
+    key = topology_hash(galaxy)
+
+    pos = _layouts.get(key)
+    if pos is None and cache_dir:
+        pos = _read_layout(cache_dir, key)
+    if pos is None:
+        G = G if G is not None else build_graph(galaxy)
+        previous = _last_layout.get(galaxy)
+        if previous is not None:
+            pos = _relayout(G, previous[1], previous[2])
+        else:
+            pos = _full_layout(G)
+        if cache_dir:
+            _write_layout(cache_dir, key, pos)
+
+    _layouts[key] = pos
+    _layouts.move_to_end(key)
+    while len(_layouts) > _MAX_LAYOUTS:
+        _layouts.popitem(last=False)
+
+    previous = _last_layout.get(galaxy)
+    if previous is None or previous[0] != key:
+        G = G if G is not None else build_graph(galaxy)
+        _last_layout[galaxy] = (key, _lane_set(G), pos)
+    return pos
+
+
+def _lane_set(G):
+    return {(a, b) if a < b else (b, a) for a, b in G.edges()}
+
+
+def _full_layout(G):
+    pos = nx.spring_layout(G, seed=LAYOUT_SEED, k=LAYOUT_K, iterations=LAYOUT_ITERATIONS)
+    return {n: (float(x), float(y)) for n, (x, y) in pos.items()}
+
+
+def local_layout(G, center):
+    """
+    Positions for a neighborhood graph from build_local_graph(),
+    starting from rings of sectors by hop count around the center.
+    Cached in memory by the subgraph's own hash.
+    """
+    key = subgraph_hash(G)
+    pos = _layouts.get(key)
+    if pos is None:
+        shells = {}
+        for n, data in G.nodes(data=True):
+            shells.setdefault(data["hops"], []).append(n)
+        start = nx.shell_layout(G, nlist=[sorted(shells[d]) for d in sorted(shells)])
+        pos = nx.spring_layout(
+            G, pos=start, fixed=[center], seed=LAYOUT_SEED,
+            iterations=LOCAL_LAYOUT_ITERATIONS,
+        )
+        pos = {n: (float(x), float(y)) for n, (x, y) in pos.items()}
+
+    _layouts[key] = pos
+    _layouts.move_to_end(key)
+    while len(_layouts) > _MAX_LAYOUTS:
+        _layouts.popitem(last=False)
+    return pos
+
+
+def _relayout(G, old_lanes, old_pos):
+    """
+    Relax only the sectors touched by lane changes (and new ones)
+    against their immediate neighbors; every other sector stays
+    exactly where the previous map had it. Costs O(changed area),
+    not O(galaxy).
+    """
+    moved = {n for n in G.nodes() if n not in old_pos}
+    for a, b in _lane_set(G) ^ old_lanes:
+        moved.update((a, b))
+    moved &= set(G.nodes())
+
+    pos = {n: old_pos[n] for n in G.nodes() if n in old_pos}
+    if not moved:
+        return pos
+    if len(pos) < 2:
+        return _full_layout(G)
+
+    area = set(moved)
+    for n in moved:
+        area.update(G.neighbors(n))
+    sub = G.subgraph(area)
+
+    start = {}
+    for n in sub.nodes():
+        if n in pos:
+            start[n] = pos[n]
+        else:
+            # New sectors start at the middle of their placed neighbors.
+            placed = [pos[m] for m in G.neighbors(n) if m in pos]
+            if placed:
+                start[n] = (sum(p[0] for p in placed) / len(placed),
+                            sum(p[1] for p in placed) / len(placed))
+
+    # The full layout is rescaled after it runs, so its k means
+    # nothing here; use the map's own typical lane length instead.
+    lengths = sorted(
+        ((pos[a][0] - pos[b][0]) ** 2 + (pos[a][1] - pos[b][1]) ** 2) ** 0.5
+        for a, b in G.edges() if a in pos and b in pos
+    )
+    k = lengths[len(lengths) // 2] if lengths else None
+
+    fixed = [n for n in sub.nodes() if n not in moved and n in start]
+    relaxed = nx.spring_layout(
+        sub, pos=start or None, fixed=fixed or None, seed=LAYOUT_SEED, k=k,
+        iterations=RELAYOUT_ITERATIONS,
+    )
+    for n in moved:
+        x, y = relaxed[n]
+        pos[n] = (float(x), float(y))
+    return pos
+
+
+def _layout_path(cache_dir, key):
+    return os.path.join(cache_dir, f"layout-{key}.json")
+
+
+def _read_layout(cache_dir, key):
+    try:
+        with open(_layout_path(cache_dir, key)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != LAYOUT_VERSION or data.get("topology") != key:
+        return None
+    return {sid: (x, y) for sid, x, y in data["nodes"]}
+
+
+def _write_layout(cache_dir, key, pos):
+    path = _layout_path(cache_dir, key)
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump({
+                "version": LAYOUT_VERSION,
+                "topology": key,
+                "nodes": [[sid, x, y] for sid, (x, y) in pos.items()],
+            }, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass   # the cache is only an optimization
+
+
+def clear_layout_cache(cache_dir=MAP_CACHE_DIR):
+    """Forget every cached layout, in memory and on disk."""
+    _layouts.clear()
+    _last_layout.clear()
+    if cache_dir and os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.startswith("layout-") and name.endswith(".json"):
+                os.remove(os.path.join(cache_dir, name))
+
+
+# ============================================================
+# DRAWING
+# ============================================================
+
+class _MapView:
+    """A drawn map: its figure, node artist and base node colors."""
+
+    def __init__(self, topology, fig, nodes, order, base_colors):
+        self.topology = topology
+        self.fig = fig
+        self.nodes = nodes
+        self.order = order
+        self.base_colors = base_colors
+
+    def is_open(self):
+        return plt.fignum_exists(self.fig.number)
+
+    def highlight(self, player_sector):
+        self.nodes.set_facecolor(_with_player(self.order, self.base_colors, player_sector))
+        self.fig.canvas.draw_idle()
+
+
+def type_color(node_type):
+    return TYPE_COLORS.get(node_type, NORMAL_COLOR)
+
+
+def _with_player(order, base_colors, player_sector):
+    colors = list(base_colors)
+    if player_sector in order:
+        colors[order[player_sector]] = PLAYER_COLOR
+    return colors
+
+
+def node_icon(data):
+    """Port / planet icons for a node's label."""
+    if data["has_port"] and data["has_planet"]:
+        return "◉◆"
+    if data["has_port"]:
+        return "◆"
+    if data["has_planet"]:
+        return "◉"
+    return ""
+
+
+def draw_galaxy(ax, G, pos, nodelist, colors, title="Galaxy Map"):
+    """
+    Draw the dark-mode map with labels and legend onto `ax`.
+    Returns the node collection so its colors can be updated.
+    """
+    labels = {n: f"{n} {node_icon(G.nodes[n])}" for n in nodelist}
 
     # White edges
     nx.draw_networkx_edges(
         G, pos,
+        ax=ax,
         width=2.0,
         alpha=0.7,
         edge_color="white"
     )
 
     # Larger nodes with white outline
-    nx.draw_networkx_nodes(
+    nodes = nx.draw_networkx_nodes(
         G, pos,
+        ax=ax,
+        nodelist=nodelist,
         node_color=colors,
         node_size=1500,
         edgecolors="white",
@@ -83,22 +400,22 @@ def render_galaxy_map(galaxy, player_sector=None, save_png=False):
     nx.draw_networkx_labels(
         G, pos,
         labels,
+        ax=ax,
         font_size=12,
         font_color="white"
     )
 
-    
 # ============================================================
 # LEGEND — MATCHES ACTUAL COLORS & SHOWS PORT/PLANET ICONS
 # ============================================================
 
     legend_patches = [
-        mpatches.Patch(color="#339900", label="Player Sector"),
-        mpatches.Patch(color="#FFCC33", label="Stardock"),
-        mpatches.Patch(color="#0000FF", label="Fedspace"),
-        mpatches.Patch(color="#CA0533", label="Pirate Sector"),
-        mpatches.Patch(color="#808080", label="Dead End"),
-        mpatches.Patch(color="#CC6600", label="Standard Sector"),
+        mpatches.Patch(color=PLAYER_COLOR, label="Player Sector"),
+        mpatches.Patch(color=TYPE_COLORS["STARDOCK"], label="Stardock"),
+        mpatches.Patch(color=TYPE_COLORS["FEDSPACE"], label="Fedspace"),
+        mpatches.Patch(color=TYPE_COLORS["PIRATE"], label="Pirate Sector"),
+        mpatches.Patch(color=TYPE_COLORS["DEADEND"], label="Dead End"),
+        mpatches.Patch(color=NORMAL_COLOR, label="Standard Sector"),
     ]
 
     # Additional symbol-based legend items
@@ -118,7 +435,7 @@ def render_galaxy_map(galaxy, player_sector=None, save_png=False):
         label="◉◆  Planet + Port"
     )
 
-    legend = plt.legend(
+    legend = ax.legend(
         handles=legend_patches + [legend_ports, legend_planets, legend_both],
         loc="upper left",
         framealpha=0.6,
@@ -133,10 +450,111 @@ def render_galaxy_map(galaxy, player_sector=None, save_png=False):
         text.set_color("white")
 
     # Title
-    plt.title("Galaxy Map", fontsize=16, fontweight="bold", color="white")
-    plt.axis("off")
+    ax.set_title(title, fontsize=16, fontweight="bold", color="white")
+    ax.axis("off")
+    return nodes
+
+
+def render_galaxy_map(galaxy, player_sector=None, save_png=False, radius=None):
+    """
+    Enhanced Galaxy Map (Dark Mode + Legend)
+    With a radius, only the sectors within `radius` warps of
+    player_sector are drawn.
+    With save_png the map is also written to MAP_PNG. On a backend
+    with no display (e.g. Agg on a server) nothing is shown; use
+    save_png, export_map() or map_tiles.py there.
+    """
+    G, pos, title = None, None, "Galaxy Map"
+    if radius is None:
+        topology = topology_hash(galaxy)
+    else:
+        G, title = _local_map(galaxy, player_sector, radius)
+        topology = subgraph_hash(G)
+
+    view = _open_maps.get(galaxy)
+    if view is not None and view.topology == topology and view.is_open():
+        view.highlight(player_sector)
+        if save_png:
+            view.fig.savefig(MAP_PNG, facecolor="black")
+        plt.show()
+        return
+
+    if G is None:
+        G = build_graph(galaxy)
+        pos = galaxy_layout(galaxy, G)
+    else:
+        pos = local_layout(G, player_sector)
+    nodelist = list(G.nodes())
+    order = {n: i for i, n in enumerate(nodelist)}
+    base_colors = [type_color(G.nodes[n]["type"]) for n in nodelist]
+
+    # Bigger figure
+    fig = plt.figure(figsize=(16, 12))
+    fig.patch.set_facecolor("black")
+    nodes = draw_galaxy(fig.gca(), G, pos, nodelist, _with_player(order, base_colors, player_sector), title)
+    _open_maps[galaxy] = _MapView(topology, fig, nodes, order, base_colors)
+
+    if save_png:
+        fig.savefig(MAP_PNG, facecolor="black")
+        print(f"Map saved to {MAP_PNG}.")
+
+    if not _has_display():
+        plt.close(fig)
+        return
 
     if save_png:
         print("Close the map window to return to the game.")
 
     plt.show()
+
+
+def _local_map(galaxy, center, radius):
+    """(neighborhood graph, title) for a radius map."""
+    if center is None:
+        raise ValueError("A radius map needs player_sector as its center.")
+    if radius < 0:
+        raise ValueError("The map radius cannot be negative.")
+    G = build_local_graph(galaxy, center, radius)
+    warps = "warp" if radius == 1 else "warps"
+    return G, f"Sectors within {radius} {warps} of {center}"
+
+
+def _has_display():
+    return plt.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+
+
+# ============================================================
+# HEADLESS EXPORT
+# ============================================================
+
+def export_map(galaxy, filename, player_sector=None, title=None, radius=None):
+    """
+    Write the map to `filename` (.png, .svg or any format matplotlib
+    knows) without pyplot or a display, through the Agg canvas.
+    With a radius, only player_sector's neighborhood is drawn, as in
+    render_galaxy_map(). Whole galaxies too large to label are drawn
+    as a sector-type density overview instead (see map_tiles.py).
+    """
+    if radius is not None:
+        G, local_title = _local_map(galaxy, player_sector, radius)
+        pos = local_layout(G, player_sector)
+        title = title or local_title
+    elif len(galaxy.sectors) > LABELED_MAP_MAX:
+        from map_tiles import TileSet
+
+        TileSet(galaxy, cache_dir=None).export_overview(filename, title=title or "Galaxy Map")
+        return filename
+    else:
+        G = build_graph(galaxy)
+        pos = galaxy_layout(galaxy, G)
+        title = title or "Galaxy Map"
+    nodelist = list(G.nodes())
+    order = {n: i for i, n in enumerate(nodelist)}
+    colors = _with_player(order, [type_color(G.nodes[n]["type"]) for n in nodelist], player_sector)
+
+    fig = Figure(figsize=(16, 12))
+    FigureCanvasAgg(fig)
+    fig.patch.set_facecolor("black")
+    draw_galaxy(fig.add_subplot(), G, pos, nodelist, colors, title=title)
+    fig.savefig(filename, facecolor="black")
+    return filename
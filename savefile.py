@@ -0,0 +1,399 @@
+# savefile.py
+# ============================================================
+# Save-file formats for TW2025
+#
+# JSON (savegame.json) stays the default. Alongside it there is a
+# compact binary format, written as a stream straight from the
+# live Galaxy:
+#
+#   header        magic, version, table sizes
+#   meta          small JSON blob: turn/time/day, player, galaxy info
+#   sector table  fixed-width rows (id, type, flags, port/planet row)
+#   lane table    CSR: num_sectors + 1 offsets, then neighbor ids
+#   port table    fixed-width rows (name ref, class, levels, prices)
+#   planet table  fixed-width rows (name ref, goods, treasury, rates)
+#   string pool   UTF-8 port and planet names
+#
+# Every table starts on an 8-byte boundary at an offset that can be
+# computed from the header alone, so readers can jump straight to
+# any row. read_save() detects the format from the first bytes and
+# always returns the same dict shape that json.load() produces.
+# ============================================================
+
+import json
+import struct
+
+from port import COMMODITIES, PORT_TYPES
+
+MAGIC = b"TW25SAV\0"
+VERSION = 1
+BINARY_EXTENSION = ".tw25"
+
+# magic, version, header size, sectors, lane entries, ports, planets,
+# meta bytes, reserved, string pool bytes
+HEADER = struct.Struct("<8sHHIIIIIIQ")
+
+# id, type code, flags, (pad), port row, planet row  (-1 = none)
+SECTOR_ROW = struct.Struct("<IBBHii")
+FLAG_PIRATES = 0x01
+
+LANE_ENTRY = struct.Struct("<I")
+
+# name offset, name length, type_id, (pad), levels x3, prices x3
+PORT_ROW = struct.Struct("<IIB3x3i3i")
+
+# sector id, name offset, name length, treasury, goods x3, rates x3,
+# last production turn
+PLANET_ROW = struct.Struct("<IIIq3q3iq")
+
+
+# Meta keys every reader relies on, and the player fields Ship.from_dict() needs.
+META_KEYS = ("turn", "time", "day", "player", "num_sectors", "galaxy_turn", "sector_types")
+PLAYER_KEYS = ("hull", "max_hull", "attack", "defense", "fuel", "max_holds", "credits", "cargo", "location")
+
+# Lane indexes hold sector ids as signed 32-bit ints.
+MAX_SECTOR_ID = 2 ** 31 - 1
+
+
+class SaveFormatError(ValueError):
+    """Raised when a binary save is truncated, corrupt or too new."""
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def section_offsets(counts):
+    """
+    Byte offset of every section, from the values in the header.
+    `counts` maps sectors / lanes / ports / planets / meta to sizes.
+    """
+    offsets = {}
+    pos = _align(HEADER.size)
+    offsets["meta"] = pos
+    pos = _align(pos + counts["meta"])
+    offsets["sectors"] = pos
+    pos = _align(pos + counts["sectors"] * SECTOR_ROW.size)
+    offsets["lane_offsets"] = pos
+    pos = _align(pos + (counts["sectors"] + 1) * LANE_ENTRY.size)
+    offsets["lanes"] = pos
+    pos = _align(pos + counts["lanes"] * LANE_ENTRY.size)
+    offsets["ports"] = pos
+    pos = _align(pos + counts["ports"] * PORT_ROW.size)
+    offsets["planets"] = pos
+    pos = _align(pos + counts["planets"] * PLANET_ROW.size)
+    offsets["strings"] = pos
+    return offsets
+
+
+def parse_header(buf):
+    """Decode and check the header at the start of `buf`."""
+    if len(buf) < HEADER.size:
+        raise SaveFormatError("Save file is too short.")
+    (magic, version, header_size, n_sectors, n_lanes, n_ports,
+     n_planets, meta_len, _reserved, pool_len) = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise SaveFormatError("Not a TW2025 binary save.")
+    if version > VERSION:
+        raise SaveFormatError(f"Save format version {version} is newer than this game.")
+    if header_size != HEADER.size:
+        raise SaveFormatError("Unexpected save header size.")
+    return {
+        "version": version,
+        "sectors": n_sectors,
+        "lanes": n_lanes,
+        "ports": n_ports,
+        "planets": n_planets,
+        "meta": meta_len,
+        "strings": pool_len,
+    }
+
+
+def parse_meta(raw):
+    """Decode and check the meta blob (bytes)."""
+    try:
+        meta = json.loads(raw)
+    except ValueError as exc:
+        raise SaveFormatError("Save metadata is damaged.") from exc
+    if not isinstance(meta, dict) or not all(key in meta for key in META_KEYS):
+        raise SaveFormatError("Save metadata is incomplete.")
+    meta.setdefault("commodities", COMMODITIES)
+    player = meta["player"]   # None in galaxy-only saves
+    if (
+        not (player is None or isinstance(player, dict) and all(key in player for key in PLAYER_KEYS))
+        or not isinstance(meta["sector_types"], list)
+        or not isinstance(meta["commodities"], list)
+        or len(meta["commodities"]) != len(COMMODITIES)
+        or not all(c in meta["commodities"] for c in COMMODITIES)
+    ):
+        raise SaveFormatError("Save metadata is damaged.")
+    return meta
+
+
+def check_sector_row(row, counts, sector_types):
+    """Raise SaveFormatError unless a SECTOR_ROW's references are in range."""
+    sid, type_code, _, _, port_row, planet_row = row
+    if (
+        sid > MAX_SECTOR_ID
+        or type_code >= len(sector_types)
+        or not -1 <= port_row < counts["ports"]
+        or not -1 <= planet_row < counts["planets"]
+    ):
+        raise SaveFormatError(f"Save file has a damaged row for sector {sid}.")
+
+
+def check_port_type(type_id):
+    """Port classes must be ones Port knows (see PORT_TYPES)."""
+    if type_id not in PORT_TYPES:
+        raise SaveFormatError(f"Save file has an unknown port class {type_id}.")
+
+
+def check_lane_offsets(lane_offsets, counts):
+    """The CSR offsets must climb from 0 to the header's lane count."""
+    if lane_offsets[0] != 0 or lane_offsets[-1] != counts["lanes"] or any(
+        a > b for a, b in zip(lane_offsets, lane_offsets[1:])
+    ):
+        raise SaveFormatError("Save file has a damaged lane table.")
+
+
+def pool_text(buf, pool, counts, off, length):
+    """Name at `off` in the string pool that starts at byte `pool` of buf."""
+    if off + length > counts["strings"]:
+        raise SaveFormatError("Save file has a damaged name.")
+    try:
+        return bytes(buf[pool + off:pool + off + length]).decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise SaveFormatError("Save file has a damaged name.") from exc
+
+
+# ============================================================
+# Writing
+# ============================================================
+
+def write_binary_save(fp, galaxy, turn=0, time=0, day=0, player=None,
+                      snapshot_id=None):
+    """
+    Stream `galaxy` (plus game clock and player dict) to the binary
+    file object `fp`. Sections are written row by row; only the
+    port and planet names are held until the string pool is written.
+    """
+    sectors = galaxy.sectors
+
+    # Pass 1: table sizes, string-pool size, sector-type vocabulary
+    sector_types = []
+    type_codes = {}
+    n_lanes = n_ports = n_planets = pool_len = 0
+    for sec in sectors.values():
+        if sec.type not in type_codes:
+            type_codes[sec.type] = len(sector_types)
+            sector_types.append(sec.type)
+        n_lanes += len(sec.neighbors)
+        if sec.port is not None:
+            n_ports += 1
+            pool_len += len(sec.port.name.encode("utf-8"))
+        if sec.planet is not None:
+            n_planets += 1
+            pool_len += len(sec.planet.name.encode("utf-8"))
+
+    meta = json.dumps(
+        {
+            "turn": turn,
+            "time": time,
+            "day": day,
+            "player": player,
+            "snapshot_id": snapshot_id,
+            "num_sectors": galaxy.num_sectors,
+            "galaxy_turn": galaxy.turn,
+            "sector_types": sector_types,
+            "commodities": COMMODITIES,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    # Names are written last, in the string pool; rows point into it.
+    names = []
+    pool_used = 0
+
+    def intern(name):
+        nonlocal pool_used
+        data = name.encode("utf-8")
+        names.append(data)
+        pool_used += len(data)
+        return pool_used - len(data), len(data)
+
+    counts = {
+        "sectors": len(sectors),
+        "lanes": n_lanes,
+        "ports": n_ports,
+        "planets": n_planets,
+        "meta": len(meta),
+    }
+    offsets = section_offsets(counts)
+    written = 0
+
+    def emit(data):
+        nonlocal written
+        fp.write(data)
+        written += len(data)
+
+    def seek_to(section):
+        emit(b"\0" * (offsets[section] - written))
+
+    emit(HEADER.pack(
+        MAGIC, VERSION, HEADER.size, len(sectors), n_lanes, n_ports,
+        n_planets, len(meta), 0, pool_len,
+    ))
+    seek_to("meta")
+    emit(meta)
+
+    # Sector table
+    seek_to("sectors")
+    port_row = planet_row = 0
+    for sid, sec in sectors.items():
+        emit(SECTOR_ROW.pack(
+            sid,
+            type_codes[sec.type],
+            FLAG_PIRATES if sec.has_pirates else 0,
+            0,
+            port_row if sec.port else -1,
+            planet_row if sec.planet else -1,
+        ))
+        port_row += sec.port is not None
+        planet_row += sec.planet is not None
+
+    # Lane table (CSR)
+    seek_to("lane_offsets")
+    total = 0
+    emit(LANE_ENTRY.pack(0))
+    for sec in sectors.values():
+        total += len(sec.neighbors)
+        emit(LANE_ENTRY.pack(total))
+    seek_to("lanes")
+    for sec in sectors.values():
+        row = sorted(sec.neighbors)
+        emit(struct.pack(f"<{len(row)}I", *row))
+
+    # Port table
+    seek_to("ports")
+    for sec in sectors.values():
+        port = sec.port
+        if port is None:
+            continue
+        name_off, name_len = intern(port.name)
+        emit(PORT_ROW.pack(
+            name_off, name_len, port.type_id,
+            *(port.commodity_levels[c] for c in COMMODITIES),
+            *(port.prices[c] for c in COMMODITIES),
+        ))
+
+    # Planet table
+    seek_to("planets")
+    for sec in sectors.values():
+        planet = sec.planet
+        if planet is None:
+            continue
+        goods = planet.goods   # settles pending production
+        name_off, name_len = intern(planet.name)
+        emit(PLANET_ROW.pack(
+            planet.sector_id, name_off, name_len, planet.treasury,
+            *(goods[c] for c in COMMODITIES),
+            *(planet.production_rates.get(c, 0) for c in COMMODITIES),
+            planet.last_production_turn,
+        ))
+
+    seek_to("strings")
+    for data in names:
+        emit(data)
+
+
+# ============================================================
+# Reading
+# ============================================================
+
+def read_binary_save(buf):
+    """
+    Decode a whole binary save (bytes-like) into the same dict that
+    json.load() returns for a JSON save.
+    """
+    view = memoryview(buf)
+    counts = parse_header(view)
+    offsets = section_offsets(counts)
+    if len(view) < offsets["strings"] + counts["strings"]:
+        raise SaveFormatError("Save file is truncated.")
+
+    meta = parse_meta(bytes(view[offsets["meta"]:offsets["meta"] + counts["meta"]]))
+    sector_types = meta["sector_types"]
+    commodities = meta["commodities"]
+    pool = offsets["strings"]
+
+    def text(off, length):
+        return pool_text(view, pool, counts, off, length)
+
+    n = counts["sectors"]
+    lane_offsets = struct.unpack_from(f"<{n + 1}I", view, offsets["lane_offsets"])
+    check_lane_offsets(lane_offsets, counts)
+    lanes = struct.unpack_from(f"<{counts['lanes']}I", view, offsets["lanes"])
+
+    ports = []
+    for row in PORT_ROW.iter_unpack(view[offsets["ports"]:offsets["ports"] + counts["ports"] * PORT_ROW.size]):
+        name_off, name_len, type_id = row[:3]
+        check_port_type(type_id)
+        ports.append({
+            "name": text(name_off, name_len),
+            "type_id": type_id,
+            "commodity_levels": dict(zip(commodities, row[3:6])),
+            "prices": dict(zip(commodities, row[6:9])),
+        })
+
+    planets = []
+    for row in PLANET_ROW.iter_unpack(view[offsets["planets"]:offsets["planets"] + counts["planets"] * PLANET_ROW.size]):
+        sector_id, name_off, name_len, treasury = row[:4]
+        planets.append({
+            "name": text(name_off, name_len),
+            "sector_id": sector_id,
+            "goods": dict(zip(commodities, row[4:7])),
+            "treasury": treasury,
+            "production_rates": dict(zip(commodities, row[7:10])),
+            "last_production_turn": row[10],
+        })
+
+    sectors = {}
+    start = offsets["sectors"]
+    for i, row in enumerate(SECTOR_ROW.iter_unpack(view[start:start + n * SECTOR_ROW.size])):
+        check_sector_row(row, counts, sector_types)
+        sid, type_code, flags, _, port_row, planet_row = row
+        sectors[sid] = {
+            "id": sid,
+            "neighbors": list(lanes[lane_offsets[i]:lane_offsets[i + 1]]),
+            "type": sector_types[type_code],
+            "has_pirates": bool(flags & FLAG_PIRATES),
+            "port": ports[port_row] if port_row >= 0 else None,
+            "planet": planets[planet_row] if planet_row >= 0 else None,
+        }
+
+    return {
+        "turn": meta["turn"],
+        "time": meta["time"],
+        "day": meta["day"],
+        "player": meta["player"],
+        "snapshot_id": meta.get("snapshot_id"),
+        "galaxy": {
+            "num_sectors": meta["num_sectors"],
+            "turn": meta["galaxy_turn"],
+            "sectors": sectors,
+        },
+    }
+
+
+def is_binary_save(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_save(filename):
+    """Load a save of either format, picked by its first bytes."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return read_binary_save(data)
+    return json.loads(data)
@@ -4,14 +4,16 @@
 # =====================================================
 
 from dataclasses import dataclass, field
+from journal import Tracked
 
 COMMODITIES = ["ore", "organics", "equipment"]
 
 
 @dataclass
-class Ship:
+class Ship(Tracked):
     """
     Represents the player's ship.
+    Changes are reported to the save journal's tracker once attached.
     """
     name: str = "GodSpeed II"
     max_hull: int = 100
@@ -55,6 +57,7 @@ class Ship:
         if self.free_holds < amount:
             raise ValueError("Not enough cargo space.")
         self.cargo[commodity] += amount
+        self.mark_dirty()
 
     def remove_cargo(self, commodity: str, amount: int) -> None:
         if commodity not in self.cargo:
@@ -64,10 +67,12 @@ class Ship:
         if self.cargo[commodity] < amount:
             raise ValueError("Not enough cargo to remove.")
         self.cargo[commodity] -= amount
+        self.mark_dirty()
 
     def clear_all_cargo(self) -> None:
         for c in self.cargo:
             self.cargo[c] = 0
+        self.mark_dirty()
 
     # -------------------------------------------------
     # Hull / Combat
@@ -0,0 +1,375 @@
+# simulate.py
+# ============================================================
+# Parallel headless games for economy balancing
+#
+# Runs many independent TW25Game instances across a process pool,
+# one game per task, each with its own seed and galaxy size and a
+# simple policy:
+#   greedy   follow the AUTOTRADE pick: fly to the buy port, buy
+#            max, fly to the sell port, quick-sell, repeat
+#   wander   random warps (a baseline for the greedy numbers)
+#
+# Games run in fast mode through TW25Game.execute(), so nothing
+# sleeps. Each finished game's metrics are streamed back and
+# appended to a compact columnar file as soon as it completes:
+#
+#   header   magic, version, schema size, then the schema as JSON
+#   blocks   table id, row count, then each column's raw
+#            little-endian array data, one column after another
+#
+# Two tables: "turns" (credits, fuel and hull sampled over turns)
+# and "games" (one summary row per game: deaths, fuel stalls...).
+# read_columns() concatenates the blocks back into one array per
+# column, ready to aggregate.
+#
+# Usage:
+#   python simulate.py --games 32 --sectors 100 200 --turns 500 --seed 1
+# ============================================================
+
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from autotrade import find_trade_routes
+from rng import RandomStreams
+from tw25 import TW25Game
+
+MAGIC = b"TW25SIM\0"
+VERSION = 1
+DEFAULT_OUTPUT = "simulation.tw25sim"
+
+# magic, version, schema bytes
+HEADER = struct.Struct("<8sHI")
+# table id, rows
+BLOCK = struct.Struct("<BI")
+
+# table -> [(column, array typecode)]
+SCHEMA = {
+    "turns": [
+        ("game", "I"), ("turn", "I"), ("credits", "q"),
+        ("fuel", "i"), ("hull", "i"), ("stalls", "I"),
+    ],
+    "games": [
+        ("game", "I"), ("seed", "Q"), ("sectors", "I"), ("turns", "I"),
+        ("credits", "q"), ("died", "B"), ("stalls", "I"),
+    ],
+}
+TABLES = list(SCHEMA)
+
+
+class SimFormatError(ValueError):
+    """Raised when a simulation file is truncated, corrupt or too new."""
+
+
+@dataclass(frozen=True)
+class GameSpec:
+    """One simulated game: its seed, galaxy size and policy."""
+    game: int
+    seed: int
+    sectors: int = 100
+    turns: int = 500
+    policy: str = "greedy"
+    sample_every: int = 1     # record every Nth turn (plus the last)
+
+
+# ----------------------------------------------------------
+# Policies
+# ----------------------------------------------------------
+
+class GreedyTrader:
+    """
+    Trades the AUTOTRADE route: warp to its buy port, BUY MAX,
+    warp to its sell port, QSELL, then ask again.
+    Waits when out of fuel or when nothing is profitable.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.plan = []
+
+    def next_command(self):
+        game = self.game
+        if game.player.fuel <= 0:
+            return "wait"
+
+        if self.plan and self.plan[0].startswith("move "):
+            # Replan if something (a pirate fight, say) moved us off course.
+            if int(self.plan[0].split()[1]) not in game.current_sector().neighbors:
+                self.plan = []
+
+        if not self.plan:
+            self.plan = self._plan_route()
+        return self.plan.pop(0) if self.plan else "wait"
+
+    def _plan_route(self):
+        galaxy = self.game.galaxy
+        routes = find_trade_routes(galaxy, top_k=1)
+        if not routes:
+            return []
+
+        best = routes[0]
+        to_buy = galaxy.shortest_path(self.game.player.location, best.from_sid)
+        to_sell = galaxy.shortest_path(best.from_sid, best.to_sid)
+        if to_buy is None or to_sell is None:
+            return []
+
+        return (
+            [f"move {sid}" for sid in to_buy[1:]]
+            + [f"buy max {best.commodity}"]
+            + [f"move {sid}" for sid in to_sell[1:]]
+            + ["qsell"]
+        )
+
+
+class Wanderer:
+    """Warps to a random neighbor every turn, waiting when out of fuel."""
+
+    def __init__(self, game):
+        self.game = game
+        self.rng = game.streams.stream("policy")
+
+    def next_command(self):
+        if self.game.player.fuel <= 0:
+            return "wait"
+        neighbors = sorted(self.game.current_sector().neighbors)
+        return f"move {self.rng.choice(neighbors)}" if neighbors else "wait"
+
+
+POLICIES = {
+    "greedy": GreedyTrader,
+    "wander": Wanderer,
+}
+
+
+# ----------------------------------------------------------
+# Running Games
+# ----------------------------------------------------------
+
+def play_game(spec):
+    """
+    Play one game to spec.turns (or its end) in this process.
+    Returns (turn columns, summary row) for the "turns" and
+    "games" tables.
+    """
+    game = TW25Game(num_sectors=spec.sectors, seed=spec.seed,
+                    show_intro=False, fast=True)
+    policy = POLICIES[spec.policy](game)
+    ship = game.player
+
+    turns = {name: array(code) for name, code in SCHEMA["turns"]}
+    stalls = 0
+    played = 0
+    over = False
+
+    for turn in range(1, spec.turns + 1):
+        # A fuel stall is a turn that starts with an empty tank.
+        if ship.fuel <= 0:
+            stalls += 1
+        over = game.execute(policy.next_command()).game_over
+        played = turn
+
+        if over or turn % spec.sample_every == 0 or turn == spec.turns:
+            for name, value in (("game", spec.game), ("turn", turn),
+                                ("credits", ship.credits), ("fuel", ship.fuel),
+                                ("hull", ship.hull), ("stalls", stalls)):
+                turns[name].append(value)
+        if over:
+            break
+
+    summary = {
+        "game": spec.game,
+        "seed": spec.seed,
+        "sectors": spec.sectors,
+        "turns": played,
+        "credits": ship.credits,
+        "died": int(ship.is_destroyed),
+        "stalls": stalls,
+    }
+    return turns, summary
+
+
+def make_specs(seed, games, sizes=(100,), turns=500, policy="greedy", sample_every=1):
+    """`games` GameSpecs cycling through `sizes`, seeds derived from `seed`."""
+    streams = RandomStreams(seed)
+    return [
+        GameSpec(
+            game=i,
+            seed=streams.spawn(i).seed,
+            sectors=sizes[i % len(sizes)],
+            turns=turns,
+            policy=policy,
+            sample_every=sample_every,
+        )
+        for i in range(games)
+    ]
+
+
+def run_simulations(specs, filename=DEFAULT_OUTPUT, workers=None, on_game=None):
+    """
+    Play every spec across a pool of `workers` processes (default:
+    one per core), appending each game's rows to `filename` as it
+    finishes. on_game(summary) is called in completion order.
+    Returns the summaries, ordered by game number.
+    """
+    summaries = []
+    with open(filename, "wb") as fp, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = ColumnWriter(fp)
+        futures = [pool.submit(play_game, spec) for spec in specs]
+        for future in as_completed(futures):
+            turns, summary = future.result()
+            writer.write("turns", turns)
+            writer.write("games", {
+                name: array(code, [summary[name]]) for name, code in SCHEMA["games"]
+            })
+            summaries.append(summary)
+            if on_game is not None:
+                on_game(summary)
+
+    summaries.sort(key=lambda s: s["game"])
+    return summaries
+
+
+# ----------------------------------------------------------
+# Columnar File
+# ----------------------------------------------------------
+
+class ColumnWriter:
+    """Appends blocks of column arrays to an open binary file."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        schema = json.dumps({
+            table: [[name, code, array(code).itemsize] for name, code in columns]
+            for table, columns in SCHEMA.items()
+        }).encode("utf-8")
+        fp.write(HEADER.pack(MAGIC, VERSION, len(schema)))
+        fp.write(schema)
+
+    def write(self, table, columns):
+        rows = len(columns[SCHEMA[table][0][0]])
+        if not rows:
+            return
+        self.fp.write(BLOCK.pack(TABLES.index(table), rows))
+        for name, code in SCHEMA[table]:
+            column = columns[name]
+            if len(column) != rows:
+                raise ValueError(f"Column {table}.{name} has {len(column)} rows, expected {rows}.")
+            if sys.byteorder == "big":
+                column = array(code, column)
+                column.byteswap()
+            self.fp.write(column.tobytes())
+        self.fp.flush()
+
+
+def read_columns(filename):
+    """
+    Load a simulation file as {table: {column: array}}, every
+    block of a table concatenated in the order it was written.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+
+    if len(data) < HEADER.size:
+        raise SimFormatError("Simulation file is truncated.")
+    magic, version, schema_size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise SimFormatError("Not a TW2025 simulation file.")
+    if version > VERSION:
+        raise SimFormatError(f"Simulation file version {version} is newer than supported ({VERSION}).")
+
+    pos = HEADER.size
+    schema = json.loads(data[pos:pos + schema_size])
+    pos += schema_size
+
+    tables = {}
+    for table, columns in schema.items():
+        for name, code, size in columns:
+            if array(code).itemsize != size:
+                raise SimFormatError(f"Column {table}.{name} was written with {size}-byte items.")
+        tables[table] = {name: array(code) for name, code, _ in columns}
+
+    table_names = list(schema)
+    while pos < len(data):
+        if len(data) - pos < BLOCK.size:
+            raise SimFormatError("Simulation file is truncated.")
+        table_id, rows = BLOCK.unpack_from(data, pos)
+        pos += BLOCK.size
+        if table_id >= len(table_names):
+            raise SimFormatError(f"Unknown table id {table_id}.")
+        table = table_names[table_id]
+        for name, code, size in schema[table]:
+            end = pos + rows * size
+            if end > len(data):
+                raise SimFormatError("Simulation file is truncated.")
+            chunk = array(code)
+            chunk.frombytes(data[pos:end])
+            if sys.byteorder == "big":
+                chunk.byteswap()
+            tables[table][name].extend(chunk)
+            pos = end
+
+    return tables
+
+
+def summarize(tables):
+    """Per galaxy size: games, mean final credits, death rate, mean stalls."""
+    games = tables["games"]
+    by_size = {}
+    for i, size in enumerate(games["sectors"]):
+        by_size.setdefault(size, []).append(i)
+
+    report = {}
+    for size, rows in sorted(by_size.items()):
+        n = len(rows)
+        report[size] = {
+            "games": n,
+            "mean_credits": sum(games["credits"][i] for i in rows) / n,
+            "death_rate": sum(games["died"][i] for i in rows) / n,
+            "mean_stalls": sum(games["stalls"][i] for i in rows) / n,
+        }
+    return report
+
+
+# ----------------------------------------------------------
+# Command Line
+# ----------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless TW2025 games in parallel.")
+    parser.add_argument("--games", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--sectors", type=int, nargs="+", default=[100],
+                        help="galaxy sizes, cycled across games")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sample-every", type=int, default=1)
+    parser.add_argument("--out", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    streams = RandomStreams(args.seed)
+    specs = make_specs(streams.seed, args.games, args.sectors, args.turns,
+                       args.policy, args.sample_every)
+
+    print(f"Simulating {len(specs)} games (seed {streams.seed}) -> {args.out}")
+
+    def progress(s):
+        fate = "destroyed" if s["died"] else f"{s['credits']} cr"
+        print(f"  game {s['game']:>4}  {s['sectors']:>5} sectors  "
+              f"{s['turns']:>5} turns  {fate:>12}  {s['stalls']} fuel stalls")
+
+    run_simulations(specs, args.out, args.workers, on_game=progress)
+
+    print("\nSectors  Games  Mean credits  Deaths  Fuel stalls")
+    for size, row in summarize(read_columns(args.out)).items():
+        print(f"{size:>7}  {row['games']:>5}  {row['mean_credits']:>12.0f}  "
+              f"{row['death_rate']:>6.0%}  {row['mean_stalls']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# snapshot.py
+# ============================================================
+# Memory-mapped, read-only galaxy snapshots for TW2025
+#
+# Opens a binary save (see savefile.py) with mmap and serves it
+# without decoding the whole file:
+#   - GalaxySnapshot reads single sector / port / planet rows and
+#     the CSR lane table straight from the mapped buffer
+#   - LazySectors is the Galaxy.sectors mapping for a snapshot
+#     galaxy; a live Sector (with its Port / Planet) is built the
+#     first time it is looked up and kept from then on
+#
+# The file itself is never written through the map. Call
+# Galaxy.release_snapshot() before overwriting it.
+# ============================================================
+
+import mmap
+import struct
+from array import array
+from collections.abc import MutableMapping
+
+from navigation import LaneIndex
+from savefile import (
+    FLAG_PIRATES,
+    LANE_ENTRY,
+    PLANET_ROW,
+    PORT_ROW,
+    SECTOR_ROW,
+    SaveFormatError,
+    check_lane_offsets,
+    check_port_type,
+    check_sector_row,
+    parse_header,
+    parse_meta,
+    pool_text,
+    section_offsets,
+)
+
+
+class GalaxySnapshot:
+    """Random access to one binary save through a read-only mmap."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.counts = parse_header(self._map)
+        self.offsets = section_offsets(self.counts)
+        if len(self._map) < self.offsets["strings"] + self.counts["strings"]:
+            self.close()
+            raise SaveFormatError("Save file is truncated.")
+
+        start = self.offsets["meta"]
+        try:
+            self.meta = parse_meta(self._map[start:start + self.counts["meta"]])
+        except SaveFormatError:
+            self.close()
+            raise
+        self.sector_types = self.meta["sector_types"]
+        self.commodities = self.meta["commodities"]
+
+        # Sector ids are almost always 1..N in row order; then a row
+        # is a subtraction away. Otherwise index the ids once.
+        n = self.counts["sectors"]
+        self._base = None
+        self._rows = None
+        if n and self.sector_id(n - 1) - self.sector_id(0) + 1 == n:
+            self._base = self.sector_id(0)
+        elif n:
+            self._rows = {sid: row for row, sid in enumerate(self.sector_ids())}
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __len__(self):
+        return self.counts["sectors"]
+
+    # ----------------------------------------------------------
+    # Sector Rows
+    # ----------------------------------------------------------
+
+    def sector_id(self, row):
+        return struct.unpack_from("<I", self._map, self.offsets["sectors"] + row * SECTOR_ROW.size)[0]
+
+    def sector_ids(self):
+        start = self.offsets["sectors"]
+        table = memoryview(self._map)[start:start + len(self) * SECTOR_ROW.size]
+        base = self._base
+        try:
+            for row, values in enumerate(SECTOR_ROW.iter_unpack(table)):
+                if base is not None and values[0] != base + row:
+                    raise SaveFormatError("Save file has a damaged sector table.")
+                yield values[0]
+        finally:
+            table.release()
+
+    def row_of(self, sid):
+        """Row number for a sector id, or None if it isn't in the file."""
+        if self._rows is not None:
+            return self._rows.get(sid)
+        if self._base is None or not isinstance(sid, int):
+            return None
+        row = sid - self._base
+        if 0 <= row < len(self) and self.sector_id(row) == sid:
+            return row
+        return None
+
+    def sector_info(self, row):
+        """One sector as the dict Galaxy.sector_to_dict() would produce."""
+        values = SECTOR_ROW.unpack_from(self._map, self.offsets["sectors"] + row * SECTOR_ROW.size)
+        check_sector_row(values, self.counts, self.sector_types)
+        sid, type_code, flags, _, port_row, planet_row = values
+        return {
+            "id": sid,
+            "neighbors": self.neighbors(row),
+            "type": self.sector_types[type_code],
+            "has_pirates": bool(flags & FLAG_PIRATES),
+            "port": self.port_info(port_row) if port_row >= 0 else None,
+            "planet": self.planet_info(planet_row) if planet_row >= 0 else None,
+        }
+
+    def neighbors(self, row):
+        """Neighbor sector ids of one row, in file (ascending) order."""
+        lo, hi = struct.unpack_from("<2I", self._map, self.offsets["lane_offsets"] + row * LANE_ENTRY.size)
+        if not lo <= hi <= self.counts["lanes"]:
+            raise SaveFormatError("Save file has a damaged lane table.")
+        return list(struct.unpack_from(f"<{hi - lo}I", self._map, self.offsets["lanes"] + lo * LANE_ENTRY.size))
+
+    def _text(self, off, length):
+        return pool_text(self._map, self.offsets["strings"], self.counts, off, length)
+
+    def port_info(self, row):
+        values = PORT_ROW.unpack_from(self._map, self.offsets["ports"] + row * PORT_ROW.size)
+        check_port_type(values[2])
+        return {
+            "name": self._text(values[0], values[1]),
+            "type_id": values[2],
+            "commodity_levels": dict(zip(self.commodities, values[3:6])),
+            "prices": dict(zip(self.commodities, values[6:9])),
+        }
+
+    def planet_info(self, row):
+        values = PLANET_ROW.unpack_from(self._map, self.offsets["planets"] + row * PLANET_ROW.size)
+        return {
+            "name": self._text(values[1], values[2]),
+            "sector_id": values[0],
+            "goods": dict(zip(self.commodities, values[4:7])),
+            "treasury": values[3],
+            "production_rates": dict(zip(self.commodities, values[7:10])),
+            "last_production_turn": values[10],
+        }
+
+    # ----------------------------------------------------------
+    # Lanes
+    # ----------------------------------------------------------
+
+    def lane_index(self):
+        """
+        LaneIndex for the whole file, built from the CSR table without
+        creating any Sector. Falls back to None when the file's rows
+        aren't in ascending id order (LaneIndex requires that) or a
+        lane leads to a sector that isn't in the file.
+        """
+        if self._base is None:
+            return None
+        n = len(self)
+        base = self._base
+        offsets = struct.unpack_from(f"<{n + 1}I", self._map, self.offsets["lane_offsets"])
+        check_lane_offsets(offsets, self.counts)
+        offsets = array("i", offsets)
+        lanes = struct.unpack_from(f"<{self.counts['lanes']}I", self._map, self.offsets["lanes"])
+        if lanes and (min(lanes) < base or max(lanes) >= base + n):
+            return None
+        neighbor_rows = array("i", (sid - base for sid in lanes))
+        return LaneIndex(array("i", range(base, base + n)), offsets, neighbor_rows)
+
+
+class LazySectors(MutableMapping):
+    """
+    Galaxy.sectors for a snapshot galaxy. Iteration and membership
+    only read the mapped file; indexing materializes a live Sector
+    through Galaxy._restore_sector and caches it. Also serves the
+    arrays of a bulk-generated galaxy (galaxygen.GalaxyBlueprint).
+    """
+
+    def __init__(self, snapshot, galaxy):
+        self.snapshot = snapshot
+        self.galaxy = galaxy
+        self.loaded = {}
+
+    def __getitem__(self, sid):
+        sec = self.loaded.get(sid)
+        if sec is not None:
+            return sec
+        row = self.snapshot.row_of(sid)
+        if row is None:
+            raise KeyError(sid)
+        return self.galaxy._restore_sector(sid, self.snapshot.sector_info(row))
+
+    def __setitem__(self, sid, sec):
+        self.loaded[sid] = sec
+
+    def __delitem__(self, sid):
+        raise TypeError("Sectors cannot be removed from a snapshot galaxy.")
+
+    def __contains__(self, sid):
+        return sid in self.loaded or self.snapshot.row_of(sid) is not None
+
+    def __iter__(self):
+        return self.snapshot.sector_ids()
+
+    def __len__(self):
+        return len(self.snapshot)
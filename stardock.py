@@ -3,13 +3,19 @@
 # STARDOCK — "THE CELESTIAL BAZAAR"
 # ============================================================
 
-import random
 import textwrap
 
 from time import sleep
 from descriptions import depart
 from ui import Color
 from utils import clearscr
+from rng import make_rng
+from combat_sim import compare_builds
+
+# Corporate Concourse upgrades that change how a pirate fight goes.
+HULL_REPAIR = 10        # hull points per repair
+CARGO_EXPANSION = 5     # holds per expansion; free holds aid escape
+ANALYST_BATTLES = 2000  # simulated fights per build the analyst compares
 
 # ============================================================
 # LOCAL INPUT WRAPPER (avoids circular import with tw25)
@@ -26,9 +32,15 @@ def sd_input(prompt="> "):
 
 
 class StarDock:
-    def __init__(self, ship, galaxy):
+    def __init__(self, ship, galaxy, rng=None):
         self.ship = ship
         self.galaxy = galaxy
+        self.rng = make_rng(rng)   # gambling, rumors, shop stock
+
+        # Console hooks; TW25Game swaps these when run headless.
+        self.prompt = sd_input
+        self.pause = sleep
+        self.clear = clearscr
 
     # ------------------------------------------------------------
     # Entry Point
@@ -49,25 +61,25 @@ class StarDock:
             print("5. Tech Lab (Experimental Mods)")
             print("0. Return to Space")
 
-            cmd = sd_input("\nChoose destination: ")
+            cmd = self.prompt("\nChoose destination: ")
 
             if cmd == "1":
-                clearscr()
+                self.clear()
                 self.corporate_concourse()
             elif cmd == "2":
-                clearscr()
+                self.clear()
                 self.bank()
             elif cmd == "3":
-                clearscr()
+                self.clear()
                 self.rusty_nebula()
             elif cmd == "4":
-                clearscr()
+                self.clear()
                 self.market()
             elif cmd == "5":
-                clearscr()
+                self.clear()
                 self.tech_lab()
             elif cmd == "0":
-                print(depart())
+                print(depart(self.rng))
                 #print("\nYou step back onto your ship as the airlock seals behind you...")
                 return
 
@@ -76,11 +88,11 @@ class StarDock:
     # ------------------------------------------------------------
     def _print_banner(self):
         print(Color.BRIGHT_RED+"Approach vector locked. Thrusters balanced.")
-        sleep(3.0)
+        self.pause(3.0)
         print("         .......Your ship breaks through the swirling traffic lanes.")
-        sleep(3.0)
+        self.pause(3.0)
         print("...Freighters claw for docking priority, shuttles scream past your hull, and warning klaxons erupt like gunfire")
-        sleep(3.1)
+        self.pause(3.1)
         print()
         print(Color.BRIGHT_YELLOW+
             textwrap.fill
@@ -103,14 +115,15 @@ class StarDock:
             print("2. Upgrade Shields")
             print("3. Expand Cargo Hold")
             print("4. Purchase Star Charts")
+            print("5. Consult Combat Analyst")
             print("0. Return")
 
-            cmd = sd_input("\nSelect: ")
+            cmd = self.prompt("\nSelect: ")
 
             # Repair Hull
             if cmd == "1":
                 cost = 150
-                healed = 10
+                healed = HULL_REPAIR
 
                 if self.ship.credits < cost:
                     print("You cannot afford repairs.")
@@ -118,7 +131,7 @@ class StarDock:
 
                 self.ship.spend_credits(cost)
                 self.ship.hull = min(self.ship.max_hull, self.ship.hull + healed)
-                clearscr()
+                self.clear()
                 print(f"Hull repaired by {healed} points.")
 
             # Upgrade Shields
@@ -132,16 +145,16 @@ class StarDock:
 
                 self.ship.spend_credits(cost)
                 self.ship.shields += boost          # <-- FIXED
-                clearscr()
+                self.clear()
                 print(f"Shield capacity upgraded by {boost}.")
 
 
             # Expand Cargo Hold
             elif cmd == "3":
                 cost = 5000
-                clearscr()
-                print(f"Expanding cargo hold by +5 units costs {cost} credits.")
-                confirm = sd_input("Proceed? (y/n) ")
+                self.clear()
+                print(f"Expanding cargo hold by +{CARGO_EXPANSION} units costs {cost} credits.")
+                confirm = self.prompt("Proceed? (y/n) ")
 
                 if confirm.startswith("y"):
                     if self.ship.credits < cost:
@@ -149,8 +162,8 @@ class StarDock:
                         continue
 
                     self.ship.spend_credits(cost)
-                    self.ship.max_holds += 5        # <-- ONLY THIS
-                    clearscr()
+                    self.ship.max_holds += CARGO_EXPANSION   # <-- ONLY THIS
+                    self.clear()
                     print(f"Cargo capacity expanded! New capacity: {self.ship.max_holds}")
 
                 else:
@@ -161,10 +174,34 @@ class StarDock:
             elif cmd == "4":
                 print("Corporate AI injects updated star charts into nav system.")
 
+            # Combat odds for the upgrades above
+            elif cmd == "5":
+                self.combat_analyst()
+
             elif cmd == "0":
-                clearscr()
+                self.clear()
                 return
 
+    def combat_analyst(self):
+        """
+        Simulated pirate-fight odds (combat_sim.py) for the ship as
+        it is and with each concourse upgrade that affects combat.
+        """
+        ship = self.ship
+        builds = {"Expand Cargo Hold": {"max_holds": ship.max_holds + CARGO_EXPANSION}}
+        if ship.hull < ship.max_hull:
+            builds["Repair Hull"] = {"hull": min(ship.max_hull, ship.hull + HULL_REPAIR)}
+        try:
+            odds = compare_builds(ship, builds, ANALYST_BATTLES, rng=self.rng.getrandbits(32))
+        except ImportError:
+            print("The analyst's terminal is dark today.")
+            return
+
+        self.clear()
+        print(f"A combat analyst runs {ANALYST_BATTLES} simulated pirate encounters per build:")
+        for label, o in odds.items():
+            print(f"  {label:<18} win {o.win_rate:4.0%}  escape {o.escape_rate:4.0%}  death {o.death_rate:4.0%}")
+
     # ------------------------------------------------------------
     # Bank — Citadel Vaults
     # ------------------------------------------------------------
@@ -178,10 +215,10 @@ class StarDock:
             print("3. Check Interest Rate")
             print("0. Return")
 
-            cmd = sd_input("\nSelect: ")
+            cmd = self.prompt("\nSelect: ")
 
             if cmd == "1":
-                amt = int(sd_input("Amount to deposit: "))
+                amt = int(self.prompt("Amount to deposit: "))
                 if amt > self.ship.credits:
                     print("You do not have that many credits.")
                     continue
@@ -190,7 +227,7 @@ class StarDock:
                 print("Deposited.")
 
             elif cmd == "2":
-                amt = int(sd_input("Withdraw how much: "))
+                amt = int(self.prompt("Withdraw how much: "))
                 if amt > self.ship.bank_balance:
                     print("Insufficient funds.")
                     continue
@@ -203,14 +240,14 @@ class StarDock:
                 print("Interest accrues automatically each game day (0.5%).")
 
             elif cmd == "0":
-                clearscr()
+                self.clear()
                 return
 
     # ------------------------------------------------------------
     # Rusty Nebula — Seedy Cantina
     # ------------------------------------------------------------
     def rusty_nebula(self):
-        clearscr()
+        self.clear()
         print("\n--- THE RUSTY NEBULA ---")
         print("A smoky bar full of mercs, scammers, dancers, and hustlers.\n")
 
@@ -221,20 +258,20 @@ class StarDock:
             print("4. Black Market Upgrades (Coming Soon)")
             print("0. Return")
 
-            cmd = sd_input("\nSelect: ")
+            cmd = self.prompt("\nSelect: ")
 
             if cmd == "1":
-                clearscr()
+                self.clear()
                 self._random_rumor()
             elif cmd == "2":
-                clearscr()
+                self.clear()
                 self._gambling_den()
             elif cmd == "3":
                 print("Mercenaries unavailable — union strike.")
             elif cmd == "4":
                 print("Black market closed after a shootout.")
             elif cmd == "0":
-                clearscr()
+                self.clear()
                 return
 
     def _random_rumor(self):
@@ -258,20 +295,20 @@ class StarDock:
 
         print(Color.YELLOW+"\nA stranger leans close and mutters:")
         #print(  \"" + random.choice(rumors) + "\"\n)
-        print(f"   {random.choice(rumors)}\n"+Color.RESET)
+        print(f"   {self.rng.choice(rumors)}\n"+Color.RESET)
         print(">---#---< >---#---< >---#---<")
 
 
     def _gambling_den(self):
         print("\nYou sit at a neon-lit gambling table.")
-        bet = int(sd_input("Place your bet: "))
+        bet = int(self.prompt("Place your bet: "))
 
         if bet > self.ship.credits:
             print("You can't bet more credits than you have.")
             return
 
         self.ship.spend_credits(bet)
-        roll = random.randint(1, 100)
+        roll = self.rng.randint(1, 100)
 
         if roll > 50:
             winnings = bet * 2
@@ -292,16 +329,16 @@ class StarDock:
             print("2. Browse Exotic Wares")
             print("0. Return")
 
-            cmd = sd_input("\nSelect: ")
+            cmd = self.prompt("\nSelect: ")
 
             if cmd == "1":
                 print("A clerk offers a gold-trimmed hull paintjob.")
             elif cmd == "2":
-                item = random.choice(["Glitter Spice", "Xeno Wine", "Star Silk", "Void Perfume"])
-                price = random.randint(100, 500)
+                item = self.rng.choice(["Glitter Spice", "Xeno Wine", "Star Silk", "Void Perfume"])
+                price = self.rng.randint(100, 500)
                 print(f"Exotic item: {item} — {price} credits")
             elif cmd == "0":
-                clearscr()
+                self.clear()
                 return
 
     # ------------------------------------------------------------
@@ -317,7 +354,7 @@ class StarDock:
             print("3. Commission Prototype Tech (Random Effect)")
             print("0. Return")
 
-            cmd = sd_input("\nSelect: ")
+            cmd = self.prompt("\nSelect: ")
 
             if cmd == "1":
                 cost = 600
@@ -342,7 +379,7 @@ class StarDock:
                     print("Insufficient credits.")
                     continue
                 self.ship.spend_credits(cost)
-                effect = random.choice([
+                effect = self.rng.choice([
                     "hull reinforced (+5 hull)",
                     "sensor boost (+1 range — cosmetic)",
                     "ship AI optimized (no visible effect)",
@@ -351,5 +388,5 @@ class StarDock:
                 print(f"Prototype tech installed: {effect}")
 
             elif cmd == "0":
-                clearscr()
+                self.clear()
                 return
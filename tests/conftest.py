@@ -0,0 +1,9 @@
+# conftest.py
+# The game's modules live at the repository root (galaxy.py,
+# savefile.py, ...) next to the game.network package; make them
+# importable however pytest is started.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
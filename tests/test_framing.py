@@ -0,0 +1,84 @@
+# test_framing.py
+# FrameDecoder (game/network/framing.py) against arbitrary stream
+# fragmentation, for both codecs.
+
+import pytest
+
+from game.network.framing import FrameDecoder
+from game.network.packets import (
+    CODEC_BINARY,
+    CODEC_JSON,
+    CODECS,
+    CHAT_MESSAGE,
+    FRAME_HEADER,
+    HEARTBEAT_PING,
+    PLAYER_CONNECT,
+    PLAYER_MOVE,
+    get_codec,
+)
+from game.network.server import frame_packet
+
+PACKETS = [
+    (PLAYER_MOVE, {"player_id": 1, "from_sector": 2, "to_sector": 3}),
+    (CHAT_MESSAGE, {"from": "Kestrel", "text": "line one — ✓"}),
+    (HEARTBEAT_PING, {"seq": 9, "sent_at": 12.5}),
+    (CHAT_MESSAGE, {"from": "Kestrel", "text": ""}),
+]
+EXPECTED = [{"type": t, "payload": p} for t, p in PACKETS]
+
+
+def stream(codec):
+    return b"".join(frame_packet(codec, t, p) for t, p in PACKETS)
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    return get_codec(request.param)
+
+
+def test_byte_at_a_time(codec):
+    decoder = FrameDecoder(codec)
+    received = []
+    for byte in stream(codec):
+        received.extend(decoder.feed(bytes([byte])))
+    assert received == EXPECTED
+    assert len(decoder) == 0
+
+
+def test_many_packets_in_one_chunk(codec):
+    decoder = FrameDecoder(codec)
+    data = stream(codec)
+    assert list(decoder.feed(data + data[:5])) == EXPECTED
+    assert len(decoder) == 5
+    assert list(decoder.feed(data[5:])) == EXPECTED
+    assert len(decoder) == 0
+
+
+def test_oversize_frame_rejected(codec):
+    big = frame_packet(codec, CHAT_MESSAGE, {"text": "x" * 200})
+
+    # Whole frame in one chunk, and the limit crossed while waiting.
+    with pytest.raises(ValueError, match="maximum frame size"):
+        list(FrameDecoder(codec, max_frame=100).feed(big))
+    decoder = FrameDecoder(codec, max_frame=100)
+    with pytest.raises(ValueError, match="maximum frame size"):
+        for i in range(0, len(big), 16):
+            list(decoder.feed(big[i:i + 16]))
+
+
+def test_frame_at_the_limit_accepted(codec):
+    frame = frame_packet(codec, CHAT_MESSAGE, {"text": "x" * 200})
+    body = len(frame) - (FRAME_HEADER.size if codec.framed else len(b"\n"))
+    decoder = FrameDecoder(codec, max_frame=body)
+    assert [p["payload"] for p in decoder.feed(frame)] == [{"text": "x" * 200}]
+
+
+def test_switch_codec_after_handshake():
+    json_codec, binary = get_codec(CODEC_JSON), get_codec(CODEC_BINARY)
+    hello = frame_packet(json_codec, PLAYER_CONNECT, {"codecs": [CODEC_BINARY]})
+    decoder = FrameDecoder(json_codec)
+
+    packets = decoder.feed(hello + stream(binary))
+    assert next(packets)["type"] == PLAYER_CONNECT
+    decoder.set_codec(binary)
+    assert list(packets) == EXPECTED
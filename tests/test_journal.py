@@ -0,0 +1,129 @@
+# test_journal.py
+# Incremental saves: a snapshot plus journaled deltas (journal.py)
+# must load back to the live game, and unsafe journals must not be
+# extended.
+
+import json
+import random
+
+import pytest
+
+from journal import journal_path, replay_journal
+from savefile import read_save
+from tw25 import TW25Game
+
+COMMANDS = ["move", "move", "buy ore 3", "sell ore 2", "qsell", "wait", "scan"]
+DELTAS = 6
+
+
+def game_state(game):
+    galaxy = game.galaxy.to_dict()
+    sectors = {
+        int(sid): {**info, "neighbors": sorted(info["neighbors"])}
+        for sid, info in galaxy["sectors"].items()
+    }
+    return {
+        "clock": (game.turn, game.time, game.day, game.galaxy.turn),
+        "player": game.player.to_dict(),
+        "sectors": sectors,
+    }
+
+
+def play(game, rng, commands=5):
+    for _ in range(commands):
+        cmd = rng.choice(COMMANDS)
+        if cmd == "move":
+            cmd = f"move {rng.choice(sorted(game.current_sector().neighbors))}"
+        game.execute(cmd)
+
+
+def load(path):
+    return TW25Game(savefile=str(path), show_intro=False, fast=True)
+
+
+@pytest.fixture
+def played(tmp_path):
+    """A game saved once as a snapshot, then DELTAS times as deltas."""
+    path = tmp_path / "game.json"
+    game = TW25Game(num_sectors=40, seed=3, show_intro=False, fast=True)
+    game.player.max_hull = game.player.hull = 10 ** 9
+    rng = random.Random(8)
+
+    play(game, rng)
+    game.save_game(str(path))
+    snapshot_state = game_state(game)
+
+    for _ in range(DELTAS):
+        play(game, rng)
+        game.save_game(str(path))
+    return game, path, snapshot_state
+
+
+def test_replay_after_deltas_matches_live_game(played):
+    game, path, snapshot_state = played
+    assert game.journal.entries == DELTAS
+    assert game_state(game) != snapshot_state
+
+    loaded = load(path)
+    assert game_state(loaded) == game_state(game)
+    assert loaded.journal.entries == DELTAS
+
+
+def test_torn_last_line_keeps_earlier_deltas(played):
+    game, path, _ = played
+    with open(journal_path(str(path)), "a") as f:
+        f.write('{"turn": 99, "time"')
+
+    _, journal = replay_journal(read_save(path), str(path))
+    assert journal is None
+
+    loaded = load(path)
+    assert game_state(loaded) == game_state(game)
+    assert loaded.journal is None   # next save writes a full snapshot
+
+
+def test_journal_for_another_snapshot_is_ignored(played):
+    _, path, snapshot_state = played
+    jpath = journal_path(str(path))
+    with open(jpath) as f:
+        lines = f.readlines()
+    lines[0] = json.dumps({"snapshot_id": "some-other-save"}) + "\n"
+    with open(jpath, "w") as f:
+        f.writelines(lines)
+
+    loaded = load(path)
+    assert game_state(loaded) == snapshot_state
+    assert loaded.journal is None
+
+
+def test_restore_is_clean_and_later_writes_are_tracked(played):
+    _, path, _ = played
+    loaded = load(path)
+    galaxy = loaded.galaxy
+    assert not galaxy.changes.dirty
+
+    sec = next(s for s in galaxy.sectors.values() if s.planet is not None)
+    sec.planet.treasury += 1
+    other = galaxy.sectors[next(iter(sec.neighbors))]
+    other.has_pirates = not other.has_pirates
+    assert galaxy.changes.dirty == {sec.id, other.id}
+
+
+def test_journaled_lane_reroutes_mapped_save(tmp_path):
+    path = tmp_path / "game.tw25"
+    game = TW25Game(num_sectors=40, seed=3, show_intro=False, fast=True)
+    game.save_game(str(path))
+
+    galaxy = game.galaxy
+    a = 10
+    b = max(galaxy.sectors, key=lambda sid: galaxy.shortest_distance(a, sid))
+    assert galaxy.shortest_distance(a, b) > 1
+    galaxy.add_lane(a, b)
+    game.save_game(str(path))
+    assert game.journal.entries == 1
+
+    loaded = load(path)
+    assert loaded.galaxy.snapshot is not None
+    assert b in loaded.galaxy.sectors[a].neighbors
+    assert loaded.galaxy.shortest_distance(a, b) == 1
+    assert loaded.galaxy.shortest_path(b, a) == [b, a]
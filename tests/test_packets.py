@@ -0,0 +1,146 @@
+# test_packets.py
+# Both packet codecs (game/network/packets.py) and codec negotiation.
+
+import asyncio
+
+import pytest
+
+from game.network.packets import (
+    CODEC_BINARY,
+    CODEC_JSON,
+    CODECS,
+    CHAT_MESSAGE,
+    COMMAND_RESULT,
+    FLAG_JSON_BODY,
+    FRAME_HEADER,
+    HEARTBEAT_PING,
+    HEARTBEAT_PONG,
+    PLAYER_CONNECT,
+    PLAYER_MOVE,
+    SECTOR_UPDATE,
+    decode_binary_packet,
+    get_codec,
+    negotiate_codec,
+)
+from game.network.server import GameServer, frame_packet, read_packet
+
+PACKETS = [
+    (PLAYER_CONNECT, {"name": "Kestrel", "codecs": [CODEC_BINARY, CODEC_JSON]}),
+    (PLAYER_MOVE, {"player_id": 4, "from_sector": 12, "to_sector": 913}),
+    (HEARTBEAT_PING, {"seq": 77, "sent_at": 1700000000.25}),
+    (HEARTBEAT_PONG, {"seq": 77, "sent_at": 1700000000.25}),
+    (CHAT_MESSAGE, {"from": "Kestrel", "text": "Ore at 12 — cheap ✓"}),
+    (SECTOR_UPDATE, {"tick": 3, "sectors": [{"id": 12, "players": [4], "has_pirates": False}]}),
+    (COMMAND_RESULT, {"command": "scan", "output": "...\n", "game_over": False, "sector": 12}),
+]
+
+
+@pytest.mark.parametrize("codec_name", sorted(CODECS))
+@pytest.mark.parametrize("packet_type,payload", PACKETS)
+def test_round_trip(codec_name, packet_type, payload):
+    codec = get_codec(codec_name)
+    encoded = codec.encode(packet_type, payload)
+    assert codec.decode(encoded) == {"type": packet_type, "payload": payload}
+
+
+def test_fixed_layouts_skip_json():
+    frame = get_codec(CODEC_BINARY).encode(PLAYER_MOVE, {"player_id": 1, "from_sector": 2, "to_sector": 3})
+    length, _, flags = FRAME_HEADER.unpack_from(frame)
+    assert flags == 0
+    assert length == 12
+
+
+@pytest.mark.parametrize("payload", [
+    {"seq": 1, "sent_at": 2.0, "extra": True},   # extra field
+    {"seq": "1", "sent_at": 2.0},                 # wrong type
+    {"seq": 2 ** 40, "sent_at": 2.0},             # out of range
+])
+def test_irregular_payloads_fall_back_to_json_body(payload):
+    frame = get_codec(CODEC_BINARY).encode(HEARTBEAT_PING, payload)
+    _, _, flags = FRAME_HEADER.unpack_from(frame)
+    assert flags & FLAG_JSON_BODY
+    assert decode_binary_packet(frame)["payload"] == payload
+
+
+@pytest.mark.parametrize("codec_name,bad", [
+    (CODEC_JSON, "not json"),
+    (CODEC_JSON, '{"type": "X"}'),
+    (CODEC_BINARY, b"\x00\x00"),
+    (CODEC_BINARY, FRAME_HEADER.pack(5, 1, FLAG_JSON_BODY) + b"{}"),
+    (CODEC_BINARY, FRAME_HEADER.pack(0, 250, 0)),
+])
+def test_malformed_packets_raise_value_error(codec_name, bad):
+    with pytest.raises(ValueError):
+        get_codec(codec_name).decode(bad)
+
+
+@pytest.mark.parametrize("offered,expected", [
+    ([CODEC_JSON, CODEC_BINARY], CODEC_BINARY),
+    ([CODEC_BINARY], CODEC_BINARY),
+    ((CODEC_BINARY,), CODEC_BINARY),
+    ([CODEC_JSON], CODEC_JSON),
+    (["msgpack"], CODEC_JSON),
+    ([], CODEC_JSON),
+    (None, CODEC_JSON),
+])
+def test_negotiation(offered, expected):
+    assert negotiate_codec(offered) == expected
+
+
+def test_negotiation_follows_server_preference():
+    offered = [CODEC_BINARY, CODEC_JSON]
+    assert negotiate_codec(offered, preference=(CODEC_JSON, CODEC_BINARY)) == CODEC_JSON
+    assert negotiate_codec(offered, preference=("msgpack",)) == CODEC_JSON
+
+
+@pytest.mark.parametrize("offered", [
+    CODEC_BINARY,             # a bare string, not a list
+    [[1]],                    # unhashable entry
+    [CODEC_BINARY, 2],
+    {CODEC_BINARY: True},
+    7,
+])
+def test_negotiation_rejects_malformed_offers(offered):
+    with pytest.raises(ValueError):
+        negotiate_codec(offered)
+
+
+def handshake(codecs):
+    """PLAYER_CONNECT with `codecs` to a fresh server; the reply or None."""
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda _, context: errors.append(context))
+        server = GameServer(num_sectors=20, seed=1)
+        await server.start("127.0.0.1", 0)
+        try:
+            json_codec = get_codec(CODEC_JSON)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(frame_packet(json_codec, PLAYER_CONNECT, {"name": "Probe", "codecs": codecs}))
+            try:
+                reply = await asyncio.wait_for(read_packet(reader, json_codec), 5)
+            except asyncio.IncompleteReadError:
+                reply = None
+            writer.close()
+        finally:
+            await server.close()
+        assert not errors
+        return reply
+
+    return asyncio.run(run())
+
+
+def test_server_handshake_negotiates():
+    reply = handshake([CODEC_JSON, CODEC_BINARY])
+    assert reply["payload"]["codec"] == CODEC_BINARY
+
+
+@pytest.mark.parametrize("codecs", [CODEC_BINARY, [[1]]])
+def test_server_drops_malformed_handshake(codecs):
+    assert handshake(codecs) is None
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("msgpack")
@@ -0,0 +1,196 @@
+# test_savefile.py
+# Binary saves (savefile.py) and mapped snapshots (snapshot.py)
+# must load to exactly what the JSON save of the same game does.
+
+import json
+import struct
+
+import pytest
+
+from galaxy import Galaxy
+from savefile import (
+    HEADER,
+    LANE_ENTRY,
+    MAGIC,
+    PORT_ROW,
+    SECTOR_ROW,
+    VERSION,
+    SaveFormatError,
+    parse_header,
+    read_save,
+    section_offsets,
+    write_binary_save,
+)
+from ship import Ship
+from snapshot import GalaxySnapshot
+from tw25 import TW25Game
+
+
+def normalized(galaxy_data):
+    """Galaxy dict with int sector keys and sorted lanes, for comparison."""
+    return {
+        "num_sectors": galaxy_data["num_sectors"],
+        "turn": galaxy_data["turn"],
+        "sectors": {
+            int(sid): {**info, "neighbors": sorted(info["neighbors"])}
+            for sid, info in galaxy_data["sectors"].items()
+        },
+    }
+
+
+@pytest.fixture
+def galaxy():
+    g = Galaxy(num_sectors=60, rng=5)
+    g.turn = 7
+    return g
+
+
+@pytest.fixture
+def player():
+    ship = Ship(credits=1234, location=3)
+    ship.cargo["ore"] = 4
+    return ship.to_dict()
+
+
+@pytest.fixture
+def binary_save(tmp_path, galaxy, player):
+    path = tmp_path / "game.tw25"
+    with open(path, "wb") as f:
+        write_binary_save(f, galaxy, turn=11, time=12, day=2, player=player, snapshot_id="abc")
+    return path
+
+
+def test_binary_round_trip_matches_json(tmp_path, galaxy, player, binary_save):
+    json_path = tmp_path / "game.json"
+    json_path.write_text(json.dumps({
+        "turn": 11, "time": 12, "day": 2, "player": player,
+        "snapshot_id": "abc", "galaxy": galaxy.to_dict(),
+    }))
+
+    from_json = read_save(json_path)
+    from_binary = read_save(binary_save)
+
+    assert normalized(from_binary["galaxy"]) == normalized(from_json["galaxy"])
+    for key in ("turn", "time", "day", "player", "snapshot_id"):
+        assert from_binary[key] == from_json[key]
+
+    restored = Galaxy.from_dict(from_binary["galaxy"])
+    assert normalized(restored.to_dict()) == normalized(galaxy.to_dict())
+
+
+def test_snapshot_serves_the_saved_sectors(galaxy, binary_save):
+    mapped = Galaxy.open_snapshot(str(binary_save))
+    try:
+        assert len(mapped.sectors) == len(galaxy.sectors)
+        assert normalized(mapped.to_dict()) == normalized(galaxy.to_dict())
+        for sid in galaxy.sectors:
+            assert mapped.lane_index().neighbors(sid) == sorted(galaxy.sectors[sid].neighbors)
+    finally:
+        mapped.release_snapshot()
+
+
+def test_truncated_save_is_rejected(tmp_path, binary_save):
+    data = binary_save.read_bytes()
+    for size in (len(MAGIC), HEADER.size, len(data) - 1):
+        cut = tmp_path / f"cut{size}.tw25"
+        cut.write_bytes(data[:size])
+        with pytest.raises(SaveFormatError):
+            read_save(cut)
+        with pytest.raises(SaveFormatError):
+            GalaxySnapshot(str(cut))
+
+
+def test_newer_version_is_rejected(tmp_path, binary_save):
+    data = bytearray(binary_save.read_bytes())
+    struct.pack_into("<H", data, len(MAGIC), VERSION + 1)
+    newer = tmp_path / "newer.tw25"
+    newer.write_bytes(bytes(data))
+
+    with pytest.raises(SaveFormatError, match="newer"):
+        read_save(newer)
+    with pytest.raises(SaveFormatError, match="newer"):
+        GalaxySnapshot(str(newer))
+
+
+def damage(path, tmp_path, edit):
+    """Copy of the save at path with edit(data, counts, offsets) applied."""
+    data = bytearray(path.read_bytes())
+    counts = parse_header(data)
+    edit(data, counts, section_offsets(counts))
+    damaged = tmp_path / "damaged.tw25"
+    damaged.write_bytes(bytes(data))
+    return damaged
+
+
+def sector_field(index, value, row=0):
+    def edit(data, counts, offsets):
+        start = offsets["sectors"] + row * SECTOR_ROW.size
+        values = list(SECTOR_ROW.unpack_from(data, start))
+        values[index] = value
+        SECTOR_ROW.pack_into(data, start, *values)
+    return edit
+
+
+def first_port_field(index, value):
+    def edit(data, counts, offsets):
+        row = list(PORT_ROW.unpack_from(data, offsets["ports"]))
+        row[index] = value
+        PORT_ROW.pack_into(data, offsets["ports"], *row)
+    return edit
+
+
+def meta_bytes(old, new):
+    def edit(data, counts, offsets):
+        start = offsets["meta"]
+        meta = bytes(data[start:start + counts["meta"]])
+        assert old in meta and len(old) == len(new)
+        data[start:start + counts["meta"]] = meta.replace(old, new, 1)
+    return edit
+
+
+def lane_offset(row, value):
+    def edit(data, counts, offsets):
+        LANE_ENTRY.pack_into(data, offsets["lane_offsets"] + row * LANE_ENTRY.size, value)
+    return edit
+
+
+@pytest.mark.parametrize("edit", [
+    sector_field(1, 200),                 # sector type code
+    sector_field(4, 10 ** 6),             # port row
+    sector_field(5, 10 ** 6),             # planet row
+    sector_field(0, 2 ** 32 - 1),         # sector id
+    first_port_field(0, 10 ** 6),         # name offset
+    first_port_field(1, 10 ** 6),         # name length
+    first_port_field(2, 99),              # port class
+    lane_offset(1, 10 ** 6),              # lane table
+    meta_bytes(b'"galaxy_turn"', b'"galaxy_tury"'),
+    meta_bytes(b'"sector_types"', b'"sector_typex"'),
+    meta_bytes(b'"credits"', b'"credity"'),
+    meta_bytes(b'"commodities":["ore"', b'"commodities":["orx"'),
+    meta_bytes(b'"turn":', b'"turn"!'),
+], ids=[
+    "type", "port", "planet", "sector-id", "name-offset", "name-length",
+    "port-class", "lanes", "galaxy-turn", "sector-types", "player",
+    "commodities", "json",
+])
+def test_damaged_save_raises_save_format_error(tmp_path, binary_save, edit):
+    damaged = damage(binary_save, tmp_path, edit)
+    with pytest.raises(SaveFormatError):
+        read_save(damaged)
+
+    # Mapped: found when the file is opened or the row is first read.
+    with pytest.raises(SaveFormatError):
+        galaxy = Galaxy.open_snapshot(str(damaged))
+        try:
+            galaxy.to_dict()
+            galaxy.lane_index()
+        finally:
+            galaxy.snapshot.close()
+
+
+def test_damaged_save_starts_a_fresh_game(tmp_path, binary_save, player, capsys):
+    # The row of the sector the player is in (ids are 1..N).
+    damaged = damage(binary_save, tmp_path, sector_field(1, 200, row=player["location"] - 1))
+    game = TW25Game(savefile=str(damaged), show_intro=False, fast=True)
+    assert "Could not load" in capsys.readouterr().out
+    assert game.galaxy.sectors
@@ -13,15 +13,30 @@
 #   - debug_tools.py (run_all_debug)
 # ============================================================
 
-import random
+import argparse
+import contextlib
+import io
 import textwrap
 import json
+import uuid
+
+from dataclasses import dataclass
 
 from time import sleep
 from ui import Color #Used to add a splash of color here and there
 from ship import Ship
 from port import COMMODITIES
 from galaxy import Galaxy
+from autotrade import find_trade_routes
+from savefile import (
+    BINARY_EXTENSION,
+    SaveFormatError,
+    is_binary_save,
+    read_save,
+    write_binary_save,
+)
+from journal import PLAYER_KEY, SaveJournal, replay_journal
+from rng import RandomStreams
 from combat import CombatEngine
 from stardock import StarDock
 from descriptions import depart
@@ -29,6 +44,12 @@ from descriptions import departPort
 from descriptions import landingPort
 from utils import clearscr
 
+# New galaxies this size or larger use Galaxy.generate_bulk().
+BULK_GENERATION_SECTORS = 20000
+
+# MAP on a galaxy too big to draw whole shows this many warps around you.
+MAP_LOCAL_RADIUS = 3
+
 # Optional: console clear (won't fully clear IDLE, but works in a real terminal)
 # ============================================================
 # UNIVERSAL CLEAR + INPUT WRAPPER
@@ -70,21 +91,112 @@ def game_input(prompt="> "):
 
 
 
+def _no_pause(seconds):
+    pass
+
+
+def _no_clear():
+    pass
+
+
+class ScriptedInput:
+    """
+    Stand-in for input() that replays the lines given to execute().
+    Raises EOFError once they run out, which closes whatever menu was
+    waiting for more input.
+    """
+
+    def __init__(self, lines=()):
+        self.lines = [str(line) for line in lines]
+
+    def __call__(self, prompt=""):
+        if not self.lines:
+            raise EOFError(prompt)
+        return self.lines.pop(0)
+
+
+@dataclass
+class CommandResult:
+    """What one execute() call did, with everything it printed."""
+    command: str
+    output: str
+    sector: int
+    game_over: bool = False
+    quit: bool = False
+
+
 class TW25Game:
-    def __init__(self, num_sectors: int = 24):
+    def __init__(self, num_sectors: int = 24, savefile=None, galaxy=None,
+                 player=None, show_intro=True, seed=None, fast=False):
         self.turn = 0
         self.max_turns = 9999
 
         # Simple in-game time system for interest, events, etc.
         self.time = 0   # increments every command
         self.day = 0    # increments every N actions
+        self.journal = None
+
+        # Console hooks. execute() swaps in scripted input; fast mode
+        # drops the dramatic pauses and screen clears.
+        self.fast = fast
+        self.prompt = input
+        self.pause = _no_pause if fast else sleep
+        self.clear = _no_clear if fast else clearscr
+
+        # One independent random stream per subsystem, all from `seed`,
+        # so a game can be replayed exactly.
+        self.streams = RandomStreams(seed)
+        self.rng = self.streams.stream("game")
+        self.text_rng = self.streams.stream("descriptions")
+
+        if galaxy is not None:
+            # Shared galaxy (multiplayer): just seat a ship in it. The
+            # galaxy's change tracker belongs to its host, so leave it be.
+            self.player = player if player is not None else Ship()
+            self.galaxy = galaxy
+            self.attach_ship_systems()
+            self.player.track(self.galaxy.changes, PLAYER_KEY)
+
+        # Resume from savefile when given (binary saves are mapped
+        # lazily); otherwise, or if it can't be read, start fresh.
+        elif savefile is None or not self.load_game(savefile, lazy=True):
+            self.player = Ship()
+            if num_sectors >= BULK_GENERATION_SECTORS:
+                # Huge universes are generated as arrays and built
+                # lazily; a market book would load every port at once.
+                self.galaxy = Galaxy.generate_bulk(num_sectors, rng=self.streams.stream("galaxy"))
+            else:
+                self.galaxy = Galaxy(num_sectors=num_sectors, rng=self.streams.stream("galaxy"))
+                self.enable_market_book()
+            self.attach_ship_systems()
+            self.start_change_tracking()
+
+        if show_intro:
+            self.intro()
+
+    def attach_ship_systems(self):
+        """(Re)build the combat engine and Stardock for player and galaxy."""
+        self.combat_engine = CombatEngine(self.player, rng=self.streams.stream("combat"))
+        self.stardock = StarDock(self.player, self.galaxy, rng=self.streams.stream("stardock"))
+        if self.fast:
+            self.stardock.pause = self.pause
+            self.stardock.clear = self.clear
+
+    def start_change_tracking(self, journal=None):
+        """
+        Track changes from here on for incremental saves. `journal` is
+        the save journal the current state already matches, if any.
+        """
+        self.player.track(self.galaxy.changes, PLAYER_KEY)
+        self.galaxy.changes.clear()
+        self.journal = journal
 
-        self.player = Ship()
-        self.galaxy = Galaxy(num_sectors=num_sectors)
-        self.combat_engine = CombatEngine(self.player)
-        self.stardock = StarDock(self.player, self.galaxy)
-
-        self.intro()
+    def enable_market_book(self):
+        """Use the shared NumPy market book when NumPy is installed."""
+        try:
+            self.galaxy.enable_market_book()
+        except ImportError:
+            pass
 
     # --------------------------------------------------------
     # Intro / Help
@@ -92,7 +204,7 @@ class TW25Game:
 
     def intro(self):
     
-        clearscr()
+        self.clear()
         print(Color.RED+r"""
                              _____             _     __        __                   
                             |_   _| __ __ _ __| |  __\ \      / /_ _ _ __ ___       
@@ -128,13 +240,16 @@ Commands:
   MARKET or MR         - Show galaxy-wide market report of all ports.
   AUTOTRADE or AT      - Suggest an optimal two-port trade route.
   MAP                  - Render and save a visual galaxy map (PNG).
+  MAP <warps>          - Map only the sectors within <warps> of you.
   DOCK                 - Enter Stardock (if in a Stardock sector).
   SAVE / LOAD          - Save or load your game.
   DEBUG ALL            - Run full galaxy diagnostics (dev tool).
+  DEBUG DIAMETER       - Galaxy diameter and center sectors (dev tool).
   CLEAR or CLS         - Attempt to clear the screen.
   Q or QUIT            - End the game.
 
-Port commands (inside PORT):
+Port commands (inside PORT, or straight from the bridge in a port
+sector, e.g. BUY ORE 10):
   BUY <commodity> <amount>
   BUY MAX <commodity>
   SELL <commodity> <amount>
@@ -159,18 +274,7 @@ Planet commands (inside LAND):
 
     def run(self):
         while True:
-            sec = self.current_sector()
-
-            # Check for death
-            if self.player.is_destroyed:
-                print(Color.RED+"\nYour ship has been destroyed. Game over."+Color.RESET)
-                break
-
-            # Simple win condition
-            if self.player.credits >= 5000000:
-                print("\nYour accounts overflow with credits.")
-                print("Merchants whisper your name with respect—and pirates with fear.")
-                print("You have effectively 'won' this sector of space. Well done, captain.")
+            if self.game_over():
                 break
 
             self.describe_location()
@@ -178,116 +282,213 @@ Planet commands (inside LAND):
             # Possible pirate encounter
             self.maybe_pirate_encounter()
 
-            cmd = input("\n[Terminal]: ").strip().lower()
+            cmd = self.prompt("\n[Terminal]: ").strip().lower()
             if not cmd:
                 continue
 
-            # Core commands
-            if cmd in ["?", "help", "h"]:
-                self.help()
-
-            elif cmd in ["q", "quit", "exit"]:
-                #print("\nAutosaving your game before exit...")
-                self.save_game()
-                print(Color.YELLOW+"Game saved. Safe travels, Captain."+Color.RESET)
+            if not self.handle_command(cmd):
                 break
 
-            elif cmd in ["clear", "cls"]:
-                clear_screen()
-                continue
+    def game_over(self):
+        """Print the ending and return True once the game has ended."""
+        # Check for death
+        if self.player.is_destroyed:
+            print(Color.RED+"\nYour ship has been destroyed. Game over."+Color.RESET)
+            return True
 
-            elif cmd == "save":
-                self.save_game()
-                # don't advance time on pure save
-                continue
+        # Simple win condition
+        if self.player.credits >= 5000000:
+            print("\nYour accounts overflow with credits.")
+            print("Merchants whisper your name with respect—and pirates with fear.")
+            print("You have effectively 'won' this sector of space. Well done, captain.")
+            return True
 
-            elif cmd == "load":
-                self.load_game()
-                # rebind convenience
-                sec = self.current_sector()
-                continue
+        return False
 
-            elif cmd == "dock" and sec.type == "STARDOCK":
-                clearscr()
-                self.stardock.enter()
-                # Stardock actions still count as time overall, but we continue loop.
-                # fall through to time advance at bottom
+    def handle_command(self, cmd: str):
+        """
+        Run one top-level command (already stripped and lowercased).
+        Returns False when the player quits.
+        """
+        sec = self.current_sector()
 
-            elif cmd.startswith("move") or cmd.startswith("m "):
-                self.command_move(cmd)
+        # Core commands
+        if cmd in ["?", "help", "h"]:
+            self.help()
 
-            elif cmd == "m":
-                self.command_move("m")
+        elif cmd in ["q", "quit", "exit"]:
+            #print("\nAutosaving your game before exit...")
+            self.save_game()
+            print(Color.YELLOW+"Game saved. Safe travels, Captain."+Color.RESET)
+            return False
 
-            elif cmd in ["scan"]:
-                self.scan()
+        elif cmd in ["clear", "cls"]:
+            self.clear()
+            return True
 
-            elif cmd in ["port", "p"]:
-                clearscr()
-                print(Color.GREEN+landingPort())
-                self.visit_port()
+        elif cmd == "save":
+            self.save_game()
+            # don't advance time on pure save
+            return True
 
-            elif cmd in ["land", "l"]:
-                self.land_on_planet()
+        elif cmd == "load":
+            self.load_game()
+            return True
 
-            elif cmd in ["status", "s"]:
-                self.show_status()
+        elif cmd == "dock" and sec.type == "STARDOCK":
+            self.clear()
+            self.stardock.enter()
+            # Stardock actions still count as time overall, but we continue loop.
+            # fall through to time advance at bottom
 
-            elif cmd in ["cargo", "c", "i"]:
-                self.show_cargo()
+        elif cmd.startswith("move") or cmd.startswith("m "):
+            self.command_move(cmd)
 
-            elif cmd in ["wait", "w"]:
-                self.wait_turn()
+        elif cmd == "m":
+            self.command_move("m")
 
-            elif cmd in ["market", "mr"]:
-                clearscr()
-                self.market_report()
+        elif cmd in ["scan"]:
+            self.scan()
 
-            elif cmd in ["autotrade", "auto-trade", "at"]:
-                self.auto_trade()
+        elif cmd in ["port", "p"]:
+            self.clear()
+            print(Color.GREEN+landingPort(self.text_rng))
+            self.visit_port()
 
-            elif cmd == "map":
-                try:
-                    clear_screen()
-                    print(Color.GREEN+"Trajectory locked. Engines humming. The void is watching. Launch the probe....")
-                    sleep(1.7)
-                    print("   Let the stars bear witness — deploy the seeker...")
-                    sleep(1.1)
-                    print("      Probe ignition in 3… 2… 1… tear open the veil")
-                    sleep(2.0)
-                    print("          Probe deployed. Destiny accepts our challenge...")
-                    sleep(3.0)
-                    print("...")
-                    sleep(.9)
-                    print("..............Receiving scan data...\n"+Color.RESET)
-                    sleep(2.4)
-                    from render_map import render_galaxy_map
-
-                    render_galaxy_map(
-                        self.galaxy,
-                        player_sector=self.player.location,
-                        save_png=True,
-                    )
-                except ImportError:
-                    print("Map rendering is not available (render_map.py missing).")
+        elif cmd in ["land", "l"]:
+            self.land_on_planet()
+
+        elif sec.port and (cmd.startswith(("buy ", "sell ")) or cmd in ["qsell", "q-sell", "repair"]):
+            # One-shot port trades without opening the PORT menu.
+            self.port_command(sec.port, cmd)
 
-            elif cmd == "debug all":
+        elif cmd in ["status", "s"]:
+            self.show_status()
+
+        elif cmd in ["cargo", "c", "i"]:
+            self.show_cargo()
+
+        elif cmd in ["wait", "w"]:
+            self.wait_turn()
+
+        elif cmd in ["market", "mr"]:
+            self.clear()
+            self.market_report()
+
+        elif cmd in ["autotrade", "auto-trade", "at"]:
+            self.auto_trade()
+
+        elif cmd == "map" or cmd.startswith("map "):
+            radius = None
+            if cmd != "map":
                 try:
-                    from debug_tools import run_all_debug
+                    radius = int(cmd.split()[1])
+                except ValueError:
+                    radius = None
+                if radius is None or radius < 0:
+                    print("Usage: MAP or MAP <warps>")
+                    return True
+            try:
+                self.clear()
+                print(Color.GREEN+"Trajectory locked. Engines humming. The void is watching. Launch the probe....")
+                self.pause(1.7)
+                print("   Let the stars bear witness — deploy the seeker...")
+                self.pause(1.1)
+                print("      Probe ignition in 3… 2… 1… tear open the veil")
+                self.pause(2.0)
+                print("          Probe deployed. Destiny accepts our challenge...")
+                self.pause(3.0)
+                print("...")
+                self.pause(.9)
+                print("..............Receiving scan data...\n"+Color.RESET)
+                self.pause(2.4)
+                from render_map import LABELED_MAP_MAX, render_galaxy_map
+
+                # Too big to draw whole; show the player's neighborhood.
+                if radius is None and len(self.galaxy.sectors) > LABELED_MAP_MAX:
+                    radius = MAP_LOCAL_RADIUS
+                render_galaxy_map(
+                    self.galaxy,
+                    player_sector=self.player.location,
+                    save_png=True,
+                    radius=radius,
+                )
+            except ImportError:
+                print("Map rendering is not available (render_map.py missing).")
+
+        elif cmd == "debug all":
+            try:
+                from debug_tools import run_all_debug
+
+                run_all_debug(self.galaxy)
+            except ImportError:
+                print("Debug tools not available (debug_tools.py missing).")
+
+        elif cmd == "debug diameter":
+            try:
+                from debug_tools import report_eccentricity
+
+                report_eccentricity(self.galaxy)
+            except ImportError:
+                print("Debug tools not available (debug_tools.py missing).")
 
-                    run_all_debug(self.galaxy)
-                except ImportError:
-                    print("Debug tools not available (debug_tools.py missing).")
+        else:
+            print("Unknown command. Type HELP for options.")
 
-            else:
-                print("Unknown command. Type HELP for options.")
+        # Turn + time progression
+        self.turn += 1
+        self.advance_time()
 
-            # Turn + time progression
-            self.turn += 1
-            self.advance_time()
+        # After each command, tick all planets
+        self.planet_production_tick()
+        return True
+
+    def execute(self, cmd: str, inputs=()):
+        """
+        Headless entry point: run one command and return a CommandResult
+        with everything it printed, e.g.
+
+            game = TW25Game(seed=7, show_intro=False, fast=True)
+            game.execute("buy ore 10")
+            game.execute("land", inputs=["1", "6"])   # status, leave
+
+        Menus that ask for more (PORT, LAND, DOCK, MOVE with no sector)
+        read their answers from `inputs` and close when they run out.
+        Afterwards the sector is described and pirates get their chance,
+        just like one pass of run(). A command that raises is reported
+        in the output and the game carries on.
+        """
+        cmd = cmd.strip().lower()
+        scripted = ScriptedInput(inputs)
+        saved = self.prompt, self.stardock.prompt
+        self.prompt = self.stardock.prompt = scripted
 
-            # After each command, tick all planets
-            self.planet_production_tick()
+        out = io.StringIO()
+        keep_going = True
+        try:
+            with contextlib.redirect_stdout(out):
+                try:
+                    if cmd:
+                        keep_going = self.handle_command(cmd)
+                except EOFError:
+                    print("\n(Menu closed: no more input was sent with the command.)")
+                except Exception as exc:
+                    print(f"\n(Command failed: {type(exc).__name__}: {exc})")
+                over = self.game_over()
+                if keep_going and not over:
+                    self.describe_location()
+                    self.maybe_pirate_encounter()
+                    over = self.game_over()
+        finally:
+            self.prompt, self.stardock.prompt = saved
+
+        return CommandResult(
+            command=cmd,
+            output=out.getvalue(),
+            sector=self.player.location,
+            game_over=over,
+            quit=not keep_going,
+        )
 
     # --------------------------------------------------------
     # Location / Status
@@ -298,43 +499,54 @@ Planet commands (inside LAND):
 
     def describe_location(self):
         sec = self.current_sector()
+        # Printed after every command, so the text is cached on the
+        # sector (see Sector.cached) and only rebuilt when it changes.
+        print(sec.cached("location", self.galaxy.lane_index(), self._location_text))
 
-        print(Color.RED+f"\n=== {sec.name} (#{sec.id}) ==="+Color.RESET)
-        neighbors = ", ".join(str(n) for n in sorted(sec.neighbors))
-        print(Color.MAGENTA+f"Connected sectors: {neighbors}"+Color.RESET)
+    def sorted_neighbors(self, sec):
+        """Ids of the sectors one warp from `sec`, in order (cached)."""
+        lanes = self.galaxy.lane_index()
+        return sec.cached("neighbors", lanes, lambda s: tuple(lanes.neighbors(s.id)))
+
+    def _location_text(self, sec):
+        lines = [Color.RED+f"\n=== {sec.name} (#{sec.id}) ==="+Color.RESET]
+        neighbors = ", ".join(str(n) for n in self.sorted_neighbors(sec))
+        lines.append(Color.MAGENTA+f"Connected sectors: {neighbors}"+Color.RESET)
 
         # Sector Type Announcements
         if sec.type == "STARDOCK":
-            print(Color.BRIGHT_YELLOW+"\n*=*=*=*=*=*=*=*=*=*=*=*="+Color.RESET)
-            print(Color.CYAN+"*=*=*=*=Stardock*=*=*=*="+Color.RESET)
-            print(Color.BRIGHT_YELLOW+"*=*=*=*=*=*=*=*=*=*=*=*="+Color.RESET)
-            print(Color.CYAN+"You see the massive shimmering superstructure of Stardock here.\n"+Color.RESET)
-            print("Type DOCK to enter the Celestial Bazaar.")
+            lines.append(Color.BRIGHT_YELLOW+"\n*=*=*=*=*=*=*=*=*=*=*=*="+Color.RESET)
+            lines.append(Color.CYAN+"*=*=*=*=Stardock*=*=*=*="+Color.RESET)
+            lines.append(Color.BRIGHT_YELLOW+"*=*=*=*=*=*=*=*=*=*=*=*="+Color.RESET)
+            lines.append(Color.CYAN+"You see the massive shimmering superstructure of Stardock here.\n"+Color.RESET)
+            lines.append("Type DOCK to enter the Celestial Bazaar.")
         elif sec.type == "FEDSPACE":
-            print(Color.BLUE+"This is secure FEDSPACE. Pirates avoid this region."+Color.RESET)
+            lines.append(Color.BLUE+"This is secure FEDSPACE. Pirates avoid this region."+Color.RESET)
         elif sec.type == "PIRATE":
-            print(Color.RED+"Warning: This region is known for pirate ambushes. Best to not linger for long in this sector."+Color.RESET)
+            lines.append(Color.RED+"Warning: This region is known for pirate ambushes. Best to not linger for long in this sector."+Color.RESET)
         elif sec.type == "DEADEND":
-            print("Dead-end sector — only one way in or out.")
+            lines.append("Dead-end sector — only one way in or out.")
 
         # Port
         if sec.port:
-            print(Color.GREEN+f"Port present: {sec.port.name} (Class {sec.port.class_code()})"+Color.RESET)
+            lines.append(Color.GREEN+f"Port present: {sec.port.name} (Class {sec.port.class_code()})"+Color.RESET)
 
         # Planet
         if sec.planet:
-            print(Color.GREEN+f"Planet present: {sec.planet.name}"+Color.RESET)
+            lines.append(Color.GREEN+f"Planet present: {sec.planet.name}"+Color.RESET)
 
         # Pirates
         if sec.has_pirates:
-            print(Color.YELLOW+"Long-range sensors ping: possible pirate activity nearby."+Color.RESET)
+            lines.append(Color.YELLOW+"Long-range sensors ping: possible pirate activity nearby."+Color.RESET)
+
+        return "\n".join(lines)
 
     def show_status(self):
-        clearscr()
+        self.clear()
         print(Color.RED+"Running diagnostics...")
-        sleep(2)
+        self.pause(2)
         print("         .........Processing ship data")
-        sleep(2)
+        self.pause(2)
         print("----------------------"+Color.RESET)
         print(Color.GREEN+self.player.status_summary()+Color.RESET)
 
@@ -351,7 +563,7 @@ Planet commands (inside LAND):
         sec = self.current_sector()
 
         if len(parts) == 1:
-            dest = input("Warp to which connected sector? ").strip()
+            dest = self.prompt("Warp to which connected sector? ").strip()
         else:
             dest = parts[1]
 
@@ -374,21 +586,27 @@ Planet commands (inside LAND):
 
     def scan(self):
         sec = self.current_sector()
-        print("\nScanning...")
-        for nid in sorted(sec.neighbors):
-            nsec = self.galaxy.get_sector(nid)
-            tags = []
-            if nsec.port:
-                tags.append(f"Port {nsec.port.class_code()}")
-            if nsec.planet:
-                tags.append("Planet")
-            if nsec.has_pirates:
-                tags.append("Pirates?")
-            tag_str = f" [{' ,'.join(tags)}]" if tags else ""
-            print(f"  Sector {nid}{tag_str}")
+        lanes = self.galaxy.lane_index()
+        rows = [
+            self.galaxy.get_sector(nid).cached("scan", lanes, self._scan_row)
+            for nid in self.sorted_neighbors(sec)
+        ]
+        print("\n".join(["\nScanning..."] + rows))
+
+    @staticmethod
+    def _scan_row(nsec):
+        tags = []
+        if nsec.port:
+            tags.append(f"Port {nsec.port.class_code()}")
+        if nsec.planet:
+            tags.append("Planet")
+        if nsec.has_pirates:
+            tags.append("Pirates?")
+        tag_str = f" [{' ,'.join(tags)}]" if tags else ""
+        return f"  Sector {nsec.id}{tag_str}"
 
     def wait_turn(self):
-        gained = random.randint(3, 8)
+        gained = self.rng.randint(3, 8)
         self.player.refuel(gained)
         print(
             f"You drift in space, running low-power drills. Fuel increases by {gained}."
@@ -399,10 +617,9 @@ Planet commands (inside LAND):
     # --------------------------------------------------------
 
     def planet_production_tick(self):
-        # Every turn, planets produce resources
-        for sec in self.galaxy.sectors.values():
-            if sec.planet:
-                sec.planet.production_tick()
+        # Every turn, planets produce resources. Each planet adds its
+        # rate x elapsed turns when it is next read.
+        self.galaxy.advance_turn()
 
     # --------------------------------------------------------
     # Port Interaction
@@ -431,74 +648,83 @@ Planet commands (inside LAND):
             print("  -Repair")
             print("  -L or Leave")
             print()
-            cmd = input("\n[Terminal]: ").strip().lower()
+            cmd = self.prompt("\n[Terminal]: ").strip().lower()
 
             if not cmd:
                 continue
 
-            if cmd in ["leave", "l", "exit"]:
-                clear_screen()
-                print(Color.GREEN+departPort()+Color.RESET)
+            if not self.port_command(port, cmd):
                 break
 
-            if cmd in ["q", "qsell", "q-sell", "sell all"]:
-                gained = port.quicksell(self.player)
-                if gained > 0:
-                    print(f"You quicksell your relevant cargo for {gained} credits.")
-                else:
-                    print("You have nothing this port wants to buy.")
-                continue
-
-            parts = cmd.split()
-
-            if parts[0] == "repair":
-                self.repair_ship_at_port()
-                continue
-
-            # BUY MAX <commodity>
-            if len(parts) >= 2 and parts[0] == "buy" and parts[1] == "max":
-                if len(parts) != 3:
-                    print("Usage: BUY MAX <commodity>")
-                    continue
-                commodity = parts[2]
-                if commodity not in COMMODITIES:
-                    print("Unknown commodity.")
-                    continue
-                try:
-                    amt = port.buy_max(self.player, commodity)
-                    if amt > 0:
-                        print(f"Purchased {amt} units of {commodity}.")
-                    else:
-                        print("You can't afford any, or have no cargo space.")
-                except ValueError as e:
-                    print(e)
-                continue
+    def port_command(self, port, cmd: str):
+        """
+        Run one port command (already stripped and lowercased) at `port`.
+        Returns False when the player leaves the port.
+        """
+        if cmd in ["leave", "l", "exit"]:
+            self.clear()
+            print(Color.GREEN+departPort(self.text_rng)+Color.RESET)
+            return False
+
+        if cmd in ["q", "qsell", "q-sell", "sell all"]:
+            gained = port.quicksell(self.player)
+            if gained > 0:
+                print(f"You quicksell your relevant cargo for {gained} credits.")
+            else:
+                print("You have nothing this port wants to buy.")
+            return True
 
-            # BUY/SELL <commodity> <amount>
-            if parts[0] in ["buy", "sell"] and len(parts) == 3:
-                action, commodity, amount = parts
-                if commodity not in COMMODITIES:
-                    print("Unknown commodity.")
-                    continue
-                if not amount.isdigit():
-                    print("Amount must be a positive number.")
-                    continue
-                amount = int(amount)
-                if amount <= 0:
-                    print("Amount must be positive.")
-                    continue
+        parts = cmd.split()
 
-                try:
-                    if action == "buy":
-                        port.buy_from_port(self.player, commodity, amount)
-                        print(f"Purchased {amount} units of {commodity}.")
-                    else:
-                        port.sell_to_port(self.player, commodity, amount)
-                        print(f"Sold {amount} units of {commodity}.")
-                except ValueError as e:
-                    print(e)
-            else:
-                print("Unknown port command.")
+        if parts[0] == "repair":
+            self.repair_ship_at_port()
+            return True
+
+        # BUY MAX <commodity>
+        if len(parts) >= 2 and parts[0] == "buy" and parts[1] == "max":
+            if len(parts) != 3:
+                print("Usage: BUY MAX <commodity>")
+                return True
+            commodity = parts[2]
+            if commodity not in COMMODITIES:
+                print("Unknown commodity.")
+                return True
+            try:
+                amt = port.buy_max(self.player, commodity)
+                if amt > 0:
+                    print(f"Purchased {amt} units of {commodity}.")
+                else:
+                    print("You can't afford any, or have no cargo space.")
+            except ValueError as e:
+                print(e)
+            return True
+
+        # BUY/SELL <commodity> <amount>
+        if parts[0] in ["buy", "sell"] and len(parts) == 3:
+            action, commodity, amount = parts
+            if commodity not in COMMODITIES:
+                print("Unknown commodity.")
+                return True
+            if not amount.isdigit():
+                print("Amount must be a positive number.")
+                return True
+            amount = int(amount)
+            if amount <= 0:
+                print("Amount must be positive.")
+                return True
+
+            try:
+                if action == "buy":
+                    port.buy_from_port(self.player, commodity, amount)
+                    print(f"Purchased {amount} units of {commodity}.")
+                else:
+                    port.sell_to_port(self.player, commodity, amount)
+                    print(f"Sold {amount} units of {commodity}.")
+            except ValueError as e:
+                print(e)
+        else:
+            print("Unknown port command.")
+        return True
 
     def repair_ship_at_port(self):
         if self.player.hull >= self.player.max_hull:
@@ -517,7 +743,7 @@ Planet commands (inside LAND):
         cost = to_repair * cost_per_point
 
         confirm = (
-            input(f"Repair {to_repair} hull for {cost} credits? (y/n) ")
+            self.prompt(f"Repair {to_repair} hull for {cost} credits? (y/n) ")
             .strip()
             .lower()
         )
@@ -552,7 +778,7 @@ Planet commands (inside LAND):
             print("5) Withdraw Credits")
             print("6) Leave Planet")
             print("--------------------------------")
-            choice = input("Planet> ").strip()
+            choice = self.prompt("Planet> ").strip()
 
             if choice == "1":  # STATUS
                 print()
@@ -561,11 +787,11 @@ Planet commands (inside LAND):
             elif choice == "2":  # DEPOSIT commodity
                 print("\nAvailable cargo in your ship:")
                 print(self.player.cargo_summary())
-                commodity = input("Deposit which commodity? ").strip().lower()
+                commodity = self.prompt("Deposit which commodity? ").strip().lower()
                 if commodity not in COMMODITIES:
                     print("Unknown commodity.")
                     continue
-                amt = input("Amount to deposit: ").strip()
+                amt = self.prompt("Amount to deposit: ").strip()
                 if not amt.isdigit():
                     print("Amount must be numeric.")
                     continue
@@ -582,11 +808,11 @@ Planet commands (inside LAND):
             elif choice == "3":  # WITHDRAW commodity
                 print("\nPlanetary stock:")
                 print(planet.planet_summary())
-                commodity = input("Withdraw which commodity? ").strip().lower()
+                commodity = self.prompt("Withdraw which commodity? ").strip().lower()
                 if commodity not in COMMODITIES:
                     print("Unknown commodity.")
                     continue
-                amt = input("Amount to withdraw: ").strip()
+                amt = self.prompt("Amount to withdraw: ").strip()
                 if not amt.isdigit():
                     print("Amount must be numeric.")
                     continue
@@ -602,7 +828,7 @@ Planet commands (inside LAND):
 
             elif choice == "4":  # DEPOSIT CREDITS
                 print(f"\nYou have {self.player.credits} credits.")
-                amt = input(
+                amt = self.prompt(
                     "Deposit how many credits into the treasury? "
                 ).strip()
                 if not amt.isdigit():
@@ -620,7 +846,7 @@ Planet commands (inside LAND):
 
             elif choice == "5":  # WITHDRAW CREDITS
                 print(f"\nPlanet treasury contains {planet.treasury} credits.")
-                amt = input("Withdraw how many credits? ").strip()
+                amt = self.prompt("Withdraw how many credits? ").strip()
                 if not amt.isdigit():
                     print("Amount must be numeric.")
                     continue
@@ -635,7 +861,7 @@ Planet commands (inside LAND):
                     print(e)
 
             elif choice == "6":  # LEAVE
-                clearscr()
+                self.clear()
                 print(Color.GREEN+f"You lift off from {planet.name} and return to orbit."+Color.RESET)
                 break
 
@@ -650,87 +876,59 @@ Planet commands (inside LAND):
         print(Color.GREEN+"\nGalaxy Market Report")
         print("Sec  Port Name           Class  Ore        Org        Eqp")
         print("---------------------------------------------------------------")
-        for sid in sorted(self.galaxy.sectors.keys()):
-            sec = self.galaxy.sectors[sid]
-            if not sec.port:
-                continue
-            p = sec.port
-            code = p.class_code()
 
-            def fmt(c):
-                mode = "B" if p.can_buy_from_player(c) else "S"
-                return f"{mode}:{p.prices[c]:>4}"
+        if self.galaxy.market is not None:
+            rows = self.galaxy.market.rows_by_sector()
+        else:
+            rows = (
+                (
+                    sid,
+                    sec.port,
+                    [sec.port.prices[c] for c in COMMODITIES],
+                    [sec.port.can_sell_to_player(c) for c in COMMODITIES],
+                )
+                for sid, sec in sorted(self.galaxy.sectors.items())
+                if sec.port
+            )
 
-            ore_s = fmt("ore")
-            org_s = fmt("organics")
-            eqp_s = fmt("equipment")
+        for sid, p, prices, sells in rows:
+            code = "".join("S" if s else "B" for s in sells)
+            ore_s, org_s, eqp_s = (
+                f"{'S' if s else 'B'}:{price:>4}" for price, s in zip(prices, sells)
+            )
             print(Color.GREEN+
                 f"{sid:>3}  {p.name:<18} {code:<5} {ore_s:<9} {org_s:<9} {eqp_s:<9}"+Color.RESET
             )
 
     def auto_trade(self):
         """
-        Suggest a profitable two-port trade route.
+        Suggest a profitable two-port trade route, plus a few runners-up.
         """
-        best = None
+        routes = find_trade_routes(self.galaxy, top_k=5)
 
-        for sid1, sec1 in self.galaxy.sectors.items():
-            if not sec1.port:
-                continue
-            p1 = sec1.port
-
-            for sid2, sec2 in self.galaxy.sectors.items():
-                if sid1 == sid2 or not sec2.port:
-                    continue
-                p2 = sec2.port
-
-                dist = self.galaxy.shortest_distance(sid1, sid2)
-                if dist is None or dist <= 0:
-                    continue
-
-                for c in COMMODITIES:
-                    if p1.can_sell_to_player(c) and p2.can_buy_from_player(c):
-                        buy_price = p1.prices[c]
-                        sell_price = p2.prices[c]
-                        profit_per_unit = sell_price - buy_price
-                        if profit_per_unit <= 0:
-                            continue
-
-                        score = profit_per_unit / dist
-                        if not best or score > best["score"]:
-                            best = {
-                                "from_sid": sid1,
-                                "to_sid": sid2,
-                                "commodity": c,
-                                "buy_price": buy_price,
-                                "sell_price": sell_price,
-                                "profit_per_unit": profit_per_unit,
-                                "dist": dist,
-                                "score": score,
-                            }
-
-        if not best:
+        if not routes:
             print("\nNo profitable port-to-port trade routes detected right now.")
             return
 
+        best = routes[0]
         s = self.player
         max_units = 0
-        if best["buy_price"] > 0:
-            max_units = min(s.max_holds, s.credits // best["buy_price"])
-        est_profit = max_units * best["profit_per_unit"]
+        if best.buy_price > 0:
+            max_units = min(s.max_holds, s.credits // best.buy_price)
+        est_profit = max_units * best.profit_per_unit
 
-        clearscr()
+        self.clear()
         print(Color.CYAN+"Recommended Trade Route:"+Color.RESET)
         print(
-            f"  Buy  : {best['commodity'].capitalize()} in sector {best['from_sid']} "
-            f"({self.galaxy.sectors[best['from_sid']].port.name}) at {best['buy_price']} cr/unit."
+            f"  Buy  : {best.commodity.capitalize()} in sector {best.from_sid} "
+            f"({self.galaxy.sectors[best.from_sid].port.name}) at {best.buy_price} cr/unit."
         )
         print(
-            f"  Sell : {best['commodity'].capitalize()} in sector {best['to_sid']} "
-            f"({self.galaxy.sectors[best['to_sid']].port.name}) at {best['sell_price']} cr/unit."
+            f"  Sell : {best.commodity.capitalize()} in sector {best.to_sid} "
+            f"({self.galaxy.sectors[best.to_sid].port.name}) at {best.sell_price} cr/unit."
         )
-        print(f"  Profit per unit : {best['profit_per_unit']} credits")
-        print(f"  Distance: {best['dist']} hops")
+        print(f"  Profit per unit : {best.profit_per_unit} credits")
+        print(f"  Distance: {best.dist} hops")
         if max_units > 0:
             print(Color.RED+
                 f"  With your current finances and holds, a full run could net ~{est_profit} credits."+Color.RESET
@@ -739,8 +937,16 @@ Planet commands (inside LAND):
             print("  You currently lack credits or cargo space to exploit this fully.")
             print(Color.GREEN+"<<<==x==x==x==x==x==x==x==x==>>>"+Color.RESET)
 
+        if len(routes) > 1:
+            print("\nOther candidate routes:")
+            for r in routes[1:]:
+                print(
+                    f"  {r.commodity.capitalize():<10} {r.from_sid:>4} -> {r.to_sid:<4} "
+                    f"+{r.profit_per_unit} cr/unit over {r.dist} hops"
+                )
+
         path_to_buy = self.galaxy.shortest_path(
-            self.player.location, best["from_sid"]
+            self.player.location, best.from_sid
         )
         if path_to_buy:
             print("\nRoute from your current sector to buy port:")
@@ -762,7 +968,7 @@ Planet commands (inside LAND):
             return
 
         # 40% chance of actual encounter when pirates present
-        if random.random() >= 0.4:
+        if self.rng.random() >= 0.4:
             return
 
         print("\nALERT: Sensors detect a hostile ship in this sector...")
@@ -821,34 +1027,133 @@ Planet commands (inside LAND):
     # Save / Load
     # --------------------------------------------------------
 
-    def save_game(self, filename="savegame.json"):
-        data = {
+    def save_game(self, filename="savegame.json", fmt=None):
+        """
+        Save the game. The first save to a file writes a full snapshot;
+        later saves append only what changed since to the file's
+        .journal, which is folded into a new snapshot from time to time.
+
+        fmt is "json" or "binary"; by default files ending in .tw25 get
+        the compact binary snapshot format.
+        """
+        journal = self.journal
+        if (
+            journal is not None
+            and journal.save_filename == filename
+            and not journal.needs_compaction()
+        ):
+            journal.append(self._journal_record())
+            return
+
+        self._write_snapshot(filename, fmt)
+
+    def _write_snapshot(self, filename, fmt=None):
+        if fmt is None:
+            fmt = "binary" if filename.endswith(BINARY_EXTENSION) else "json"
+
+        # A mapped galaxy may be reading this very file.
+        self.galaxy.release_snapshot()
+
+        snapshot_id = uuid.uuid4().hex
+        if fmt == "binary":
+            with open(filename, "wb") as f:
+                write_binary_save(
+                    f,
+                    self.galaxy,
+                    turn=self.turn,
+                    time=self.time,
+                    day=self.day,
+                    player=self.player.to_dict(),
+                    snapshot_id=snapshot_id,
+                )
+        else:
+            data = {
+                "turn": self.turn,
+                "time": self.time,
+                "day": self.day,
+                "player": self.player.to_dict(),
+                "snapshot_id": snapshot_id,
+                "galaxy": self.galaxy.to_dict(),
+            }
+            with open(filename, "w") as f:
+                json.dump(data, f, indent=2)
+            #print(f"Game saved to {filename}.")
+
+        self.galaxy.changes.clear()
+        self.journal = SaveJournal.start(filename, snapshot_id)
+
+    def _journal_record(self):
+        """Delta of everything touched since the previous save."""
+        dirty = self.galaxy.changes.drain()
+        record = {
             "turn": self.turn,
             "time": self.time,
             "day": self.day,
-            "player": self.player.to_dict(),
-            "galaxy": self.galaxy.to_dict(),
+            "galaxy_turn": self.galaxy.turn,
+            "sectors": {
+                sid: self.galaxy.sector_to_dict(self.galaxy.sectors[sid])
+                for sid in dirty
+                if sid != PLAYER_KEY and sid in self.galaxy.sectors
+            },
         }
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
-        #print(f"Game saved to {filename}.")
+        if PLAYER_KEY in dirty:
+            record["player"] = self.player.to_dict()
+        return record
 
-    def load_game(self, filename="savegame.json"):
+    def load_game(self, filename="savegame.json", lazy=False):
+        """
+        Load a JSON or binary snapshot (detected from the file contents),
+        plus any journaled deltas saved on top of it. With lazy=True a
+        binary snapshot is memory-mapped and sectors are only built as
+        they're visited. Returns True on success.
+        """
+        galaxy = None
         try:
-            with open(filename, "r") as f:
-                data = json.load(f)
+            if lazy and is_binary_save(filename):
+                galaxy = Galaxy.open_snapshot(filename)
+                data = self._snapshot_state(galaxy)
+            else:
+                data = read_save(filename)
+            if data.get("player") is None:
+                raise SaveFormatError("Save file has no player.")
+            if galaxy is not None:
+                # Mapped rows are checked as they're visited; the
+                # player's sector is shown straight away.
+                galaxy.get_sector(data["player"]["location"])
         except FileNotFoundError:
-            print("No savegame.json file found.")
-            return
+            print(f"No {filename} file found.")
+            return False
+        except (SaveFormatError, ValueError) as e:
+            print(f"Could not load {filename}: {e}")
+            return False
+        data, journal = replay_journal(data, filename)
 
         self.turn = data.get("turn", 0)
         self.time = data.get("time", 0)
         self.day = data.get("day", 0)
 
         self.player = Ship.from_dict(data["player"])
-        self.galaxy = Galaxy.from_dict(data["galaxy"])
-        self.combat_engine = CombatEngine(self.player)
-        self.stardock = StarDock(self.player, self.galaxy)
+        if galaxy is None:
+            self.galaxy = Galaxy.from_dict(data["galaxy"])
+            self.enable_market_book()
+        else:
+            # Journaled sectors replace their mapped rows. The market
+            # book would touch every port, so mapped galaxies keep
+            # per-port dicts.
+            galaxy.turn = data["galaxy"]["turn"]
+            snap = galaxy.snapshot
+            lanes_changed = False
+            for sid, info in data["galaxy"]["sectors"].items():
+                row = snap.row_of(sid)
+                if row is None or set(snap.neighbors(row)) != set(info["neighbors"]):
+                    lanes_changed = True
+                galaxy._restore_sector(sid, info)
+            if lanes_changed:
+                # The file's lane table no longer matches the sectors.
+                galaxy.invalidate_lanes()
+            self.galaxy = galaxy
+        self.attach_ship_systems()
+        self.start_change_tracking(journal)
 
         # Validate player location
         if self.player.location not in self.galaxy.sectors:
@@ -859,15 +1164,34 @@ Planet commands (inside LAND):
             self.player.location = 1
 
         print("Game successfully loaded.")
+        return True
+
+    @staticmethod
+    def _snapshot_state(galaxy):
+        """read_save()-shaped dict for a mapped galaxy, minus its sectors."""
+        meta = galaxy.snapshot.meta
+        return {
+            "turn": meta["turn"],
+            "time": meta["time"],
+            "day": meta["day"],
+            "player": meta["player"],
+            "snapshot_id": meta.get("snapshot_id"),
+            "galaxy": {"turn": galaxy.turn, "sectors": {}},
+        }
 
 
 # ------------------------------------------------------------
 # Entry Point
 # ------------------------------------------------------------
 
-def main():
-    random.seed()
-    game = TW25Game(num_sectors=100)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TradeWars 2025")
+    parser.add_argument("savefile", nargs="?", help="resume from this save")
+    parser.add_argument("--seed", type=int, help="replay a game exactly")
+    parser.add_argument("--sectors", type=int, default=100, help="size of a new galaxy")
+    args = parser.parse_args(argv)
+
+    game = TW25Game(num_sectors=args.sectors, savefile=args.savefile, seed=args.seed)
     game.run()
 
 